@@ -0,0 +1,47 @@
+import sys
+import argparse
+import logging
+from typing import List
+
+from src.tick_file import convert_csv_to_tick_file
+
+TICK_FILE_EXTENSION = ".ticks"
+
+
+def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert a Time,Price CSV file into a binary tick file",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("csv_file", help="Name of the input CSV file")
+    parser.add_argument(
+        "tick_file",
+        nargs="?",
+        help=f"Name of the output tick file (Default=the CSV file name with {TICK_FILE_EXTENSION})",
+    )
+    parser.add_argument("--verbose", "-v", action="count", default=0)
+    parsed_args = parser.parse_args(unparsed_args)
+    return parsed_args
+
+
+def main(sys_argv: List[str]) -> bool:
+    parsed_args = parse_arguments(sys_argv[1:])
+    logging.basicConfig(
+        format="%(message)s",
+        level=logging.INFO if parsed_args.verbose else logging.WARNING,
+    )
+
+    tick_filename = parsed_args.tick_file or (
+        parsed_args.csv_file.removesuffix(".csv") + TICK_FILE_EXTENSION
+    )
+    result = convert_csv_to_tick_file(parsed_args.csv_file, tick_filename)
+    if not result.isSuccess:
+        print(f"Error encountered: {result.message}")
+        return False
+
+    print(f"Wrote {result.result} ticks to {tick_filename}")
+    return True
+
+
+if __name__ == "__main__":
+    main(sys.argv)
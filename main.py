@@ -2,16 +2,62 @@ import sys
 import argparse
 import logging
 import pprint
-from typing import List
+from contextlib import nullcontext
+from typing import ContextManager, Dict, List, Optional, TextIO
 
 from src.result import Result
-from src.csv_util import ColumnTranslation, read_csv_file
 from src.market_condition import MarketCondition
-from src.trade_point import TradePoint
+from src.market_series import MarketSeries, read_market_series
+from src.market_cache import read_market_series_cached
+from src.tick_file import is_tick_file, read_tick_file
+from src.trace_events import TraceSink
+from src.multi_symbol import (
+    format_symbol_report,
+    read_symbol_series,
+    run_symbols,
+    summarize_symbols,
+)
+from src.checkpoint import run_incremental
+from src.resample import BAR_PRICES, read_resampled_series
+from src.result_cache import ResultCache
+from src.trade_book import TradeBook
+from src.trade_writers import TRADE_WRITERS, open_trade_output
 from src.trading_algorithms import TradingAlgorithms
+from src.parallel_runner import run_parallel
+from src.hold_sweep import format_profit_surface, sweep_hold_times
+from src.walk_forward import MINUTES_PER_DAY, format_walk_forward_report, walk_forward
+from src.instrumentation import (
+    ALGORITHM_STAGE,
+    OUTPUT_STAGE,
+    PARSE_STAGE,
+    AlgorithmCounters,
+    RunProfile,
+    cprofiled,
+)
 
 DEFAULT_CSV_FILENAME = "test/market_conditions_100.csv"
 DEFAULT_ALGORITHM = "adjacent"
+DEFAULT_PROCESSES = 1
+DEFAULT_OUTPUT_FORMAT = "text"
+DEFAULT_BAR_MINUTES = 1
+PRINT_PROFILE = "-"
+
+
+def hold_times(value: str) -> List[int]:
+    """
+    Parse a hold time argument: a single number of minutes ("30"), a list of
+    them ("30,45,60"), or a range ("10:60:10", i.e. start:stop[:step], stop excluded)
+    """
+    try:
+        if ":" in value:
+            parsed_hold_times = list(range(*(int(part) for part in value.split(":"))))
+        else:
+            parsed_hold_times = [int(part) for part in value.split(",")]
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"invalid hold time(s): '{value}'")
+    if not parsed_hold_times:
+        raise argparse.ArgumentTypeError(f"empty hold time range: '{value}'")
+    return parsed_hold_times
 
 
 def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
@@ -23,7 +69,7 @@ def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
         "--file",
         "-f",
         default=DEFAULT_CSV_FILENAME,
-        help=f"Name of the input CSV file (Default={DEFAULT_CSV_FILENAME})",
+        help=f"Name of the input CSV file (plain, or gzip/xz/zstd-compressed), or binary tick file (Default={DEFAULT_CSV_FILENAME})",
     )
     parser.add_argument(
         "--algorithm",
@@ -32,11 +78,145 @@ def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
         choices=algorithm_choices.keys(),
         help=f"Algorithm short name (Default={DEFAULT_ALGORITHM})\n{pprint.pformat([f'{k} = {v}' for k,v in algorithm_choices.items()])}",
     )
+    parser.add_argument(
+        "--min-hold",
+        type=hold_times,
+        default=[TradingAlgorithms.DEFAULT_MIN_HOLD_MINUTES],
+        help=f"Minimum hold time in minutes (Default={TradingAlgorithms.DEFAULT_MIN_HOLD_MINUTES})\n"
+        "A list (30,45) or a range (10:60:10) sweeps the hold times, and prints the profit surface",
+    )
+    parser.add_argument(
+        "--max-hold",
+        type=hold_times,
+        default=[TradingAlgorithms.DEFAULT_MAX_HOLD_MINUTES],
+        help=f"Maximum hold time in minutes (Default={TradingAlgorithms.DEFAULT_MAX_HOLD_MINUTES})\n"
+        "A list (60,90) or a range (40:120:20) sweeps the hold times, and prints the profit surface",
+    )
+    parser.add_argument(
+        "--processes",
+        "-p",
+        type=int,
+        default=DEFAULT_PROCESSES,
+        help=f"Number of processes to split the series (or the hold time sweep) across (Default={DEFAULT_PROCESSES}, i.e. sequential)",
+    )
+    parser.add_argument(
+        "--first-minute",
+        type=int,
+        help="Only trade on the market conditions from this minute on",
+    )
+    parser.add_argument(
+        "--last-minute",
+        type=int,
+        help="Only trade on the market conditions up to this minute (included)",
+    )
+    parser.add_argument(
+        "--walk-forward",
+        type=int,
+        metavar="WINDOW_MINUTES",
+        help="Run the algorithm over a rolling window of this many minutes, advanced by --walk-step,\n"
+        "and print the profit of every window (e.g. 10 days = 14400)",
+    )
+    parser.add_argument(
+        "--walk-step",
+        type=int,
+        default=MINUTES_PER_DAY,
+        metavar="STEP_MINUTES",
+        help=f"Minutes the --walk-forward window is advanced by (Default={MINUTES_PER_DAY}, i.e. a day)",
+    )
+    parser.add_argument(
+        "--resample",
+        choices=BAR_PRICES,
+        help="The file has raw ticks (Time in seconds,Price, with Volume for vwap, or Time,Bid,Ask for mid): collapse them\n"
+        "into bars of --bar-minutes as they are read, priced at their open/high/low/close, VWAP or mid",
+    )
+    parser.add_argument(
+        "--bar-minutes",
+        type=int,
+        default=DEFAULT_BAR_MINUTES,
+        help=f"Minutes a bar of --resample spans (Default={DEFAULT_BAR_MINUTES})",
+    )
+    parser.add_argument(
+        "--by-symbol",
+        action="store_true",
+        help="The file has a Symbol column (Symbol,Time,Price), run the algorithm over each symbol\n"
+        "(the symbols are spread across --processes) and print a report per symbol",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the parsed file in a binary cache next to it, and load it from there next time",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PRINT_PROFILE,
+        metavar="JSON_FILE",
+        help="Time the parse, algorithm and output stages, count the work of the algorithm,\n"
+        "and print the report (or write it as JSON into the file)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Trace the peak memory and the top allocations of the algorithm stage into the --profile report",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="STATS_FILE",
+        help="Run under cProfile, and dump the stats into the file (see python -m pstats)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="JSONL_FILE",
+        help="Write every decision of the algorithm (minute, sell window, chosen sell minute)\n"
+        "into the file, as JSON lines (sequential runs only)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        metavar="FILE",
+        help="Write the trades into the file, instead of printing them",
+    )
+    parser.add_argument(
+        "--format",
+        default=DEFAULT_OUTPUT_FORMAT,
+        choices=TRADE_WRITERS.keys(),
+        help=f"Format the trades are written in (Default={DEFAULT_OUTPUT_FORMAT})\n"
+        "binary = packed records of purchase minute (int64), purchase price (float64), sell minute, sell price",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Only print the number of trades and the total profit, not the trades",
+    )
+    parser.add_argument(
+        "--result-cache",
+        metavar="DB_FILE",
+        help="Keep the trades of the run in a SQLite cache, keyed by the content of the file,\n"
+        "the algorithm and the hold times, and take them from there next time (single runs only,\n"
+        "a run with --trace is always run)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="CHECKPOINT_FILE",
+        help="The file grows by appending: carry on from the checkpoint of the last run (if it matches),\n"
+        "only reading the rows appended since, and save a new one (adjacent/highest/higher/max on a plain CSV file)",
+    )
     parser.add_argument("--verbose", "-v", action="count", default=0)
     parsed_args = parser.parse_args(unparsed_args)
     return parsed_args
 
 
+def write_trades(
+    trade_book: TradeBook, output_format: str, output_filename: Optional[str]
+) -> None:
+    if output_filename is None and output_format == DEFAULT_OUTPUT_FORMAT:
+        print("Trades are:")
+    with open_trade_output(output_filename) as output:
+        TRADE_WRITERS[output_format](output).write(trade_book)
+    if output_filename is not None:
+        print(f"Wrote {len(trade_book)} trades to {output_filename}")
+
+
 def setup_logger(verbosity: int) -> None:
     level_to_set = logging.WARNING
     if verbosity >= 2:
@@ -46,41 +226,374 @@ def setup_logger(verbosity: int) -> None:
     logging.basicConfig(format="%(message)s", level=level_to_set)
 
 
-def read_market_conditions(csv_filename) -> Result:
-    column_translations = [
-        ColumnTranslation("Time", "minute", int),
-        ColumnTranslation("Price", "price", float),
-    ]
-    result = read_csv_file(
-        csv_filename, column_translations, row_object_type=MarketCondition
-    )
+def read_market_conditions(
+    csv_filename,
+    use_cache: bool = False,
+    first_minute: Optional[int] = None,
+    last_minute: Optional[int] = None,
+    resample: Optional[str] = None,
+    bar_minutes: int = DEFAULT_BAR_MINUTES,
+) -> Result:
+    if resample is not None:
+        # Raw ticks, collapsed into bars while streaming through the file
+        result = read_resampled_series(csv_filename, resample, bar_minutes)
+    elif is_tick_file(csv_filename):
+        # Memory-mapped, so only the pages within the time range are read
+        return read_tick_file(csv_filename, first_minute, last_minute)
+    elif use_cache:
+        result = read_market_series_cached(csv_filename)
+    else:
+        result = read_market_series(csv_filename)
+    if result.isSuccess and (first_minute is not None or last_minute is not None):
+        result.result = result.result.between_minutes(first_minute, last_minute)
     # TODO: If the number of market_conditions < min_hold, then flag the error
     return result
 
 
+def time_stage(
+    profile: Optional[RunProfile], stage: str, trace_memory: bool = False
+) -> ContextManager:
+    if profile is None:
+        return nullcontext()
+    return profile.time_stage(stage, trace_memory=trace_memory)
+
+
 def main(sys_argv: List[str]) -> bool:
     parsed_args = parse_arguments(sys_argv[1:])
     setup_logger(parsed_args.verbose)
 
-    result = read_market_conditions(csv_filename=parsed_args.file)
+    if parsed_args.trace_memory and not parsed_args.profile:
+        parsed_args.profile = PRINT_PROFILE
+    profile: Optional[RunProfile] = (
+        RunProfile(parsed_args.algorithm) if parsed_args.profile else None
+    )
+
+    if parsed_args.cprofile:
+        with cprofiled(parsed_args.cprofile):
+            is_success = run(parsed_args, profile)
+        print(f"Wrote cProfile stats to {parsed_args.cprofile}")
+    else:
+        is_success = run(parsed_args, profile)
+
+    if profile is not None:
+        if parsed_args.profile == PRINT_PROFILE:
+            print(profile.format_report())
+        else:
+            profile.write_json(parsed_args.profile)
+            print(f"Wrote profile to {parsed_args.profile}")
+    return is_success
+
+
+def run_by_symbol(
+    parsed_args: argparse.Namespace, profile: Optional[RunProfile]
+) -> bool:
+    if (
+        len(parsed_args.min_hold) > 1
+        or len(parsed_args.max_hold) > 1
+        or parsed_args.first_minute is not None
+        or parsed_args.last_minute is not None
+        or parsed_args.cache
+        or parsed_args.checkpoint
+        or parsed_args.result_cache
+        or parsed_args.trace
+        or parsed_args.output
+        or parsed_args.format != DEFAULT_OUTPUT_FORMAT
+        or parsed_args.summary_only
+    ):
+        print(
+            "Error encountered: --by-symbol only prints a report per symbol over the whole file\n"
+            "(without hold time sweeps, --first-minute/--last-minute, --cache, --checkpoint, --result-cache,\n"
+            "--trace, --output, --format or --summary-only)"
+        )
+        return False
+
+    with time_stage(profile, PARSE_STAGE):
+        result = read_symbol_series(parsed_args.file)
     if not result.isSuccess:
         print(f"Error encountered: {result.message}")
         print("Please fix the above error and rerun")
         return result.isSuccess
 
-    market_conditions: List[MarketCondition] = result.result
-    trading_algorithms = TradingAlgorithms(market_conditions)
+    symbol_series: Dict[str, MarketSeries] = result.result
+    if profile is not None:
+        profile.num_market_conditions = sum(map(len, symbol_series.values()))
+    with time_stage(profile, ALGORITHM_STAGE, parsed_args.trace_memory):
+        trade_books = run_symbols(
+            symbol_series,
+            parsed_args.algorithm,
+            min_hold=parsed_args.min_hold[0],
+            max_hold=parsed_args.max_hold[0],
+            processes=parsed_args.processes,
+        )
+    with time_stage(profile, OUTPUT_STAGE):
+        print(f"Trades of {parsed_args.algorithm} by symbol:")
+        print(format_symbol_report(summarize_symbols(trade_books)))
+    return True
+
+
+def run(parsed_args: argparse.Namespace, profile: Optional[RunProfile]) -> bool:
+    if parsed_args.resample and (
+        parsed_args.by_symbol or parsed_args.checkpoint or parsed_args.cache
+    ):
+        print(
+            "Error encountered: --resample reads a single series of raw ticks\n"
+            "(without --by-symbol, --checkpoint or --cache)"
+        )
+        return False
+    if len(parsed_args.min_hold) == 1 and len(parsed_args.max_hold) == 1:
+        try:
+            TradingAlgorithms.resolve_hold_times(
+                parsed_args.min_hold[0], parsed_args.max_hold[0]
+            )
+        except ValueError as ex:
+            print(f"Error encountered: {ex}")
+            print("Please fix the above error and rerun")
+            return False
+    if parsed_args.walk_forward:
+        return run_walk_forward(parsed_args, profile)
+    if parsed_args.by_symbol:
+        return run_by_symbol(parsed_args, profile)
+
+    is_hold_sweep = len(parsed_args.min_hold) > 1 or len(parsed_args.max_hold) > 1
+    if parsed_args.trace and (is_hold_sweep or parsed_args.processes > 1):
+        print(
+            "Error encountered: --trace only traces a single sequential run\n"
+            "(without hold time sweeps or --processes)"
+        )
+        return False
+    if parsed_args.checkpoint:
+        return run_with_checkpoint(parsed_args, profile, is_hold_sweep)
+    if parsed_args.result_cache and not is_hold_sweep:
+        with ResultCache(parsed_args.result_cache) as result_cache:
+            return run_with_result_cache(parsed_args, profile, result_cache)
+
+    market_series = read_input(parsed_args, profile)
+    if market_series is None:
+        return False
 
-    trading_points: List[TradePoint] = trading_algorithms.run(parsed_args.algorithm)
-    total_profit: float = 0.0
-    print("Trades are:")
-    for tp in trading_points:
-        total_profit += tp.profit
-        print(tp)
-    print(f"Total profit {total_profit:.4f}")
+    if is_hold_sweep:
+        with time_stage(profile, ALGORITHM_STAGE, parsed_args.trace_memory):
+            sweep_points = sweep_hold_times(
+                market_series,
+                parsed_args.algorithm,
+                parsed_args.min_hold,
+                parsed_args.max_hold,
+                processes=parsed_args.processes,
+            )
+        with time_stage(profile, OUTPUT_STAGE):
+            print(f"Total profit by hold times (minutes) of {parsed_args.algorithm}:")
+            print(format_profit_surface(sweep_points))
+        return True
 
+    trade_book = run_algorithm(parsed_args, profile, market_series)
+    output_trades(parsed_args, profile, trade_book)
     return True
 
 
+def run_walk_forward(
+    parsed_args: argparse.Namespace, profile: Optional[RunProfile]
+) -> bool:
+    if (
+        len(parsed_args.min_hold) > 1
+        or len(parsed_args.max_hold) > 1
+        or parsed_args.processes > 1
+        or parsed_args.by_symbol
+        or parsed_args.checkpoint
+        or parsed_args.result_cache
+        or parsed_args.trace
+    ):
+        print(
+            "Error encountered: --walk-forward only runs a single algorithm sequentially over a single series\n"
+            "(without hold time sweeps, --processes, --by-symbol, --checkpoint, --result-cache or --trace)"
+        )
+        return False
+
+    market_series = read_input(parsed_args, profile)
+    if market_series is None:
+        return False
+
+    with time_stage(profile, ALGORITHM_STAGE, parsed_args.trace_memory):
+        result = walk_forward(
+            market_series,
+            parsed_args.algorithm,
+            parsed_args.walk_forward,
+            parsed_args.walk_step,
+            min_hold=parsed_args.min_hold[0],
+            max_hold=parsed_args.max_hold[0],
+        )
+    if not result.isSuccess:
+        print(f"Error encountered: {result.message}")
+        print("Please fix the above error and rerun")
+        return False
+
+    with time_stage(profile, OUTPUT_STAGE):
+        print(
+            f"Walk-forward of {parsed_args.algorithm} over windows of {parsed_args.walk_forward} minutes:"
+        )
+        print(format_walk_forward_report(result.result))
+    return True
+
+
+def run_with_result_cache(
+    parsed_args: argparse.Namespace,
+    profile: Optional[RunProfile],
+    result_cache: ResultCache,
+) -> bool:
+    min_hold, max_hold = parsed_args.min_hold[0], parsed_args.max_hold[0]
+    with time_stage(profile, PARSE_STAGE):
+        try:
+            data_hash = result_cache.data_hash(
+                parsed_args.file,
+                parsed_args.first_minute,
+                parsed_args.last_minute,
+                bars=(
+                    (parsed_args.resample, parsed_args.bar_minutes)
+                    if parsed_args.resample
+                    else None
+                ),
+            )
+        except OSError as ex:
+            print(f"Error encountered: {ex}")
+            print("Please fix the above error and rerun")
+            return False
+        # A traced run is never taken from the cache, as the trace is written by
+        # the algorithm as it runs (its trades are still cached)
+        trade_book = (
+            None
+            if parsed_args.trace
+            else result_cache.get(data_hash, parsed_args.algorithm, min_hold, max_hold)
+        )
+
+    if trade_book is None:
+        market_series = read_input(parsed_args, profile)
+        if market_series is None:
+            return False
+        trade_book = run_algorithm(parsed_args, profile, market_series)
+        result_cache.put(
+            data_hash, parsed_args.algorithm, min_hold, max_hold, trade_book
+        )
+
+    output_trades(parsed_args, profile, trade_book)
+    return True
+
+
+def run_with_checkpoint(
+    parsed_args: argparse.Namespace,
+    profile: Optional[RunProfile],
+    is_hold_sweep: bool,
+) -> bool:
+    if (
+        is_hold_sweep
+        or parsed_args.processes > 1
+        or parsed_args.first_minute is not None
+        or parsed_args.last_minute is not None
+        or parsed_args.result_cache
+        or parsed_args.trace
+    ):
+        print(
+            "Error encountered: --checkpoint only runs a single algorithm sequentially over the whole file\n"
+            "(without hold time sweeps, --processes, --first-minute/--last-minute, --result-cache or --trace)"
+        )
+        return False
+
+    # The rows are parsed and fed to the algorithm as they are read
+    with time_stage(profile, ALGORITHM_STAGE, parsed_args.trace_memory):
+        result = run_incremental(
+            parsed_args.file,
+            parsed_args.checkpoint,
+            parsed_args.algorithm,
+            min_hold=parsed_args.min_hold[0],
+            max_hold=parsed_args.max_hold[0],
+        )
+    if not result.isSuccess:
+        print(f"Error encountered: {result.message}")
+        print("Please fix the above error and rerun")
+        return False
+
+    trade_book, num_rows = result.result
+    if profile is not None:
+        profile.num_market_conditions = num_rows
+    output_trades(parsed_args, profile, trade_book)
+    return True
+
+
+def read_input(
+    parsed_args: argparse.Namespace, profile: Optional[RunProfile]
+) -> Optional[MarketSeries]:
+    with time_stage(profile, PARSE_STAGE):
+        result = read_market_conditions(
+            csv_filename=parsed_args.file,
+            use_cache=parsed_args.cache,
+            first_minute=parsed_args.first_minute,
+            last_minute=parsed_args.last_minute,
+            resample=parsed_args.resample,
+            bar_minutes=parsed_args.bar_minutes,
+        )
+    if not result.isSuccess:
+        print(f"Error encountered: {result.message}")
+        print("Please fix the above error and rerun")
+        return None
+
+    if profile is not None:
+        profile.num_market_conditions = len(result.result)
+    return result.result
+
+
+def run_algorithm(
+    parsed_args: argparse.Namespace,
+    profile: Optional[RunProfile],
+    market_series: MarketSeries,
+) -> TradeBook:
+    min_hold, max_hold = parsed_args.min_hold[0], parsed_args.max_hold[0]
+    with time_stage(profile, ALGORITHM_STAGE, parsed_args.trace_memory):
+        if parsed_args.processes > 1:
+            return TradeBook.from_trade_points(
+                market_series,
+                run_parallel(
+                    market_series,
+                    parsed_args.algorithm,
+                    min_hold=min_hold,
+                    max_hold=max_hold,
+                    processes=parsed_args.processes,
+                ),
+            )
+
+        # The work is only counted in a sequential run
+        if profile is not None:
+            profile.counters = AlgorithmCounters()
+        trace_file: ContextManager[Optional[TextIO]] = nullcontext()
+        if parsed_args.trace:
+            trace_file = open(parsed_args.trace, "w", encoding="ascii")
+        with trace_file as trace_output:
+            trace_sink = TraceSink(trace_output) if trace_output is not None else None
+            trading_algorithms = TradingAlgorithms(
+                market_series,
+                min_hold=min_hold,
+                max_hold=max_hold,
+                counters=profile.counters if profile is not None else None,
+                trace_sink=trace_sink,
+            )
+            trade_book = trading_algorithms.run_trade_book(parsed_args.algorithm)
+            if trace_sink is not None:
+                trace_sink.flush()
+                logging.info(
+                    f"Wrote {trace_sink.num_events} trace events to {parsed_args.trace}"
+                )
+        return trade_book
+
+
+def output_trades(
+    parsed_args: argparse.Namespace,
+    profile: Optional[RunProfile],
+    trade_book: TradeBook,
+) -> None:
+    with time_stage(profile, OUTPUT_STAGE):
+        if parsed_args.summary_only:
+            print(f"Number of trades {len(trade_book)}")
+        else:
+            write_trades(trade_book, parsed_args.format, parsed_args.output)
+        print(f"Total profit {trade_book.total_profit():.4f}")
+
+
 if __name__ == "__main__":
     main(sys.argv)
@@ -0,0 +1,81 @@
+import sys
+import argparse
+import logging
+from typing import List
+
+from src.backtest import (
+    find_csv_files,
+    format_summary_table,
+    run_backtest,
+    write_summary_csv,
+)
+from src.trading_algorithms import TradingAlgorithms
+
+DEFAULT_PATH = "test"
+
+
+def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
+    algorithm_choices = TradingAlgorithms.ALGORITHMS_CHOICES()
+    parser = argparse.ArgumentParser(
+        description="Trading Algorithm Backtest",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[DEFAULT_PATH],
+        help=f"CSV files, directories of CSV files or glob patterns (Default={DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        "--algorithms",
+        "-a",
+        nargs="+",
+        default=list(algorithm_choices.keys()),
+        choices=algorithm_choices.keys(),
+        help="Algorithm short names (Default=all of them)",
+    )
+    parser.add_argument(
+        "--processes",
+        "-p",
+        type=int,
+        default=0,
+        help="Number of worker processes (Default=one per CPU)",
+    )
+    parser.add_argument(
+        "--report",
+        "-r",
+        help="Write the summary as CSV into this file, instead of printing a table",
+    )
+    parser.add_argument("--verbose", "-v", action="count", default=0)
+    parsed_args = parser.parse_args(unparsed_args)
+    return parsed_args
+
+
+def main(sys_argv: List[str]) -> bool:
+    parsed_args = parse_arguments(sys_argv[1:])
+    logging.basicConfig(
+        format="%(message)s",
+        level=logging.INFO if parsed_args.verbose else logging.WARNING,
+    )
+
+    csv_filenames = find_csv_files(parsed_args.paths)
+    if not csv_filenames:
+        print(f"No CSV files found in {parsed_args.paths}")
+        return False
+
+    summaries = run_backtest(
+        csv_filenames, parsed_args.algorithms, processes=parsed_args.processes
+    )
+
+    if parsed_args.report:
+        with open(parsed_args.report, "w", newline="", encoding="ascii") as report:
+            write_summary_csv(summaries, report)
+        print(f"Wrote summary of {len(csv_filenames)} files to {parsed_args.report}")
+    else:
+        print(format_summary_table(summaries))
+
+    return not any(summary.error for summary in summaries)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,128 @@
+import sys
+import argparse
+import logging
+from typing import List
+
+from src.benchmark import (
+    find_regressions,
+    format_benchmark_table,
+    load_baseline,
+    run_benchmark,
+    save_baseline,
+)
+from src.market_generator import REGIMES
+from src.trading_algorithms import TradingAlgorithms
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 3
+
+
+def sizes(value: str) -> List[int]:
+    """Parse a list of sizes, in plain or scientific notation ("1000,1e5")"""
+    try:
+        return [int(float(part)) for part in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size(s): '{value}'")
+
+
+def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
+    algorithm_choices = TradingAlgorithms.ALGORITHMS_CHOICES()
+    parser = argparse.ArgumentParser(
+        description="Trading Algorithm Benchmark",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes",
+        type=sizes,
+        default=DEFAULT_SIZES,
+        help=f"Comma separated numbers of ticks, e.g. 1e3,1e6,1e8 (Default={','.join(map(str, DEFAULT_SIZES))})",
+    )
+    parser.add_argument(
+        "--regimes",
+        nargs="+",
+        default=list(REGIMES),
+        choices=REGIMES.keys(),
+        help="Price regimes of the generated series (Default=all of them)",
+    )
+    parser.add_argument(
+        "--algorithms",
+        "-a",
+        nargs="+",
+        default=list(algorithm_choices.keys()),
+        choices=algorithm_choices.keys(),
+        help="Algorithm short names (Default=all of them)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the generated series (Default=0)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Runs per stage, the best time is kept (Default={DEFAULT_REPEAT})",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Do not trace the peak memory, which takes a (much slower) extra run per stage",
+    )
+    parser.add_argument(
+        "--baseline",
+        "-b",
+        help="Compare with the results stored in this file, and fail on a regression",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Slowdown (or growth of peak memory) over the baseline that fails, as a fraction (Default={DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        help="Store the results in this file, to be used as a baseline later",
+    )
+    parser.add_argument("--verbose", "-v", action="count", default=0)
+    parsed_args = parser.parse_args(unparsed_args)
+    return parsed_args
+
+
+def main(sys_argv: List[str]) -> bool:
+    parsed_args = parse_arguments(sys_argv[1:])
+    logging.basicConfig(
+        format="%(message)s",
+        level=logging.INFO if parsed_args.verbose else logging.WARNING,
+    )
+
+    results = run_benchmark(
+        parsed_args.regimes,
+        parsed_args.sizes,
+        parsed_args.algorithms,
+        seed=parsed_args.seed,
+        repeat=parsed_args.repeat,
+        trace_memory=not parsed_args.no_memory,
+    )
+    print(format_benchmark_table(results))
+
+    if parsed_args.save_baseline:
+        save_baseline(results, parsed_args.save_baseline)
+        print(
+            f"Wrote baseline of {len(results)} results to {parsed_args.save_baseline}"
+        )
+
+    if parsed_args.baseline:
+        regressions = find_regressions(
+            results, load_baseline(parsed_args.baseline), parsed_args.threshold
+        )
+        if regressions:
+            print(f"Regressions over {parsed_args.threshold:.0%} of the baseline:")
+            print("\n".join(regressions))
+            return False
+        print(f"No regressions over {parsed_args.threshold:.0%} of the baseline")
+
+    return True
+
+
+if __name__ == "__main__":
+    # A non-zero exit status on a regression, so that CI fails
+    sys.exit(0 if main(sys.argv) else 1)
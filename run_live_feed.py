@@ -0,0 +1,148 @@
+import sys
+import argparse
+import asyncio
+import logging
+from typing import List, Tuple
+
+from src.csv_util import CsvReadError
+from src.live_feed import DEFAULT_QUEUE_SIZE, LiveFeedServer, replay_csv
+from src.online_engine import OnlineTradingEngine
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    try:
+        return host or DEFAULT_HOST, int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected HOST:PORT, got {address!r}")
+
+
+def add_address_arguments(parser: argparse.ArgumentParser) -> None:
+    address_group = parser.add_mutually_exclusive_group()
+    address_group.add_argument(
+        "--tcp",
+        type=parse_address,
+        default=(DEFAULT_HOST, DEFAULT_PORT),
+        metavar="HOST:PORT",
+        help=f"TCP address of the server (Default={DEFAULT_HOST}:{DEFAULT_PORT})",
+    )
+    address_group.add_argument(
+        "--unix", metavar="PATH", help="Unix socket of the server, instead of TCP"
+    )
+
+
+def parse_arguments(unparsed_args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Live feed server running an online algorithm, and a CSV replay client to drive it",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("--verbose", "-v", action="count", default=0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the server until interrupted"
+    )
+    add_address_arguments(serve_parser)
+    serve_parser.add_argument(
+        "--algorithm",
+        "-a",
+        choices=OnlineTradingEngine.ALGORITHMS().keys(),
+        default="max",
+        help="Algorithm the ticks of the feed are run through (Default=max)",
+    )
+    serve_parser.add_argument("--min-hold", type=int, default=-1)
+    serve_parser.add_argument("--max-hold", type=int, default=-1)
+    serve_parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Batches of ticks waiting for the algorithm, before the feed is held back (Default={DEFAULT_QUEUE_SIZE})",
+    )
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Stream a Time,Price CSV file to the server"
+    )
+    add_address_arguments(replay_parser)
+    replay_parser.add_argument(
+        "--file", "-f", required=True, help="Name of the CSV file to replay"
+    )
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="Ticks sent per second (Default=0, as fast as the server takes them)",
+    )
+    replay_parser.add_argument(
+        "--binary",
+        action="store_true",
+        help="Send the ticks as packed binary frames instead of text lines",
+    )
+
+    parsed_args = parser.parse_args(unparsed_args)
+    return parsed_args
+
+
+async def serve(parsed_args: argparse.Namespace) -> None:
+    server = LiveFeedServer(
+        parsed_args.algorithm,
+        min_hold=parsed_args.min_hold,
+        max_hold=parsed_args.max_hold,
+        queue_size=parsed_args.queue_size,
+    )
+    if parsed_args.unix:
+        asyncio_server = await server.start_unix(parsed_args.unix)
+        print(f"Serving {parsed_args.algorithm} on {parsed_args.unix}")
+    else:
+        asyncio_server = await server.start_tcp(*parsed_args.tcp)
+        host, port = parsed_args.tcp
+        print(f"Serving {parsed_args.algorithm} on {host}:{port}")
+    try:
+        await asyncio_server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(sys_argv: List[str]) -> bool:
+    parsed_args = parse_arguments(sys_argv[1:])
+    logging.basicConfig(
+        format="%(message)s",
+        level=logging.INFO if parsed_args.verbose else logging.WARNING,
+    )
+
+    if parsed_args.command == "serve":
+        try:
+            asyncio.run(serve(parsed_args))
+        except KeyboardInterrupt:
+            pass
+        except ValueError as ex:
+            print(f"Error encountered: {ex}")
+            print("Please fix the above error and rerun")
+            return False
+        return True
+
+    host, port = parsed_args.tcp
+    try:
+        stats = asyncio.run(
+            replay_csv(
+                parsed_args.file,
+                host=host,
+                port=port,
+                unix_path=parsed_args.unix,
+                speed=parsed_args.speed,
+                binary=parsed_args.binary,
+            )
+        )
+    except (CsvReadError, OSError, ValueError) as ex:
+        print(f"Error encountered: {ex}")
+        print("Please fix the above error and rerun")
+        return False
+
+    print(stats.format_report())
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv) else 1)
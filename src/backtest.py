@@ -0,0 +1,150 @@
+from dataclasses import dataclass, astuple, fields
+from multiprocessing import Pool
+from typing import List, Optional, TextIO, Tuple
+import csv
+import glob
+import logging
+import os
+import time
+
+from .market_series import MarketSeries, read_market_series
+from .trade_book import TradeBook
+from .trading_algorithms import TradingAlgorithms
+
+
+@dataclass(frozen=True)
+class BacktestSummary:
+    file: str
+    algorithm: str
+    num_market_conditions: int
+    num_trades: int
+    total_profit: float
+    average_hold: float
+    runtime_seconds: float
+    error: str = ""
+
+    @classmethod
+    def from_trade_book(
+        cls,
+        file: str,
+        algorithm: str,
+        num_market_conditions: int,
+        trade_book: TradeBook,
+        runtime_seconds: float,
+    ) -> "BacktestSummary":
+        num_trades = len(trade_book)
+        return cls(
+            file=file,
+            algorithm=algorithm,
+            num_market_conditions=num_market_conditions,
+            num_trades=num_trades,
+            total_profit=trade_book.total_profit(),
+            average_hold=(
+                sum(trade_book.hold_durations()) / num_trades if num_trades else 0.0
+            ),
+            runtime_seconds=runtime_seconds,
+        )
+
+
+def find_csv_files(paths: List[str]) -> List[str]:
+    """Expand directories (to the CSV files in them) and glob patterns"""
+    csv_filenames: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            csv_filenames.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        else:
+            csv_filenames.extend(sorted(glob.glob(path)) or [path])
+    return csv_filenames
+
+
+def backtest_file(args: Tuple) -> List[BacktestSummary]:
+    """Parse the file once, and run all the algorithms on it"""
+    csv_filename, algorithm_choices, min_hold, max_hold = args
+
+    result = read_market_series(csv_filename)
+    if not result.isSuccess:
+        return [
+            BacktestSummary(
+                csv_filename, algorithm, 0, 0, 0.0, 0.0, 0.0, error=result.message
+            )
+            for algorithm in algorithm_choices
+        ]
+
+    market_series: MarketSeries = result.result
+    # A single instance, so the structures built for one algorithm are reused by the rest
+    trading_algorithms = TradingAlgorithms(
+        market_series, min_hold=min_hold, max_hold=max_hold
+    )
+    summaries: List[BacktestSummary] = []
+    for algorithm in algorithm_choices:
+        start_time = time.perf_counter()
+        trade_book = trading_algorithms.run_trade_book(algorithm)
+        runtime_seconds = time.perf_counter() - start_time
+        summaries.append(
+            BacktestSummary.from_trade_book(
+                csv_filename,
+                algorithm,
+                len(market_series),
+                trade_book,
+                runtime_seconds,
+            )
+        )
+    return summaries
+
+
+def run_backtest(
+    csv_filenames: List[str],
+    algorithm_choices: List[str],
+    min_hold=-1,
+    max_hold=-1,
+    processes: Optional[int] = None,
+) -> List[BacktestSummary]:
+    """
+    Run every algorithm on every file, a file per task in a process pool
+    The summaries are returned in the order of the files, then of the algorithms
+    """
+    tasks = [
+        (csv_filename, algorithm_choices, min_hold, max_hold)
+        for csv_filename in csv_filenames
+    ]
+    processes = min(processes or os.cpu_count() or 1, max(len(tasks), 1))
+    logging.info(
+        f"run_backtest: {len(algorithm_choices)} algorithms on {len(tasks)} files in {processes} processes"
+    )
+
+    summaries: List[BacktestSummary] = []
+    if processes == 1:
+        for task in tasks:
+            summaries.extend(backtest_file(task))
+    else:
+        with Pool(processes) as pool:
+            for file_summaries in pool.imap(backtest_file, tasks):
+                summaries.extend(file_summaries)
+    return summaries
+
+
+def write_summary_csv(summaries: List[BacktestSummary], output: TextIO) -> None:
+    writer = csv.writer(output)
+    writer.writerow([field.name for field in fields(BacktestSummary)])
+    for summary in summaries:
+        writer.writerow(astuple(summary))
+
+
+def format_summary_table(summaries: List[BacktestSummary]) -> str:
+    header = (
+        f"{'File':<40} {'Algorithm':<10} {'Rows':>10} {'Trades':>8} "
+        f"{'Profit':>10} {'Avg hold':>8} {'Runtime(s)':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for summary in summaries:
+        if summary.error:
+            lines.append(
+                f"{summary.file:<40} {summary.algorithm:<10} Error: {summary.error}"
+            )
+            continue
+        lines.append(
+            f"{summary.file:<40} {summary.algorithm:<10} {summary.num_market_conditions:>10d} "
+            f"{summary.num_trades:>8d} {summary.total_profit:>10.4f} "
+            f"{summary.average_hold:>8.1f} {summary.runtime_seconds:>10.4f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,180 @@
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import functools
+import gc
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from .market_generator import generate_market_series, write_market_csv
+from .market_series import MarketSeries, read_market_series
+from .trade_point import TradePoint
+from .trading_algorithms import TradingAlgorithms
+
+CSV_INGEST_STAGE: str = "csv_ingest"
+
+# Differences below these are noise, and never flagged as regressions
+MIN_REGRESSION_SECONDS: float = 0.005
+MIN_REGRESSION_MEMORY_BYTES: int = 64 * 1024
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    regime: str
+    num_ticks: int
+    stage: str  # CSV_INGEST_STAGE, or an algorithm short name
+    seconds: float
+    peak_memory_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.regime}/{self.num_ticks}/{self.stage}"
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.num_ticks / self.seconds if self.seconds else float("inf")
+
+
+def measure(
+    stage_function: Callable[[], object], repeat: int, trace_memory: bool = True
+) -> Tuple[float, int]:
+    """
+    Return the best time of 'repeat' runs of the stage, and its peak memory (0 if
+    not traced)
+    The peak memory is traced in a run of its own, as tracing slows the run down
+    (by an order of magnitude)
+    """
+    best_seconds = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start_time = time.perf_counter()
+        stage_function()
+        best_seconds = min(best_seconds, time.perf_counter() - start_time)
+    if not trace_memory:
+        return best_seconds, 0
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage_function()
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best_seconds, peak_memory_bytes
+
+
+def run_algorithm(
+    market_series: MarketSeries, algorithm_choice: str, min_hold: int, max_hold: int
+) -> List[TradePoint]:
+    return TradingAlgorithms(market_series, min_hold=min_hold, max_hold=max_hold).run(
+        algorithm_choice
+    )
+
+
+def run_benchmark(
+    regimes: List[str],
+    sizes: List[int],
+    algorithm_choices: List[str],
+    min_hold=-1,
+    max_hold=-1,
+    seed: int = 0,
+    repeat: int = 3,
+    trace_memory: bool = True,
+) -> List[BenchmarkResult]:
+    """
+    For every regime and size, generate the series, and time reading it from a
+    CSV file and running each of the algorithms over it
+    Every algorithm runs on a new TradingAlgorithms, so the structures it builds
+    are part of its own time
+    """
+    results: List[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for regime in regimes:
+            for num_ticks in sizes:
+                market_series = generate_market_series(regime, num_ticks, seed)
+                csv_filename = os.path.join(temp_dir, f"{regime}_{num_ticks}.csv")
+                write_market_csv(csv_filename, market_series)
+
+                stages: Dict[str, Callable[[], object]] = {
+                    CSV_INGEST_STAGE: lambda: read_market_series(csv_filename)
+                }
+                for algorithm in algorithm_choices:
+                    stages[algorithm] = functools.partial(
+                        run_algorithm, market_series, algorithm, min_hold, max_hold
+                    )
+
+                for stage, stage_function in stages.items():
+                    seconds, peak_memory_bytes = measure(
+                        stage_function, repeat, trace_memory
+                    )
+                    result = BenchmarkResult(
+                        regime, num_ticks, stage, seconds, peak_memory_bytes
+                    )
+                    logging.info(
+                        f"run_benchmark: {result.key} took {seconds:.4f}s, peak memory {peak_memory_bytes} bytes"
+                    )
+                    results.append(result)
+                os.remove(csv_filename)
+    return results
+
+
+def save_baseline(results: List[BenchmarkResult], baseline_filename: str) -> None:
+    with open(baseline_filename, "w", encoding="ascii") as baseline_file:
+        json.dump([asdict(result) for result in results], baseline_file, indent=2)
+
+
+def load_baseline(baseline_filename: str) -> Dict[str, BenchmarkResult]:
+    with open(baseline_filename, encoding="ascii") as baseline_file:
+        baseline = [BenchmarkResult(**fields) for fields in json.load(baseline_file)]
+    return {result.key: result for result in baseline}
+
+
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    threshold: float,
+) -> List[str]:
+    """
+    Return a description of every result that is slower, or that uses more
+    memory, than its baseline by more than the threshold (e.g. 0.25 for 25%)
+    Results that are not in the baseline are not compared
+    """
+    regressions: List[str] = []
+    for result in results:
+        base: Optional[BenchmarkResult] = baseline.get(result.key)
+        if base is None:
+            continue
+        if (
+            result.seconds > base.seconds * (1 + threshold)
+            and result.seconds - base.seconds > MIN_REGRESSION_SECONDS
+        ):
+            regressions.append(
+                f"{result.key}: Took {result.seconds:.4f}s, baseline {base.seconds:.4f}s"
+            )
+        if (
+            result.peak_memory_bytes > base.peak_memory_bytes * (1 + threshold)
+            and result.peak_memory_bytes - base.peak_memory_bytes
+            > MIN_REGRESSION_MEMORY_BYTES
+        ):
+            regressions.append(
+                f"{result.key}: Peak memory {result.peak_memory_bytes} bytes, baseline {base.peak_memory_bytes} bytes"
+            )
+    return regressions
+
+
+def format_benchmark_table(results: List[BenchmarkResult]) -> str:
+    header = (
+        f"{'Regime':<12} {'Ticks':>10} {'Stage':<10} {'Time(s)':>10} "
+        f"{'Ticks/s':>12} {'Peak MiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.regime:<12} {result.num_ticks:>10d} {result.stage:<10} "
+            f"{result.seconds:>10.4f} {result.ticks_per_second:>12.0f} "
+            f"{result.peak_memory_bytes / (1024 * 1024):>10.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,225 @@
+from array import array
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+import hashlib
+import io
+import json
+import logging
+import os
+
+from .compressed_input import detect_compression
+from .csv_util import (
+    ColumnTranslation,
+    CsvReadError,
+    check_csv_header,
+    iterate_csv_lines_columns,
+)
+from .market_series import market_condition_column_translations
+from .online_engine import OnlineTradingEngine
+from .result import Result
+from .trade_book import TradeBook
+from .trade_point import TradePoint
+from .trading_algorithms import TradingAlgorithms
+
+CHECKPOINT_VERSION: int = 2
+FINGERPRINT_SIZE: int = 4096
+READ_BLOCK_SIZE: int = 1 << 20  # Bytes of the appended rows parsed at once
+
+
+def fingerprint_file(csv_file, csv_offset: int) -> str:
+    """
+    Hash of the first and of the last FINGERPRINT_SIZE bytes of the file before
+    csv_offset, which tells a file that was only appended to since (the same
+    fingerprint) from one that was rewritten (most likely not)
+    """
+    file_hash = hashlib.blake2b(digest_size=16)
+    csv_file.seek(0)
+    file_hash.update(csv_file.read(min(FINGERPRINT_SIZE, csv_offset)))
+    tail_offset = max(0, csv_offset - FINGERPRINT_SIZE)
+    csv_file.seek(tail_offset)
+    file_hash.update(csv_file.read(csv_offset - tail_offset))
+    return file_hash.hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """
+    Where an incremental run over a growing CSV file stopped: how much of the
+    file it read, the state of the online engine, which was still waiting for
+    more ticks to settle its pending trades, and the trades settled so far
+    (as the ticks of TradeBook.trade_ticks())
+    """
+
+    csv_offset: int  # Bytes of the file read, always up to the end of a line
+    line_number: int  # Of the next line to read
+    fingerprint: str
+    engine_state: Dict
+    trade_minutes: List[int] = field(default_factory=list)
+    trade_prices: List[float] = field(default_factory=list)
+    version: int = CHECKPOINT_VERSION
+
+    def save(self, checkpoint_filename: str) -> None:
+        temp_checkpoint_filename = f"{checkpoint_filename}.{os.getpid()}.tmp"
+        try:
+            with open(temp_checkpoint_filename, "w", encoding="ascii") as json_file:
+                json.dump(asdict(self), json_file)
+            os.replace(temp_checkpoint_filename, checkpoint_filename)
+        finally:
+            if os.path.exists(temp_checkpoint_filename):
+                os.remove(temp_checkpoint_filename)
+
+    @classmethod
+    def load(cls, checkpoint_filename: str) -> Optional["Checkpoint"]:
+        """The checkpoint saved in the file, or None if there is no usable one"""
+        try:
+            with open(checkpoint_filename, encoding="ascii") as json_file:
+                checkpoint = cls(**json.load(json_file))
+        except (OSError, ValueError, TypeError) as ex:
+            logging.info(f"No checkpoint loaded from {checkpoint_filename}: {ex}")
+            return None
+        if checkpoint.version != CHECKPOINT_VERSION:
+            logging.info(f"Checkpoint {checkpoint_filename} is of another version")
+            return None
+        return checkpoint
+
+
+def run_incremental(
+    csv_filename: str,
+    checkpoint_filename: str,
+    algorithm_choice: str,
+    min_hold=-1,
+    max_hold=-1,
+    column_translations: Optional[List[ColumnTranslation]] = None,
+) -> Result:
+    """
+    Run an online algorithm over a CSV file that grows by appending, carrying
+    on from the checkpoint of the previous run if it is for the same algorithm,
+    hold times and file: only the rows appended since are parsed and fed to the
+    engine, restored to where it was. A new checkpoint is saved for the next run.
+
+    On success, the result is (TradeBook, number of rows read by this run), the
+    TradeBook of all the trades (over the ticks of its trades only), the same
+    trades a run over the whole file returns.
+    A last line without its newline (i.e. still being written) is read, but not
+    checkpointed, so that it is read again once complete.
+    The column translations (if given) must translate to 'minute' and 'price'
+    """
+    if algorithm_choice not in OnlineTradingEngine.ALGORITHMS():
+        return Result(
+            isSuccess=False,
+            message=f"Algorithm {algorithm_choice} can not be run incrementally, only {', '.join(OnlineTradingEngine.ALGORITHMS())}",
+            result=None,
+        )
+    translations: List[ColumnTranslation] = (
+        market_condition_column_translations()
+        if column_translations is None
+        else column_translations
+    )
+    try:
+        min_hold, max_hold = TradingAlgorithms.resolve_hold_times(min_hold, max_hold)
+    except ValueError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    trade_minutes, trade_prices = array("q"), array("d")
+
+    def add_trades(trade_points: List[TradePoint]) -> None:
+        for trade_point in trade_points:
+            trade_minutes.append(trade_point.purchase_point.minute)
+            trade_minutes.append(trade_point.sell_point.minute)
+            trade_prices.append(trade_point.purchase_point.price)
+            trade_prices.append(trade_point.sell_point.price)
+
+    def feed(lines: bytes, line_number: int) -> int:
+        num_rows = 0
+        for columns in iterate_csv_lines_columns(
+            io.StringIO(lines.decode("ascii", "ignore"), newline=""),
+            csv_filename,
+            column_names,
+            translations,
+            line_number=line_number,
+        ):
+            for minute, price in zip(columns["minute"], columns["price"]):
+                add_trades(engine.on_tick(minute, price))
+            num_rows += len(columns["minute"])
+        return num_rows
+
+    try:
+        if detect_compression(csv_filename) is not None:
+            raise CsvReadError(
+                f"File: {csv_filename} Error: Compressed files can not be read incrementally"
+            )
+        with open(csv_filename, "rb") as csv_file:
+            header = csv_file.readline()
+            if not header.endswith(b"\n"):
+                raise CsvReadError(f"File: {csv_filename} Error: No complete header")
+            column_names = check_csv_header(
+                header.decode("ascii", errors="ignore"),
+                csv_filename,
+                translations,
+            )
+
+            checkpoint = Checkpoint.load(checkpoint_filename)
+            if checkpoint is not None and not (
+                checkpoint.engine_state.get("algorithm") == algorithm_choice
+                and checkpoint.engine_state.get("min_hold") == min_hold
+                and checkpoint.engine_state.get("max_hold") == max_hold
+                and os.fstat(csv_file.fileno()).st_size >= checkpoint.csv_offset
+                and fingerprint_file(csv_file, checkpoint.csv_offset)
+                == checkpoint.fingerprint
+            ):
+                logging.info(
+                    f"Checkpoint {checkpoint_filename} does not match, starting over"
+                )
+                checkpoint = None
+
+            if checkpoint is None:
+                engine = OnlineTradingEngine(algorithm_choice, min_hold, max_hold)
+                csv_offset, line_number = len(header), 2
+            else:
+                engine = OnlineTradingEngine.from_state(checkpoint.engine_state)
+                csv_offset, line_number = checkpoint.csv_offset, checkpoint.line_number
+                trade_minutes.extend(checkpoint.trade_minutes)
+                trade_prices.extend(checkpoint.trade_prices)
+
+            # The complete lines appended since are fed a block at a time, the
+            # line cut short at the end of a block is completed by the next one
+            csv_file.seek(csv_offset)
+            complete_size, num_rows = 0, 0
+            remainder = b""
+            while True:
+                block = csv_file.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                block = remainder + block
+                block_size = block.rfind(b"\n") + 1
+                # The parser numbers the rows it reads, i.e. without the blank lines
+                num_rows += feed(block[:block_size], line_number + num_rows)
+                complete_size += block_size
+                remainder = block[block_size:]
+
+            next_checkpoint = Checkpoint(
+                csv_offset=csv_offset + complete_size,
+                line_number=line_number + num_rows,
+                fingerprint=fingerprint_file(csv_file, csv_offset + complete_size),
+                engine_state=engine.get_state(),
+                trade_minutes=trade_minutes.tolist(),
+                trade_prices=trade_prices.tolist(),
+            )
+            num_rows += feed(remainder, next_checkpoint.line_number)
+    except (CsvReadError, OSError, ValueError) as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    add_trades(engine.finish())
+
+    try:
+        next_checkpoint.save(checkpoint_filename)
+    except OSError as ex:
+        logging.warning(f"Could not save checkpoint {checkpoint_filename}: {ex}")
+
+    logging.info(
+        f"Read {num_rows} rows of {csv_filename} from byte {csv_offset}"
+        f" ({'carrying on from the checkpoint' if checkpoint else 'starting over'})"
+    )
+    return Result(
+        isSuccess=True,
+        message="",
+        result=(TradeBook.from_trade_ticks(trade_minutes, trade_prices), num_rows),
+    )
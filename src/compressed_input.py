@@ -0,0 +1,146 @@
+from typing import Callable, Dict, Optional, TextIO
+import gzip
+import io
+import lzma
+import queue
+import threading
+
+DECOMPRESSED_CHUNK_SIZE: int = 1 << 20
+DEFAULT_QUEUE_CHUNKS: int = 8  # Decompressed chunks waiting for the parser
+QUEUE_POLL_SECONDS: float = 0.1
+
+GZIP: str = "gzip"
+XZ: str = "xz"
+ZSTD: str = "zstd"
+
+# Leading bytes of the compressed files, by their compression
+COMPRESSION_MAGICS: Dict[str, bytes] = {
+    GZIP: b"\x1f\x8b",
+    XZ: b"\xfd7zXZ\x00",
+    ZSTD: b"\x28\xb5\x2f\xfd",
+}
+
+
+def detect_compression(filename: str) -> Optional[str]:
+    """The compression of the file, told by its magic bytes (None if not compressed)"""
+    with open(filename, "rb") as file:
+        head = file.read(max(map(len, COMPRESSION_MAGICS.values())))
+    for compression, magic in COMPRESSION_MAGICS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_zstd(filename: str) -> io.BufferedIOBase:
+    try:
+        import zstandard  # type: ignore[import]
+    except ImportError:
+        raise OSError(
+            f"{filename} is zstd-compressed, which needs the zstandard package (pip install zstandard)"
+        )
+    return zstandard.ZstdDecompressor().stream_reader(
+        open(filename, "rb"), closefd=True
+    )
+
+
+# Open a compressed file as a stream of the decompressed bytes
+DECOMPRESSORS: Dict[str, Callable[[str], io.BufferedIOBase]] = {
+    GZIP: lambda filename: gzip.open(filename, "rb"),
+    XZ: lambda filename: lzma.open(filename, "rb"),
+    ZSTD: open_zstd,
+}
+
+
+class BackgroundDecompressor(io.RawIOBase):
+    """
+    Raw stream of the decompressed bytes of a file, decompressed by a thread
+
+    The thread reads the decompressed file a chunk at a time into a bounded
+    queue, which the stream is read from. zlib and lzma release the GIL while
+    they work, so the decompression overlaps with the parsing (and whatever is
+    done with the rows), and at most queue_chunks chunks are held in memory.
+    An error of the decompression is raised by the next read.
+    """
+
+    def __init__(
+        self,
+        decompressed_file: io.BufferedIOBase,
+        chunk_size: int = DECOMPRESSED_CHUNK_SIZE,
+        queue_chunks: int = DEFAULT_QUEUE_CHUNKS,
+    ):
+        super().__init__()
+        self.decompressed_file: io.BufferedIOBase = decompressed_file
+        self.chunk_size: int = chunk_size
+        self.chunks: queue.Queue = queue.Queue(maxsize=queue_chunks)
+        self.chunk: memoryview = memoryview(b"")
+        self.at_eof: bool = False
+        self.stopping: threading.Event = threading.Event()
+        self.thread: threading.Thread = threading.Thread(
+            target=self.decompress, name="BackgroundDecompressor", daemon=True
+        )
+        self.thread.start()
+
+    def decompress(self) -> None:
+        try:
+            with self.decompressed_file:
+                while not self.stopping.is_set():
+                    chunk = self.decompressed_file.read(self.chunk_size)
+                    self.put(chunk)
+                    if not chunk:
+                        return
+        except Exception as ex:
+            self.put(OSError(f"Decompression failed: {ex}"))
+
+    def put(self, item) -> None:
+        # Waits while the queue is full, unless the reader has gone away
+        while not self.stopping.is_set():
+            try:
+                self.chunks.put(item, timeout=QUEUE_POLL_SECONDS)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.chunk:
+            if self.at_eof:
+                return 0
+            item = self.chunks.get()
+            if isinstance(item, Exception):
+                self.at_eof = True
+                raise item
+            if not item:
+                self.at_eof = True
+                return 0
+            self.chunk = memoryview(item)
+        size = min(len(buffer), len(self.chunk))
+        buffer[:size] = self.chunk[:size]
+        self.chunk = self.chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self.stopping.set()
+            self.thread.join()
+        super().close()
+
+
+def open_csv_text(filename: str) -> TextIO:
+    """
+    Open a CSV file as text, the same way whether it is plain or compressed
+    (gzip, xz, or zstd if the zstandard package is installed)
+    """
+    compression = detect_compression(filename)
+    if compression is None:
+        return open(filename, newline="", encoding="ascii", errors="ignore")
+    return io.TextIOWrapper(
+        io.BufferedReader(
+            BackgroundDecompressor(DECOMPRESSORS[compression](filename)),
+            buffer_size=DECOMPRESSED_CHUNK_SIZE,
+        ),
+        newline="",
+        encoding="ascii",
+        errors="ignore",
+    )
@@ -1,9 +1,18 @@
-from typing import List
+from array import array
+from typing import List, Dict, Iterable, Iterator, MutableSequence, Tuple
 import logging
 import csv
 
+from .compressed_input import open_csv_text
 from .result import Result
 
+DEFAULT_CHUNK_SIZE: int = 65536
+
+# Column types the bulk parser can read straight into typed arrays
+COLUMN_TYPECODES: Dict[type, str] = {int: "q", float: "d"}
+# Column types the bulk parser can read, the ones without a typecode into lists
+BULK_COLUMN_TYPES: Tuple[type, ...] = (int, float, str)
+
 
 class ColumnTranslation:
     def __init__(self, column_name, column_name_xlat, column_type):
@@ -12,28 +21,33 @@ class ColumnTranslation:
         self.column_type = column_type
 
 
-def read_csv_file(
+class CsvReadError(Exception):
+    """Raised by the streaming readers, carries the same message read_csv_file reports"""
+
+
+def iterate_csv_file(
     csv_filename: str,
     column_translations: List[ColumnTranslation],
     row_object_type: type,
-) -> Result:
+) -> Iterator:
+    """
+    Yield the CSV rows one at a time as objects of row_object_type
+    Only the current row is held in memory
+    Raises CsvReadError on the first bad row (or if the file cannot be read)
+    """
     line_number = -1
-    row_objects: List = []
+    num_rows = 0
 
     logging.info(f"Reading CSV file: {csv_filename}")
     try:
-        with open(
-            csv_filename, newline="", encoding="ascii", errors="ignore"
-        ) as csvfile:
+        with open_csv_text(csv_filename) as csvfile:
             reader = csv.DictReader(csvfile)
             line_number = 2  # The very first line is the header
 
             for row in reader:
                 if len(row) != len(column_translations):
-                    return Result(
-                        False,
-                        message=f"File: {csv_filename} Line: {line_number} Error: Found {len(row)} fields, expected {len(column_translations)}",
-                        result=None,
+                    raise CsvReadError(
+                        f"File: {csv_filename} Line: {line_number} Error: Found {len(row)} fields, expected {len(column_translations)}"
                     )
 
                 # Tranform this CSV row dict into object of desired type
@@ -49,16 +63,235 @@ def read_csv_file(
                         for translation in column_translations
                     }
                 )
-                row_objects.append(row_object)
+                yield row_object
+                num_rows += 1
                 line_number += 1
+    except CsvReadError:
+        raise
     except Exception as ex:
         message = (
             str(ex)
             if line_number == -1
             else f"File: {csv_filename} Line: {line_number} Error: {str(ex)}"
         )
-        return Result(isSuccess=False, message=message, result=None)
+        raise CsvReadError(message) from ex
+
+    logging.info(f"Read {num_rows} rows")
+
+
+def iterate_csv_file_in_chunks(
+    csv_filename: str,
+    column_translations: List[ColumnTranslation],
+    row_object_type: type,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List]:
+    """
+    Same as iterate_csv_file, but yields lists of up to chunk_size row objects
+    """
+    chunk: List = []
+    for row_object in iterate_csv_file(
+        csv_filename, column_translations, row_object_type
+    ):
+        chunk.append(row_object)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv_file(
+    csv_filename: str,
+    column_translations: List[ColumnTranslation],
+    row_object_type: type,
+) -> Result:
+    row_objects: List = []
 
-    logging.info(f"Read {len(row_objects)} rows")
+    try:
+        for row_object in iterate_csv_file(
+            csv_filename, column_translations, row_object_type
+        ):
+            row_objects.append(row_object)
+    except CsvReadError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
 
     return Result(isSuccess=True, message="", result=row_objects)
+
+
+def new_bulk_column(column_type: type) -> MutableSequence:
+    if column_type in COLUMN_TYPECODES:
+        return array(COLUMN_TYPECODES[column_type])
+    return []
+
+
+def split_csv_line(line: str) -> List[str]:
+    """
+    The fields of a line, split by hand, or by the csv module (as csv.DictReader
+    does) if the line has quoted fields
+    """
+    if '"' in line:
+        return next(csv.reader([line]), [])
+    return line.rstrip("\r\n").split(",")
+
+
+def check_csv_header(
+    header: str, csv_filename: str, column_translations: List[ColumnTranslation]
+) -> List[str]:
+    """
+    Return the column names of the header line, after checking that it has the
+    columns of the translations
+    Raises CsvReadError otherwise
+    """
+    column_names = split_csv_line(header)
+    if len(column_names) != len(column_translations):
+        raise CsvReadError(
+            f"File: {csv_filename} Line: 1 Error: Found {len(column_names)} fields, expected {len(column_translations)}"
+        )
+    for translation in column_translations:
+        if translation.column_name not in column_names:
+            raise CsvReadError(
+                f"File: {csv_filename} Line: 1 Error: Field '{translation.column_name}' missing!"
+            )
+    return column_names
+
+
+def iterate_csv_lines_columns(
+    lines: Iterable[str],
+    csv_filename: str,
+    column_names: List[str],
+    column_translations: List[ColumnTranslation],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    line_number: int = 2,
+) -> Iterator[Dict[str, MutableSequence]]:
+    """
+    The bulk parsing of the lines after the header (see iterate_csv_columns),
+    over any iterable of lines, e.g. only the lines appended to a file since it
+    was last read (line_number is the one of the first line, for the messages)
+    """
+    num_columns = len(column_translations)
+
+    def new_columns() -> Dict[str, MutableSequence]:
+        return {
+            translation.column_name_xlat: new_bulk_column(translation.column_type)
+            for translation in column_translations
+        }
+
+    def new_plan(columns: Dict[str, MutableSequence]) -> List:
+        # (append, column_type) of every column, in the order the fields appear on a line
+        plan: List = [None] * num_columns
+        for translation in column_translations:
+            plan[column_names.index(translation.column_name)] = (
+                columns[translation.column_name_xlat].append,
+                translation.column_type,
+            )
+        return plan
+
+    try:
+        columns = new_columns()
+        plan = new_plan(columns)
+        num_rows_in_chunk = 0
+
+        for line in lines:
+            fields = split_csv_line(line)
+            if len(fields) != num_columns:
+                # Blank lines are skipped, as csv.DictReader does
+                if not line.strip():
+                    continue
+                raise CsvReadError(
+                    f"File: {csv_filename} Line: {line_number} Error: Found {len(fields)} fields, expected {num_columns}"
+                )
+            for (append, column_type), field in zip(plan, fields):
+                append(column_type(field))
+            line_number += 1
+
+            num_rows_in_chunk += 1
+            if num_rows_in_chunk == chunk_size:
+                yield columns
+                columns = new_columns()
+                plan = new_plan(columns)
+                num_rows_in_chunk = 0
+
+        if num_rows_in_chunk:
+            yield columns
+    except CsvReadError:
+        raise
+    except Exception as ex:
+        raise CsvReadError(
+            f"File: {csv_filename} Line: {line_number} Error: {str(ex)}"
+        ) from ex
+
+
+def iterate_csv_columns(
+    csv_filename: str,
+    column_translations: List[ColumnTranslation],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, MutableSequence]]:
+    """
+    Bulk parser for the common case of CSV files with numeric (int/float) columns,
+    and possibly str columns (e.g. a symbol)
+    It bypasses csv.DictReader and the row objects: each line is split by hand and
+    its fields are appended straight to typed arrays (to lists for str columns).
+    Every chunk_size rows the columns are yielded, as a dict keyed by column_name_xlat
+    Lines with quoted fields are split by the csv module instead, but a quoted
+    field can not span lines
+    Raises CsvReadError with the same line-numbered messages as iterate_csv_file
+    """
+    line_number = -1
+    num_rows = 0
+
+    logging.info(f"Reading CSV file: {csv_filename}")
+    try:
+        for translation in column_translations:
+            if translation.column_type not in BULK_COLUMN_TYPES:
+                raise CsvReadError(
+                    f"Column '{translation.column_name}' of type {translation.column_type.__name__} can not be bulk-read"
+                )
+
+        with open_csv_text(csv_filename) as csvfile:
+            header = csvfile.readline()
+            if not header:
+                logging.info("Read 0 rows")
+                return
+
+            line_number = 1
+            column_names = check_csv_header(header, csv_filename, column_translations)
+            for columns in iterate_csv_lines_columns(
+                csvfile, csv_filename, column_names, column_translations, chunk_size
+            ):
+                num_rows += len(next(iter(columns.values())))
+                yield columns
+    except CsvReadError:
+        raise
+    except Exception as ex:
+        message = (
+            str(ex)
+            if line_number == -1
+            else f"File: {csv_filename} Line: {line_number} Error: {str(ex)}"
+        )
+        raise CsvReadError(message) from ex
+
+    logging.info(f"Read {num_rows} rows")
+
+
+def read_csv_columns(
+    csv_filename: str,
+    column_translations: List[ColumnTranslation],
+) -> Result:
+    """
+    Bulk-read the whole file with iterate_csv_columns
+    On success, the result is a dict of typed arrays (lists for str columns)
+    keyed by column_name_xlat
+    """
+    columns: Dict[str, MutableSequence] = {
+        translation.column_name_xlat: new_bulk_column(translation.column_type)
+        for translation in column_translations
+    }
+
+    try:
+        for chunk in iterate_csv_columns(csv_filename, column_translations):
+            for column_name_xlat, column in chunk.items():
+                columns[column_name_xlat].extend(column)
+    except CsvReadError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+
+    return Result(isSuccess=True, message="", result=columns)
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+import logging
+import os
+
+from .market_series import MarketData, as_market_series
+from .trading_algorithms import TradingAlgorithms
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    min_hold: int
+    max_hold: int
+    num_trades: int
+    total_profit: float
+
+
+# Set in each worker of the pool (inherited, not re-built), see sweep_hold_times()
+shared_trading_algorithms: Optional[TradingAlgorithms] = None
+
+
+def set_shared_trading_algorithms(trading_algorithms: TradingAlgorithms) -> None:
+    global shared_trading_algorithms
+    shared_trading_algorithms = trading_algorithms
+
+
+def run_sweep_point(args: Tuple[str, int, int]) -> SweepPoint:
+    algorithm_choice, min_hold, max_hold = args
+    if shared_trading_algorithms is None:
+        raise RuntimeError("run_sweep_point: The shared TradingAlgorithms is not set")
+    trade_book = shared_trading_algorithms.with_hold_times(
+        min_hold, max_hold
+    ).run_trade_book(algorithm_choice)
+    return SweepPoint(
+        min_hold=min_hold,
+        max_hold=max_hold,
+        num_trades=len(trade_book),
+        total_profit=trade_book.total_profit(),
+    )
+
+
+def sweep_hold_times(
+    market_data: MarketData,
+    algorithm_choice: str,
+    min_holds: List[int],
+    max_holds: List[int],
+    processes: Optional[int] = None,
+) -> List[SweepPoint]:
+    """
+    Run the algorithm for every valid (min_hold, max_hold) pair of the grid and
+    return the profit surface, in the order of min_holds then max_holds
+
+    The structures over the prices that do not depend on the hold times (the
+    next-greater PriceIndex and the SparseTableMax) are built once, and every
+    grid point reuses them. The grid points are run in a process pool.
+    """
+    grid = [
+        (algorithm_choice, min_hold, max_hold)
+        for min_hold in min_holds
+        for max_hold in max_holds
+        if 0 <= min_hold < max_hold
+    ]
+    trading_algorithms = TradingAlgorithms(as_market_series(market_data))
+    trading_algorithms.precompute()
+
+    processes = min(processes or os.cpu_count() or 1, max(len(grid), 1))
+    logging.info(
+        f"sweep_hold_times: {algorithm_choice} over {len(grid)} hold time pairs in {processes} processes"
+    )
+    if processes == 1:
+        set_shared_trading_algorithms(trading_algorithms)
+        return [run_sweep_point(grid_point) for grid_point in grid]
+
+    with Pool(
+        processes,
+        initializer=set_shared_trading_algorithms,
+        initargs=(trading_algorithms,),
+    ) as pool:
+        return pool.map(run_sweep_point, grid)
+
+
+def format_profit_surface(sweep_points: List[SweepPoint]) -> str:
+    """Table of total profit, with a row per min_hold and a column per max_hold"""
+    min_holds = sorted({sweep_point.min_hold for sweep_point in sweep_points})
+    max_holds = sorted({sweep_point.max_hold for sweep_point in sweep_points})
+    profits = {
+        (sweep_point.min_hold, sweep_point.max_hold): sweep_point.total_profit
+        for sweep_point in sweep_points
+    }
+
+    lines = ["min\\max " + "".join(f"{max_hold:>10d}" for max_hold in max_holds)]
+    for min_hold in min_holds:
+        lines.append(
+            f"{min_hold:>7d} "
+            + "".join(
+                f"{profits[(min_hold, max_hold)]:>10.4f}"
+                if (min_hold, max_hold) in profits
+                else f"{'-':>10}"
+                for max_hold in max_holds
+            )
+        )
+    return "\n".join(lines)
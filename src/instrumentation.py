@@ -0,0 +1,101 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
+import cProfile
+import json
+import time
+import tracemalloc
+
+# Stages of a run of main.py, in the order they happen
+PARSE_STAGE: str = "parse"
+ALGORITHM_STAGE: str = "algorithm"
+OUTPUT_STAGE: str = "output"
+
+DEFAULT_TOP_ALLOCATIONS: int = 10
+
+
+@dataclass
+class AlgorithmCounters:
+    """
+    Work done by a run of an algorithm, counted only when a TradingAlgorithms is
+    given an instance of this (the algorithms skip the counting otherwise)
+
+    ticks_visited: Minutes considered as a purchase (or, by optimal, as a sale)
+    window_scans: Searches of a hold time window, by a scan or by a range structure
+    comparisons: Price comparisons made by the algorithm itself (the work inside
+                 the range structures is not broken down)
+    trades_emitted: Trades returned
+    """
+
+    ticks_visited: int = 0
+    window_scans: int = 0
+    comparisons: int = 0
+    trades_emitted: int = 0
+
+
+@dataclass
+class RunProfile:
+    algorithm: str
+    num_market_conditions: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    counters: Optional[AlgorithmCounters] = None
+    peak_memory_bytes: Optional[int] = None
+    top_allocations: List[str] = field(default_factory=list)
+
+    @contextmanager
+    def time_stage(self, stage: str, trace_memory: bool = False) -> Iterator[None]:
+        """
+        Add the time spent within the block to the stage
+        If asked, also trace its memory (which slows the stage down)
+        """
+        with self.trace_memory() if trace_memory else nullcontext():
+            start_time = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + (
+                    time.perf_counter() - start_time
+                )
+
+    @contextmanager
+    def trace_memory(self, top: int = DEFAULT_TOP_ALLOCATIONS) -> Iterator[None]:
+        """Record the peak memory and the top allocations (by line) within the block"""
+        tracemalloc.start()
+        try:
+            yield
+            _, self.peak_memory_bytes = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics("lineno")
+            self.top_allocations = [str(statistic) for statistic in statistics[:top]]
+        finally:
+            tracemalloc.stop()
+
+    def write_json(self, json_filename: str) -> None:
+        with open(json_filename, "w", encoding="ascii") as json_file:
+            json.dump(asdict(self), json_file, indent=2)
+
+    def format_report(self) -> str:
+        lines = [
+            f"Profile of {self.algorithm} over {self.num_market_conditions} market conditions:"
+        ]
+        for stage, seconds in self.stage_seconds.items():
+            lines.append(f"  {stage + ' time (s)':<22} {seconds:>14.6f}")
+        if self.counters is not None:
+            for name, count in asdict(self.counters).items():
+                lines.append(f"  {name.replace('_', ' '):<22} {count:>14d}")
+        if self.peak_memory_bytes is not None:
+            lines.append(f"  {'peak memory (bytes)':<22} {self.peak_memory_bytes:>14d}")
+            lines.append("  Top allocations:")
+            lines.extend(f"    {allocation}" for allocation in self.top_allocations)
+        return "\n".join(lines)
+
+
+@contextmanager
+def cprofiled(stats_filename: str) -> Iterator[cProfile.Profile]:
+    """Run the block under cProfile, and dump the stats (for pstats) to the file"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(stats_filename)
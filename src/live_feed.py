@@ -0,0 +1,346 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple, cast
+import asyncio
+import json
+import logging
+import struct
+import time
+
+from .csv_util import iterate_csv_columns
+from .market_series import market_condition_column_translations
+from .online_engine import OnlineTradingEngine
+from .trade_point import TradePoint
+
+# The first line a client sends says what the connection is for
+FEED_TEXT_HANDSHAKE: bytes = b"FEED TEXT\n"  # followed by "minute,price" lines
+FEED_BINARY_HANDSHAKE: bytes = b"FEED BINARY\n"  # followed by TICK_FRAMEs
+SUBSCRIBE_HANDSHAKE: bytes = b"SUBSCRIBE\n"  # then receives the trades as JSON lines
+HANDSHAKE_OK: bytes = b"OK\n"
+
+TICK_FRAME = struct.Struct("<qd")  # minute, price
+
+READ_SIZE: int = 65536  # Bytes read from a feed at once, the ticks in them are a batch
+# Batches waiting for the engine, before the feed is paused
+DEFAULT_QUEUE_SIZE: int = 16
+REPLAY_BATCH_SIZE: int = 1024  # Ticks written by the replay client at once
+
+Tick = Tuple[int, float]
+
+
+def parse_text_ticks(data: bytes) -> Tuple[List[Tick], bytes]:
+    """Return the ticks of the complete lines, and the incomplete line left over"""
+    lines = data.split(b"\n")
+    remainder = lines.pop()
+    ticks: List[Tick] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        minute, price = line.split(b",")
+        ticks.append((int(minute), float(price)))
+    return ticks, remainder
+
+
+def parse_binary_ticks(data: bytes) -> Tuple[List[Tick], bytes]:
+    """Return the ticks of the complete frames, and the incomplete frame left over"""
+    end = len(data) - len(data) % TICK_FRAME.size
+    return cast(List[Tick], list(TICK_FRAME.iter_unpack(data[:end]))), data[end:]
+
+
+def trade_message(trade_point: TradePoint, tick_offset: int) -> bytes:
+    """A settled trade, and the offset of the tick that settled it, as a JSON line"""
+    return (
+        json.dumps(
+            {
+                "purchase_minute": trade_point.purchase_point.minute,
+                "purchase_price": trade_point.purchase_point.price,
+                "sell_minute": trade_point.sell_point.minute,
+                "sell_price": trade_point.sell_point.price,
+                "profit": trade_point.profit,
+                "tick_offset": tick_offset,
+            }
+        ).encode()
+        + b"\n"
+    )
+
+
+class LiveFeedServer:
+    """
+    asyncio server that runs an OnlineTradingEngine over ticks fed to it live,
+    and publishes the trades as they get settled to the subscribed clients
+
+    One feed at a time is accepted. The ticks read from it at once form a batch,
+    and the batches wait in a bounded queue for the engine: once it is full the
+    feed is not read anymore, so the sender is held back by the socket buffers
+    (i.e. backpressure). When the feed closes, the engine is finished, the last
+    trades and an end message are published, and a new feed can start over.
+    """
+
+    def __init__(
+        self,
+        algorithm_choice: str,
+        min_hold=-1,
+        max_hold=-1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.algorithm_choice: str = algorithm_choice
+        self.min_hold: int = min_hold
+        self.max_hold: int = max_hold
+        self.engine: OnlineTradingEngine = self.new_engine()
+        # Ticks read from the current feed, including the ones the engine dropped
+        self.num_feed_ticks: int = 0
+        self.batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.subscribers: Set[asyncio.StreamWriter] = set()
+        self.feed_connected: bool = False
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.engine_task: Optional[asyncio.Task] = None
+
+    def new_engine(self) -> OnlineTradingEngine:
+        return OnlineTradingEngine(self.algorithm_choice, self.min_hold, self.max_hold)
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.engine_task = asyncio.create_task(self.run_engine())
+        return self.server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        self.server = await asyncio.start_unix_server(self.handle_connection, path)
+        self.engine_task = asyncio.create_task(self.run_engine())
+        return self.server
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.engine_task is not None:
+            self.engine_task.cancel()
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        handshake = await reader.readline()
+        if handshake == SUBSCRIBE_HANDSHAKE:
+            writer.write(HANDSHAKE_OK)
+            await writer.drain()
+            self.subscribers.add(writer)
+            return
+        if handshake not in (FEED_TEXT_HANDSHAKE, FEED_BINARY_HANDSHAKE):
+            writer.write(b"ERROR Unknown handshake " + handshake.strip() + b"\n")
+            writer.close()
+            return
+        if self.feed_connected:
+            writer.write(b"ERROR A feed is already connected\n")
+            writer.close()
+            return
+
+        self.feed_connected = True
+        writer.write(HANDSHAKE_OK)
+        try:
+            await self.read_feed(reader, binary=handshake == FEED_BINARY_HANDSHAKE)
+        except (ValueError, ConnectionError) as ex:
+            logging.warning(f"LiveFeedServer: Feed ended with an error: {ex}")
+            writer.write(f"ERROR {ex}\n".encode())
+        finally:
+            # The end of the feed, the engine settles what is left
+            await self.batches.put(None)
+            self.feed_connected = False
+            writer.close()
+
+    async def read_feed(self, reader: asyncio.StreamReader, binary: bool) -> None:
+        parse = parse_binary_ticks if binary else parse_text_ticks
+        remainder = b""
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                break
+            ticks, remainder = parse(remainder + data)
+            if ticks:
+                # Waits while the queue is full, so the feed is not read meanwhile
+                await self.batches.put(ticks)
+        # Whitespace is a blank line of text, but part of a frame in binary
+        incomplete_tick = remainder if binary else remainder.strip()
+        if incomplete_tick != b"":
+            raise ValueError(f"Feed ended within a tick ({len(remainder)} bytes)")
+
+    async def run_engine(self) -> None:
+        while True:
+            ticks: Optional[List[Tick]] = await self.batches.get()
+            messages: List[bytes] = []
+            if ticks is None:
+                tick_offset = self.num_feed_ticks - 1
+                for trade_point in self.engine.finish():
+                    messages.append(trade_message(trade_point, tick_offset))
+                messages.append(
+                    json.dumps(
+                        {"end": True, "num_ticks": len(self.engine.ticks)}
+                    ).encode()
+                    + b"\n"
+                )
+                self.engine = self.new_engine()
+                self.num_feed_ticks = 0
+            else:
+                engine = self.engine
+                for minute, price in ticks:
+                    # The offset of the tick in the feed, as the sender counts them
+                    tick_offset = self.num_feed_ticks
+                    self.num_feed_ticks += 1
+                    try:
+                        trade_points = engine.on_tick(minute, price)
+                    except ValueError as ex:
+                        logging.warning(f"LiveFeedServer: Dropping tick: {ex}")
+                        continue
+                    if trade_points:
+                        for trade_point in trade_points:
+                            messages.append(trade_message(trade_point, tick_offset))
+            if messages:
+                await self.publish(b"".join(messages))
+
+    async def publish(self, payload: bytes) -> None:
+        """Send to every subscriber, dropping the ones that have disconnected"""
+        subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.write(payload)
+        results = await asyncio.gather(
+            *(subscriber.drain() for subscriber in subscribers), return_exceptions=True
+        )
+        for subscriber, result in zip(subscribers, results):
+            if isinstance(result, Exception):
+                logging.info(f"LiveFeedServer: Dropping subscriber: {result}")
+                self.subscribers.discard(subscriber)
+                subscriber.close()
+
+
+@dataclass
+class ReplayStats:
+    num_ticks: int = 0
+    seconds: float = 0.0
+    trades: List[Tuple[int, int]] = field(default_factory=list)  # (purchase, sell)
+    total_profit: float = 0.0
+    # From sending the tick that settled a trade, to receiving the trade
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.num_ticks / self.seconds if self.seconds else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(int(len(latencies) * percentile), len(latencies) - 1)]
+
+    def format_report(self) -> str:
+        return "\n".join(
+            [
+                f"Replayed {self.num_ticks} ticks in {self.seconds:.3f}s ({self.ticks_per_second:.0f} ticks/s)",
+                f"Received {len(self.trades)} trades, total profit {self.total_profit:.4f}",
+                f"Latency p50={self.latency_percentile(0.5) * 1000:.3f}ms "
+                f"p99={self.latency_percentile(0.99) * 1000:.3f}ms "
+                f"max={self.latency_percentile(1.0) * 1000:.3f}ms",
+            ]
+        )
+
+
+async def open_connection(
+    handshake: bytes,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    unix_path: Optional[str] = None,
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(handshake)
+    response = await reader.readline()
+    if response != HANDSHAKE_OK:
+        writer.close()
+        raise ConnectionError(
+            f"open_connection: Server answered {response.decode().strip()!r}"
+        )
+    return reader, writer
+
+
+async def replay_csv(
+    csv_filename: str,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    unix_path: Optional[str] = None,
+    speed: float = 0.0,
+    binary: bool = False,
+) -> ReplayStats:
+    """
+    Stream a Time,Price CSV file to a LiveFeedServer, at 'speed' ticks per second
+    (or as fast as the server takes them, if 0), while subscribed to its trades
+    Returns the throughput and the latency of the trades, measured end to end
+    """
+    stats = ReplayStats()
+    send_times: array = array("d")  # Of every tick, by its offset in the feed
+
+    subscriber_reader, subscriber_writer = await open_connection(
+        SUBSCRIBE_HANDSHAKE, host, port, unix_path
+    )
+
+    async def receive_trades() -> None:
+        while True:
+            line = await subscriber_reader.readline()
+            if not line:
+                raise ConnectionError("replay_csv: Server closed the subscription")
+            message = json.loads(line)
+            if message.get("end"):
+                return
+            stats.latencies.append(
+                time.perf_counter() - send_times[message["tick_offset"]]
+            )
+            stats.trades.append((message["purchase_minute"], message["sell_minute"]))
+            stats.total_profit += message["profit"]
+
+    # Closed whatever happens, e.g. on a bad line of the file
+    receiver: Optional[asyncio.Task] = None
+    feed_writer: Optional[asyncio.StreamWriter] = None
+    try:
+        receiver = asyncio.create_task(receive_trades())
+        _, feed_writer = await open_connection(
+            FEED_BINARY_HANDSHAKE if binary else FEED_TEXT_HANDSHAKE,
+            host,
+            port,
+            unix_path,
+        )
+
+        start_time = time.perf_counter()
+        for columns in iterate_csv_columns(
+            csv_filename, market_condition_column_translations(), REPLAY_BATCH_SIZE
+        ):
+            if speed:
+                # Hold back until the time this batch is due
+                delay = start_time + stats.num_ticks / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if binary:
+                payload = b"".join(
+                    map(TICK_FRAME.pack, columns["minute"], columns["price"])
+                )
+            else:
+                payload = "".join(
+                    f"{minute},{price!r}\n"
+                    for minute, price in zip(columns["minute"], columns["price"])
+                ).encode()
+            send_time = time.perf_counter()
+            send_times.extend([send_time] * len(columns["minute"]))
+            feed_writer.write(payload)
+            # Waits while the server is not reading, i.e. the backpressure
+            await feed_writer.drain()
+            stats.num_ticks += len(columns["minute"])
+
+        feed_writer.write_eof()
+        await receiver
+        stats.seconds = time.perf_counter() - start_time
+    finally:
+        if receiver is not None:
+            receiver.cancel()
+        if feed_writer is not None:
+            feed_writer.close()
+        subscriber_writer.close()
+    return stats
@@ -0,0 +1,196 @@
+from typing import List, Optional
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+
+from .csv_util import ColumnTranslation
+from .market_series import (
+    MarketSeries,
+    market_condition_column_translations,
+    read_market_series,
+)
+from .result import Result
+
+CACHE_FILE_SUFFIX: str = ".mktcache"
+CACHE_MAGIC: bytes = b"MKTCACHE"
+CACHE_VERSION: int = 1
+
+# magic, version, byte order, number of rows, CSV size, CSV mtime (ns),
+# CSV content hash, CSV path hash, column translations hash
+CACHE_HEADER = struct.Struct("<8sIIQQq32s32s32s")
+LITTLE_ENDIAN: int = 1 if sys.byteorder == "little" else 0
+
+HASH_CHUNK_SIZE: int = 1 << 20
+
+
+def cache_filename_for(csv_filename: str) -> str:
+    return csv_filename + CACHE_FILE_SUFFIX
+
+
+def hash_bytes(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+def hash_file(filename: str) -> bytes:
+    file_hash = hashlib.blake2b(digest_size=32)
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.digest()
+
+
+def hash_column_translations(column_translations: List[ColumnTranslation]) -> bytes:
+    return hash_bytes(
+        repr(
+            [
+                (
+                    translation.column_name,
+                    translation.column_name_xlat,
+                    translation.column_type.__name__,
+                )
+                for translation in column_translations
+            ]
+        ).encode()
+    )
+
+
+def hash_path(csv_filename: str) -> bytes:
+    return hash_bytes(os.path.abspath(csv_filename).encode())
+
+
+def load_cache(
+    csv_filename: str, column_translations: List[ColumnTranslation]
+) -> Optional[MarketSeries]:
+    """
+    Return the cached MarketSeries of the CSV file, memory-mapped from its
+    sidecar cache file, or None if there is no valid cache for it
+
+    The cache is valid if it was made with the same column translations from a
+    file of the same size. If the path or the modification time also match,
+    the file is taken as unchanged, otherwise its content hash must match too.
+    """
+    cache_filename = cache_filename_for(csv_filename)
+    try:
+        csv_stat = os.stat(csv_filename)
+        with open(cache_filename, "rb") as cache_file:
+            header = cache_file.read(CACHE_HEADER.size)
+            if len(header) != CACHE_HEADER.size:
+                return None
+            (
+                magic,
+                version,
+                little_endian,
+                num_rows,
+                csv_size,
+                csv_mtime_ns,
+                content_hash,
+                path_hash,
+                translations_hash,
+            ) = CACHE_HEADER.unpack(header)
+
+            if (
+                magic != CACHE_MAGIC
+                or version != CACHE_VERSION
+                or little_endian != LITTLE_ENDIAN
+                or translations_hash != hash_column_translations(column_translations)
+                or csv_size != csv_stat.st_size
+                or os.fstat(cache_file.fileno()).st_size
+                != CACHE_HEADER.size + 16 * num_rows
+            ):
+                logging.info(f"Cache {cache_filename} does not match, ignoring it")
+                return None
+
+            if (
+                csv_mtime_ns != csv_stat.st_mtime_ns
+                or path_hash != hash_path(csv_filename)
+            ) and content_hash != hash_file(csv_filename):
+                logging.info(f"Cache {cache_filename} is stale, ignoring it")
+                return None
+
+            cache_map = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+
+    # The memoryviews keep the map alive, and nothing is read until it is used
+    column_size = 8 * num_rows
+    buffer = memoryview(cache_map)
+    logging.info(f"Loaded {num_rows} rows from cache {cache_filename}")
+    return MarketSeries.from_buffers(
+        buffer[CACHE_HEADER.size : CACHE_HEADER.size + column_size].cast("q"),
+        buffer[CACHE_HEADER.size + column_size :].cast("d"),
+    )
+
+
+def save_cache(
+    csv_filename: str,
+    column_translations: List[ColumnTranslation],
+    market_series: MarketSeries,
+    csv_stat: os.stat_result,
+) -> bool:
+    """
+    Write the sidecar cache file of the CSV file (atomically)
+    csv_stat is the stat of the CSV file taken before it was parsed, nothing is
+    written if the file has changed since
+    """
+    cache_filename = cache_filename_for(csv_filename)
+    temp_cache_filename = f"{cache_filename}.{os.getpid()}.tmp"
+    try:
+        content_hash = hash_file(csv_filename)
+        if os.stat(csv_filename).st_mtime_ns != csv_stat.st_mtime_ns:
+            logging.info(f"{csv_filename} changed while being read, not caching it")
+            return False
+
+        with open(temp_cache_filename, "wb") as cache_file:
+            cache_file.write(
+                CACHE_HEADER.pack(
+                    CACHE_MAGIC,
+                    CACHE_VERSION,
+                    LITTLE_ENDIAN,
+                    len(market_series),
+                    csv_stat.st_size,
+                    csv_stat.st_mtime_ns,
+                    content_hash,
+                    hash_path(csv_filename),
+                    hash_column_translations(column_translations),
+                )
+            )
+            cache_file.write(memoryview(market_series.minutes).cast("B"))
+            cache_file.write(memoryview(market_series.prices).cast("B"))
+        os.replace(temp_cache_filename, cache_filename)
+    except OSError as ex:
+        logging.info(f"Could not write cache {cache_filename}: {ex}")
+        if os.path.exists(temp_cache_filename):
+            os.remove(temp_cache_filename)
+        return False
+
+    logging.info(f"Wrote {len(market_series)} rows to cache {cache_filename}")
+    return True
+
+
+def read_market_series_cached(
+    csv_filename: str, column_translations: Optional[List[ColumnTranslation]] = None
+) -> Result:
+    """
+    Same as read_market_series, but goes through the sidecar binary cache:
+    a valid cache is memory-mapped instead of parsing the CSV file, otherwise
+    the file is parsed and the cache is (re-)written for the next time
+    """
+    if column_translations is None:
+        column_translations = market_condition_column_translations()
+
+    market_series = load_cache(csv_filename, column_translations)
+    if market_series is not None:
+        return Result(isSuccess=True, message="", result=market_series)
+
+    try:
+        csv_stat = os.stat(csv_filename)
+    except OSError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+
+    result = read_market_series(csv_filename, column_translations)
+    if result.isSuccess:
+        save_cache(csv_filename, column_translations, result.result, csv_stat)
+    return result
@@ -0,0 +1,84 @@
+from array import array
+from typing import Callable, Dict, Iterator
+import math
+import random
+
+from .market_series import MarketSeries
+
+# Length, in minutes, of a tooth of the sawtooth regime
+SAWTOOTH_PERIOD: int = 97
+RANDOM_WALK_VOLATILITY: float = 0.0005
+
+# Rows written per write() call by write_market_csv()
+CSV_WRITE_CHUNK_SIZE: int = 65536
+
+
+def random_walk_prices(num_ticks: int, seed: int) -> Iterator[float]:
+    """Geometric random walk around 1.0"""
+    rng = random.Random(seed)
+    log_price = 0.0
+    for _ in range(num_ticks):
+        yield math.exp(log_price)
+        log_price += rng.gauss(0.0, RANDOM_WALK_VOLATILITY)
+
+
+def decline_prices(num_ticks: int, seed: int) -> Iterator[float]:
+    """
+    Strictly decreasing prices from 2.0 towards 1.0, i.e. no price is ever
+    followed by a higher one, the worst case of the higher and highest algorithms
+    """
+    for minute in range(num_ticks):
+        yield 2.0 - minute / num_ticks
+
+
+def sawtooth_prices(num_ticks: int, seed: int) -> Iterator[float]:
+    """Prices rising from 1.0 to 1.5 over each period, then dropping back"""
+    for minute in range(num_ticks):
+        yield 1.0 + 0.5 * (minute % SAWTOOTH_PERIOD) / SAWTOOTH_PERIOD
+
+
+def flat_prices(num_ticks: int, seed: int) -> Iterator[float]:
+    """The same price throughout, i.e. every comparison is a tie"""
+    for _ in range(num_ticks):
+        yield 1.0
+
+
+REGIMES: Dict[str, Callable[[int, int], Iterator[float]]] = {
+    "random_walk": random_walk_prices,
+    "decline": decline_prices,
+    "sawtooth": sawtooth_prices,
+    "flat": flat_prices,
+}
+
+
+def generate_market_series(regime: str, num_ticks: int, seed: int = 0) -> MarketSeries:
+    """
+    Generate a reproducible series of num_ticks market conditions, one a minute
+    The same regime, size and seed always give the same prices
+    """
+    if regime not in REGIMES:
+        raise ValueError(
+            f"generate_market_series: Found regime '{regime}', expected one of {list(REGIMES)}"
+        )
+    return MarketSeries.from_buffers(
+        array(MarketSeries.MINUTE_TYPECODE, range(num_ticks)),
+        array(MarketSeries.PRICE_TYPECODE, REGIMES[regime](num_ticks, seed)),
+    )
+
+
+def write_market_csv(csv_filename: str, market_series: MarketSeries) -> None:
+    """
+    Write the series as a Time,Price CSV file
+    Prices are written with repr(), so they are read back exactly
+    """
+    minutes, prices = market_series.minutes, market_series.prices
+    with open(csv_filename, "w", encoding="ascii") as csvfile:
+        csvfile.write("Time,Price\n")
+        for start in range(0, len(market_series), CSV_WRITE_CHUNK_SIZE):
+            stop = min(start + CSV_WRITE_CHUNK_SIZE, len(market_series))
+            csvfile.write(
+                "".join(
+                    f"{minutes[offset]},{prices[offset]!r}\n"
+                    for offset in range(start, stop)
+                )
+            )
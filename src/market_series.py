@@ -0,0 +1,176 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple, Union, overload
+
+from .csv_util import ColumnTranslation, CsvReadError, iterate_csv_columns
+from .market_condition import MarketCondition
+from .result import Result
+
+# A column is an array of its own, or a wrapped buffer (see from_buffers())
+Column = Union[array, memoryview]
+
+
+class MarketSeries:
+    """
+    Columnar store of market conditions
+
+    Minutes and prices are kept in two contiguous typed arrays instead of
+    a list of MarketCondition objects. The algorithms read the price array
+    directly, and a MarketCondition is only built when one is asked for
+    (e.g. when a TradePoint is emitted).
+    """
+
+    MINUTE_TYPECODE: str = "q"
+    PRICE_TYPECODE: str = "d"
+
+    def __init__(self, minutes: Iterable[int] = (), prices: Iterable[float] = ()):
+        self.minutes: Column = array(self.MINUTE_TYPECODE, minutes)
+        self.prices: Column = array(self.PRICE_TYPECODE, prices)
+
+        if len(self.minutes) != len(self.prices):
+            raise ValueError(
+                f"MarketSeries: Found {len(self.minutes)} minutes and {len(self.prices)} prices, expected equal lengths"
+            )
+
+    @classmethod
+    def from_buffers(cls, minutes: Column, prices: Column) -> "MarketSeries":
+        """
+        Wrap existing columns (e.g. memoryviews of shared or memory-mapped memory)
+        without copying them
+        """
+        if len(minutes) != len(prices):
+            raise ValueError(
+                f"MarketSeries: Found {len(minutes)} minutes and {len(prices)} prices, expected equal lengths"
+            )
+        market_series = cls()
+        market_series.minutes = minutes
+        market_series.prices = prices
+        return market_series
+
+    @classmethod
+    def from_market_conditions(
+        cls, market_conditions: Iterable[MarketCondition]
+    ) -> "MarketSeries":
+        market_series = cls()
+        market_series.extend(market_conditions)
+        return market_series
+
+    def growable_columns(self) -> Tuple[array, array]:
+        """The columns, which must be arrays (not wrapped buffers) to grow"""
+        minutes, prices = self.minutes, self.prices
+        if not (isinstance(minutes, array) and isinstance(prices, array)):
+            raise TypeError(
+                "MarketSeries: The columns are wrapped buffers, which can not grow"
+            )
+        return minutes, prices
+
+    def append(self, minute: int, price: float) -> None:
+        minutes, prices = self.growable_columns()
+        minutes.append(minute)
+        prices.append(price)
+
+    def extend(self, market_conditions: Iterable[MarketCondition]) -> None:
+        minutes, prices = self.growable_columns()
+        for market_condition in market_conditions:
+            minutes.append(market_condition.minute)
+            prices.append(market_condition.price)
+
+    def extend_columns(self, minutes: Iterable[int], prices: Iterable[float]) -> None:
+        """Append whole columns at once, e.g. the typed arrays of a bulk-parsed chunk"""
+        own_minutes, own_prices = self.growable_columns()
+        num_minutes = len(own_minutes)
+        own_minutes.extend(minutes)
+        own_prices.extend(prices)
+        if len(own_minutes) != len(own_prices):
+            del own_minutes[num_minutes:]
+            del own_prices[num_minutes:]
+            raise ValueError(
+                "MarketSeries: Found columns of unequal lengths, expected equal lengths"
+            )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @overload
+    def __getitem__(self, index: int) -> MarketCondition:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "MarketSeries":
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[MarketCondition, "MarketSeries"]:
+        if isinstance(index, slice):
+            return MarketSeries(self.minutes[index], self.prices[index])
+        return MarketCondition(self.minutes[index], self.prices[index])
+
+    def between_minutes(
+        self, first_minute: Optional[int] = None, last_minute: Optional[int] = None
+    ) -> "MarketSeries":
+        """
+        Return the market conditions from first_minute to last_minute (both
+        included, either one can be left open), found by binary search, so the
+        minutes must be in increasing order
+        Slices of memory-mapped columns are views, nothing outside the range is read
+        """
+        start = 0 if first_minute is None else bisect_left(self.minutes, first_minute)
+        stop = (
+            len(self)
+            if last_minute is None
+            else bisect_right(self.minutes, last_minute, lo=start)
+        )
+        return MarketSeries.from_buffers(
+            self.minutes[start:stop], self.prices[start:stop]
+        )
+
+    def __iter__(self) -> Iterator[MarketCondition]:
+        for minute, price in zip(self.minutes, self.prices):
+            yield MarketCondition(minute, price)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MarketSeries):
+            return NotImplemented
+        return self.minutes == other.minutes and self.prices == other.prices
+
+    def __repr__(self):
+        return f"MarketSeries({len(self)} market conditions)"
+
+
+# Anything the algorithms accept as their input
+MarketData = Union[List[MarketCondition], MarketSeries]
+
+
+def as_market_series(market_data: MarketData) -> MarketSeries:
+    if isinstance(market_data, MarketSeries):
+        return market_data
+    return MarketSeries.from_market_conditions(market_data)
+
+
+def market_condition_column_translations() -> List[ColumnTranslation]:
+    return [
+        ColumnTranslation("Time", "minute", int),
+        ColumnTranslation("Price", "price", float),
+    ]
+
+
+def read_market_series(
+    csv_filename: str, column_translations: Optional[List[ColumnTranslation]] = None
+) -> Result:
+    """
+    Read a Time,Price CSV file into a MarketSeries
+    Chunks of bulk-parsed columns are streamed straight into the series,
+    without building the list of all the rows first
+    The column translations (if given) must translate to 'minute' and 'price'
+    """
+    if column_translations is None:
+        column_translations = market_condition_column_translations()
+
+    market_series = MarketSeries()
+    try:
+        for columns in iterate_csv_columns(csv_filename, column_translations):
+            market_series.extend_columns(columns["minute"], columns["price"])
+    except CsvReadError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    return Result(isSuccess=True, message="", result=market_series)
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+import os
+
+from .csv_util import ColumnTranslation, CsvReadError, iterate_csv_columns
+from .market_series import MarketSeries
+from .result import Result
+from .trade_book import TradeBook
+from .trading_algorithms import TradingAlgorithms
+
+
+def symbol_column_translations() -> List[ColumnTranslation]:
+    return [
+        ColumnTranslation("Symbol", "symbol", str),
+        ColumnTranslation("Time", "minute", int),
+        ColumnTranslation("Price", "price", float),
+    ]
+
+
+def read_symbol_series(
+    csv_filename: str, column_translations: Optional[List[ColumnTranslation]] = None
+) -> Result:
+    """
+    Read a Symbol,Time,Price CSV file, whose rows of the symbols may be
+    interleaved, into a MarketSeries per symbol, in a single streaming pass
+    The column translations (if given) must translate to 'symbol', 'minute' and 'price'
+    On success, the result is a dict of MarketSeries keyed by symbol, in the order
+    the symbols first appear
+    """
+    if column_translations is None:
+        column_translations = symbol_column_translations()
+
+    symbol_series: Dict[str, MarketSeries] = {}
+    try:
+        for columns in iterate_csv_columns(csv_filename, column_translations):
+            for symbol, minute, price in zip(
+                columns["symbol"], columns["minute"], columns["price"]
+            ):
+                market_series = symbol_series.get(symbol)
+                if market_series is None:
+                    market_series = symbol_series[symbol] = MarketSeries()
+                market_series.append(minute, price)
+    except CsvReadError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+
+    logging.info(f"Read {len(symbol_series)} symbols")
+    return Result(isSuccess=True, message="", result=symbol_series)
+
+
+@dataclass(frozen=True)
+class SymbolSummary:
+    symbol: str
+    num_market_conditions: int
+    num_trades: int
+    total_profit: float
+    max_drawdown: float
+
+
+def run_symbol(args: Tuple) -> Tuple[str, TradeBook]:
+    """Run the algorithm over the series of one symbol, in a worker of the pool"""
+    symbol, market_series, algorithm_choice, min_hold, max_hold = args
+    trade_book = TradingAlgorithms(
+        market_series, min_hold=min_hold, max_hold=max_hold
+    ).run_trade_book(algorithm_choice)
+    # Only the offsets are sent back, the parent already has the series
+    trade_book.market_series = MarketSeries()
+    return symbol, trade_book
+
+
+def run_symbols(
+    symbol_series: Dict[str, MarketSeries],
+    algorithm_choice: str,
+    min_hold=-1,
+    max_hold=-1,
+    processes: Optional[int] = None,
+) -> Dict[str, TradeBook]:
+    """
+    Run the algorithm over the series of every symbol, a symbol per task in a
+    process pool, and return the trades of each symbol (in the order of the symbols)
+    """
+    tasks: Iterator[Tuple] = (
+        (symbol, market_series, algorithm_choice, min_hold, max_hold)
+        for symbol, market_series in symbol_series.items()
+    )
+    processes = min(processes or os.cpu_count() or 1, max(len(symbol_series), 1))
+    logging.info(
+        f"run_symbols: {algorithm_choice} over {len(symbol_series)} symbols in {processes} processes"
+    )
+
+    trade_books: Dict[str, TradeBook] = {}
+    if processes == 1:
+        for task in tasks:
+            symbol, trade_book = run_symbol(task)
+            trade_books[symbol] = trade_book
+    else:
+        with Pool(processes) as pool:
+            for symbol, trade_book in pool.imap(run_symbol, tasks):
+                trade_books[symbol] = trade_book
+    for symbol, trade_book in trade_books.items():
+        trade_book.market_series = symbol_series[symbol]
+    return trade_books
+
+
+def summarize_symbols(trade_books: Dict[str, TradeBook]) -> List[SymbolSummary]:
+    return [
+        SymbolSummary(
+            symbol=symbol,
+            num_market_conditions=len(trade_book.market_series),
+            num_trades=len(trade_book),
+            total_profit=trade_book.total_profit(),
+            max_drawdown=trade_book.max_drawdown(),
+        )
+        for symbol, trade_book in trade_books.items()
+    ]
+
+
+def format_symbol_report(summaries: List[SymbolSummary]) -> str:
+    header = (
+        f"{'Symbol':<12} {'Rows':>10} {'Trades':>8} {'Profit':>10} {'Drawdown':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for summary in summaries:
+        lines.append(
+            f"{summary.symbol:<12} {summary.num_market_conditions:>10d} {summary.num_trades:>8d} "
+            f"{summary.total_profit:>10.4f} {summary.max_drawdown:>10.4f}"
+        )
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'Total':<12} {sum(s.num_market_conditions for s in summaries):>10d} "
+        f"{sum(s.num_trades for s in summaries):>8d} "
+        f"{sum(s.total_profit for s in summaries):>10.4f}"
+    )
+    return "\n".join(lines)
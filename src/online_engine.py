@@ -0,0 +1,354 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+
+from .market_condition import MarketCondition
+from .market_series import MarketData
+from .range_max import SlidingWindowMax
+from .trade_point import TradePoint
+from .trading_algorithms import TradingAlgorithms
+
+
+class PriceRingBuffer:
+    """
+    Keeps only the most recent 'capacity' ticks, addressed by their absolute
+    offset (i.e. the offset the tick would have in the whole series)
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.minutes: array = array("q", [0]) * capacity
+        self.prices: array = array("d", [0.0]) * capacity
+        self.num_ticks: int = 0  # Number of ticks ever appended
+
+    def append(self, minute: int, price: float) -> None:
+        if self.num_ticks:
+            last_minute = self.minutes[(self.num_ticks - 1) % self.capacity]
+            if minute <= last_minute:
+                raise ValueError(
+                    f"PriceRingBuffer: Minute {minute} does not follow minute {last_minute}, expected increasing minutes"
+                )
+        slot = self.num_ticks % self.capacity
+        self.minutes[slot] = minute
+        self.prices[slot] = price
+        self.num_ticks += 1
+
+    def __len__(self) -> int:
+        return self.num_ticks
+
+    def slot(self, offset: int) -> int:
+        if not (self.num_ticks - self.capacity <= offset < self.num_ticks):
+            raise IndexError(
+                f"PriceRingBuffer: Offset {offset} is not retained (have {max(0, self.num_ticks - self.capacity)}-{self.num_ticks - 1})"
+            )
+        return offset % self.capacity
+
+    def __getitem__(self, offset: int) -> float:
+        return self.prices[self.slot(offset)]
+
+    def first_at_or_after(self, minute: int, lo: int) -> int:
+        """
+        Return the offset of the first tick at or after 'minute', searched from
+        (retained) offset lo on, like TimeIndex.first_at_or_after() (past the last
+        tick the offsets go on a minute each). The minutes must be increasing.
+        """
+        num_ticks = self.num_ticks
+        if num_ticks == 0:
+            return lo
+        minutes, capacity = self.minutes, self.capacity
+        last_minute = minutes[(num_ticks - 1) % capacity]
+        if minute > last_minute:
+            return num_ticks + minute - last_minute - 1
+        if lo >= num_ticks:
+            return lo
+
+        # The tick is at most that many minutes (offsets) after lo, and exactly
+        # there when there is a tick every minute
+        hi = min(num_ticks, lo + max(minute - minutes[lo % capacity], 0) + 1)
+        if minutes[(hi - 1) % capacity] == minute:
+            return hi - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if minutes[mid % capacity] < minute:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def market_condition(self, offset: int) -> MarketCondition:
+        slot = self.slot(offset)
+        return MarketCondition(self.minutes[slot], self.prices[slot])
+
+
+class OnlineTradingEngine:
+    """
+    Push-based (tick-by-tick) counterpart of TradingAlgorithms
+
+    Every call to on_tick() returns the TradePoints that became final with
+    that tick, and finish() returns the ones that could only be settled at the
+    end of the feed. All together they are the same trades the batch method
+    of the same algorithm returns for the same data.
+
+    Only a ring buffer of about max_hold ticks is kept in memory. The hold
+    times are resolved on the minutes (see TimeIndex), which must increase
+    from tick to tick.
+    """
+
+    @classmethod
+    def ALGORITHMS(cls) -> Dict:
+        algorithms = OrderedDict()
+        algorithms["adjacent"] = cls.step_buy_sell_adjacent_low_highs
+        algorithms["highest"] = cls.step_purchase_next_highest
+        algorithms["higher"] = cls.step_purchase_next_higher
+        algorithms["max"] = cls.step_purchase_max
+        return algorithms
+
+    def __init__(self, algorithm_choice: str, min_hold=-1, max_hold=-1):
+        self.min_hold, self.max_hold = TradingAlgorithms.resolve_hold_times(
+            min_hold, max_hold
+        )
+        self.algorithm_choice: str = algorithm_choice
+        self.step: Callable = self.ALGORITHMS()[algorithm_choice]
+
+        # Offsets from curr_offset up to curr_offset + max_hold + 1 are needed
+        self.ticks: PriceRingBuffer = PriceRingBuffer(self.max_hold + 2)
+        self.window_max: SlidingWindowMax = SlidingWindowMax(self.ticks)
+        self.curr_offset: int = 0
+        # The "highest" algorithm waits here while the prices keep increasing
+        self.pending_sell_offset: Optional[int] = None
+        self.settled_trade_points: List[TradePoint] = []
+        self.finished: bool = False
+
+        logging.debug(
+            f"OnlineTradingEngine: {algorithm_choice} Min hold time={self.min_hold} Max hold time={self.max_hold}"
+        )
+
+    def on_tick(self, minute: int, price: float) -> List[TradePoint]:
+        if self.finished:
+            raise ValueError("OnlineTradingEngine: on_tick() called after finish()")
+        self.ticks.append(minute, price)
+        return self.settle(final=False)
+
+    def finish(self) -> List[TradePoint]:
+        """Settle whatever is left, now that the number of ticks is known"""
+        if self.finished:
+            return []
+        self.finished = True
+        return self.settle(final=True)
+
+    def run(self, market_conditions: MarketData) -> List[TradePoint]:
+        """Feed a whole series through the engine, e.g. to replay historic data"""
+        trade_points: List[TradePoint] = []
+        for market_condition in market_conditions:
+            trade_points.extend(
+                self.on_tick(market_condition.minute, market_condition.price)
+            )
+        trade_points.extend(self.finish())
+        return trade_points
+
+    def get_state(self) -> Dict:
+        """
+        The state of the engine in between two ticks, as plain values (e.g. to be
+        saved as JSON), from which from_state() carries on exactly where it was
+        """
+        if self.finished:
+            raise ValueError("OnlineTradingEngine: get_state() called after finish()")
+        first_offset = max(0, len(self.ticks) - self.ticks.capacity)
+        retained_slots = [
+            self.ticks.slot(offset) for offset in range(first_offset, len(self.ticks))
+        ]
+        return {
+            "algorithm": self.algorithm_choice,
+            "min_hold": self.min_hold,
+            "max_hold": self.max_hold,
+            "first_offset": first_offset,
+            "minutes": [self.ticks.minutes[slot] for slot in retained_slots],
+            "prices": [self.ticks.prices[slot] for slot in retained_slots],
+            "curr_offset": self.curr_offset,
+            "pending_sell_offset": self.pending_sell_offset,
+            "window_next_offset": self.window_max.next_offset,
+            "window_candidates": list(self.window_max.candidates),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "OnlineTradingEngine":
+        engine = cls(state["algorithm"], state["min_hold"], state["max_hold"])
+        engine.ticks.num_ticks = state["first_offset"]
+        for minute, price in zip(state["minutes"], state["prices"]):
+            engine.ticks.append(minute, price)
+        engine.curr_offset = state["curr_offset"]
+        engine.pending_sell_offset = state["pending_sell_offset"]
+        engine.window_max.next_offset = state["window_next_offset"]
+        engine.window_max.candidates.extend(state["window_candidates"])
+        return engine
+
+    def settle(self, *, final: bool) -> List[TradePoint]:
+        self.settled_trade_points = []
+        while self.step(self, final):
+            pass
+        return self.settled_trade_points
+
+    def add_trade(self, purchase_offset: int, sell_offset: int) -> None:
+        trade_point = TradePoint(
+            purchase_point=self.ticks.market_condition(purchase_offset),
+            sell_point=self.ticks.market_condition(sell_offset),
+            purchase_offset=purchase_offset,
+            sell_offset=sell_offset,
+        )
+        logging.debug(f"OnlineTradingEngine: Settled {trade_point}")
+        self.settled_trade_points.append(trade_point)
+
+    def sell_window(self, *, final: bool) -> Tuple[int, int]:
+        """
+        Return [purchase_range_min, purchase_range_max) of the current minute, as
+        TimeIndex.sell_window() does. Until the ticks received tell where an end
+        is, it is past len(self.ticks), and purchase_range_max is only capped at
+        len(self.ticks) when final.
+        """
+        ticks = self.ticks
+        minutes, capacity = ticks.minutes, ticks.capacity
+        curr_offset, last_offset = self.curr_offset, ticks.num_ticks - 1
+        curr_minute = minutes[curr_offset % capacity]
+        if minutes[last_offset % capacity] - curr_minute == last_offset - curr_offset:
+            # A tick every minute since the current one, the offsets are the minutes
+            purchase_range_min = curr_offset + self.min_hold + 1
+            purchase_range_max = curr_offset + self.max_hold + 1
+        else:
+            purchase_range_min = ticks.first_at_or_after(
+                curr_minute + self.min_hold + 1, curr_offset + 1
+            )
+            purchase_range_max = ticks.first_at_or_after(
+                curr_minute + self.max_hold + 1,
+                min(purchase_range_min, ticks.num_ticks),
+            )
+        if final:
+            purchase_range_max = min(purchase_range_max, ticks.num_ticks)
+        return (purchase_range_min, purchase_range_max)
+
+    # Each step_* method below makes at most one decision of its batch
+    # counterpart in TradingAlgorithms. It returns False when the decision
+    # has to wait for more ticks (or, when final, when the batch loop would end).
+
+    def step_buy_sell_adjacent_low_highs(self, final: bool) -> bool:
+        if self.curr_offset >= len(self.ticks):
+            return False
+        sell_offset, purchase_range_max = self.sell_window(final=final)
+        if sell_offset >= len(self.ticks):
+            return False
+
+        if (
+            sell_offset < purchase_range_max
+            and self.ticks[self.curr_offset] < self.ticks[sell_offset]
+        ):
+            self.add_trade(self.curr_offset, sell_offset)
+            self.curr_offset = sell_offset + 1
+        else:
+            self.curr_offset += 1
+        return True
+
+    def step_purchase_max(self, final: bool) -> bool:
+        if self.curr_offset >= len(self.ticks):
+            return False
+        purchase_range_min, purchase_range_max = self.sell_window(final=final)
+        if final:
+            if purchase_range_min > len(self.ticks):
+                return False
+        elif purchase_range_max > len(self.ticks):
+            return False
+
+        max_price_offset, max_price = self.window_max.query(
+            purchase_range_min, purchase_range_max
+        )
+        if max_price > self.ticks[self.curr_offset]:
+            self.add_trade(self.curr_offset, max_price_offset)
+            self.curr_offset = max_price_offset + 1
+        else:
+            self.curr_offset += 1
+        return True
+
+    def find_first_greater(
+        self, purchase_range_min: int, purchase_range_max: int, *, final: bool
+    ) -> Optional[int]:
+        """
+        Return the first offset in the sell window priced above the current
+        minute, SlidingWindowMax.NOT_FOUND if there is none in the complete
+        window, or None if more ticks are needed to tell
+        """
+        available_range_max = min(purchase_range_max, len(self.ticks))
+        # Nothing of the window received yet (but a window that a gap in the
+        # minutes left empty is complete)
+        if purchase_range_min >= available_range_max < purchase_range_max:
+            return None
+
+        curr_price = self.ticks[self.curr_offset]
+        max_price_offset, max_price = self.window_max.query(
+            purchase_range_min, available_range_max
+        )
+        if max_price > curr_price:
+            # The first greater price is at or before the maximum. Everything
+            # scanned here is behind the next sell window, so it is not rescanned.
+            for i in range(purchase_range_min, max_price_offset + 1):
+                if self.ticks[i] > curr_price:
+                    return i
+
+        if available_range_max == purchase_range_max:
+            return SlidingWindowMax.NOT_FOUND
+        return None
+
+    def step_purchase_next_higher(self, final: bool) -> bool:
+        if self.curr_offset >= len(self.ticks):
+            return False
+        purchase_range_min, purchase_range_max = self.sell_window(final=final)
+        if purchase_range_min > len(self.ticks):
+            return False
+
+        first_greater_price_offset = self.find_first_greater(
+            purchase_range_min, purchase_range_max, final=final
+        )
+        if first_greater_price_offset is None:
+            return False
+
+        if first_greater_price_offset != SlidingWindowMax.NOT_FOUND:
+            self.add_trade(self.curr_offset, first_greater_price_offset)
+            self.curr_offset = first_greater_price_offset + 1
+        else:
+            self.curr_offset += 1
+        return True
+
+    def step_purchase_next_highest(self, final: bool) -> bool:
+        if self.pending_sell_offset is not None:
+            # Keep following the non-decreasing run, within the sell window
+            _, purchase_range_max = self.sell_window(final=final)
+            sell_offset = self.pending_sell_offset
+            while (
+                sell_offset + 1 < min(purchase_range_max, len(self.ticks))
+                and self.ticks[sell_offset + 1] >= self.ticks[sell_offset]
+            ):
+                sell_offset += 1
+            self.pending_sell_offset = sell_offset
+            if sell_offset + 1 == len(self.ticks) < purchase_range_max:
+                return False  # The run may still continue
+
+            self.add_trade(self.curr_offset, sell_offset)
+            self.curr_offset = sell_offset + 1
+            self.pending_sell_offset = None
+            return True
+
+        if self.curr_offset >= len(self.ticks):
+            return False
+        purchase_range_min, purchase_range_max = self.sell_window(final=final)
+        if purchase_range_min > len(self.ticks):
+            return False
+
+        first_greater_price_offset = self.find_first_greater(
+            purchase_range_min, purchase_range_max, final=final
+        )
+        if first_greater_price_offset is None:
+            return False
+
+        if first_greater_price_offset != SlidingWindowMax.NOT_FOUND:
+            self.pending_sell_offset = first_greater_price_offset
+        else:
+            self.curr_offset += 1
+        return True
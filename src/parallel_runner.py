@@ -0,0 +1,267 @@
+from bisect import bisect_left
+from itertools import islice
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+import logging
+import operator
+import os
+
+from .market_series import MarketData, MarketSeries, as_market_series
+from .trade_book import TradeBook
+from .trade_point import TradePoint
+from .trading_algorithms import TradingAlgorithms
+
+# Algorithms whose only state is the current offset, and which resume right after
+# the sold minute after every trade. Runs of these can be stitched together.
+STITCHABLE_ALGORITHMS: Tuple[str, ...] = (
+    "adjacent",
+    "minmax",
+    "highest",
+    "higher",
+    "max",
+)
+
+# Chunks shorter than this many sell windows are not worth a process
+MIN_CHUNK_WINDOWS: int = 64
+# Length (in sell windows) of the first sequential probe used to re-synchronize a chunk
+PROBE_WINDOWS: int = 4
+
+Trades = List[Tuple[int, int]]  # (purchase offset, sell offset) pairs
+
+
+def run_on_range(
+    market_series: MarketSeries,
+    algorithm_choice: str,
+    min_hold: int,
+    max_hold: int,
+    range_min: int,
+    range_max: int,
+) -> Trades:
+    """
+    Run the algorithm as if the series started at range_min, and return the
+    (absolute) offsets of the trades purchased before range_max
+    The series is overlapped by max_hold past range_max, so that each of those
+    decisions sees exactly the prices it would see in a run over the whole series
+    """
+    slice_max = min(range_max + max_hold + 1, len(market_series))
+    trading_algorithms = TradingAlgorithms(
+        MarketSeries.from_buffers(
+            market_series.minutes[range_min:slice_max],
+            market_series.prices[range_min:slice_max],
+        ),
+        min_hold=min_hold,
+        max_hold=max_hold,
+    )
+    trade_book = trading_algorithms.run_trade_book(algorithm_choice)
+    trades: Trades = []
+    for purchase_offset, sell_offset in zip(
+        trade_book.purchase_offsets, trade_book.sell_offsets
+    ):
+        if purchase_offset + range_min >= range_max:
+            break
+        trades.append((purchase_offset + range_min, sell_offset + range_min))
+    return trades
+
+
+def run_chunk_in_shared_memory(args: Tuple) -> Trades:
+    (
+        shared_memory_name,
+        num_market_conditions,
+        algorithm_choice,
+        min_hold,
+        max_hold,
+        range_min,
+        range_max,
+    ) = args
+
+    # The price and minute columns are attached to, not pickled
+    shared_memory = SharedMemory(name=shared_memory_name)
+    try:
+        column_size = num_market_conditions * 8
+        minutes = shared_memory.buf[column_size : 2 * column_size].cast("q")
+        prices = shared_memory.buf[:column_size].cast("d")
+        trades = run_on_range(
+            MarketSeries.from_buffers(minutes, prices),
+            algorithm_choice,
+            min_hold,
+            max_hold,
+            range_min,
+            range_max,
+        )
+        minutes.release()
+        prices.release()
+        return trades
+    finally:
+        shared_memory.close()
+
+
+def covering_trade(trades: Trades, purchase_offsets: List[int], offset: int) -> int:
+    """
+    Return the sell offset of the trade held over 'offset' (i.e. purchased before
+    it and sold at or after it), or -1 if the run with these trades visits 'offset'
+    """
+    i = bisect_left(purchase_offsets, offset) - 1
+    if i >= 0 and trades[i][1] >= offset:
+        return trades[i][1]
+    return -1
+
+
+def stitch_chunk(
+    market_series: MarketSeries,
+    algorithm_choice: str,
+    min_hold: int,
+    max_hold: int,
+    entry_offset: int,
+    range_max: int,
+    chunk_trades: Trades,
+) -> Trades:
+    """
+    Return the trades of the sequential run within [entry_offset, range_max),
+    given the trades of the run that started at the beginning of this chunk
+
+    Both runs only depend on the current offset, so they make the same trades
+    from the first offset that both of them visit. If the chunk run does not visit
+    entry_offset, the sequential run is probed from there until the two meet.
+    """
+    # Near the end of the series the runs stop early, so whether an offset is
+    # visited there can not be told from the trades alone
+    converge_max = len(market_series) - max_hold - 2
+    chunk_purchase_offsets = [purchase_offset for purchase_offset, _ in chunk_trades]
+
+    if (
+        entry_offset < converge_max
+        and covering_trade(chunk_trades, chunk_purchase_offsets, entry_offset) == -1
+    ):
+        return [trade for trade in chunk_trades if trade[0] >= entry_offset]
+
+    probe_length = PROBE_WINDOWS * (max_hold + 2)
+    while True:
+        probe_max = min(entry_offset + probe_length, range_max)
+        probe_trades = run_on_range(
+            market_series, algorithm_choice, min_hold, max_hold, entry_offset, probe_max
+        )
+        probe_purchase_offsets = [
+            purchase_offset for purchase_offset, _ in probe_trades
+        ]
+
+        offset = entry_offset
+        while offset < min(probe_max, converge_max):
+            sell_offset = max(
+                covering_trade(probe_trades, probe_purchase_offsets, offset),
+                covering_trade(chunk_trades, chunk_purchase_offsets, offset),
+            )
+            if sell_offset == -1:
+                logging.debug(
+                    f"stitch_chunk: Runs from {entry_offset} and from the chunk meet at {offset}"
+                )
+                return [trade for trade in probe_trades if trade[0] < offset] + [
+                    trade for trade in chunk_trades if trade[0] >= offset
+                ]
+            offset = sell_offset + 1
+
+        if probe_max == range_max:
+            return probe_trades
+        probe_length *= 2
+
+
+def run_parallel(
+    market_data: MarketData,
+    algorithm_choice: str,
+    min_hold=-1,
+    max_hold=-1,
+    processes: Optional[int] = None,
+    num_chunks: Optional[int] = None,
+) -> List[TradePoint]:
+    """
+    Split the series into chunks, run the algorithm over each of them in a process
+    pool (with the prices in shared memory), and stitch the chunks' trades into
+    exactly the trades of a sequential run
+    Algorithms that can not be stitched, small series, and series whose minutes
+    are not in increasing order, are run sequentially
+    """
+    market_series = as_market_series(market_data)
+    min_hold, max_hold = TradingAlgorithms.resolve_hold_times(min_hold, max_hold)
+    processes = processes or os.cpu_count() or 1
+    num_market_conditions = len(market_series)
+
+    if num_chunks:
+        chunk_size = max(-(-num_market_conditions // num_chunks), 1)
+    else:
+        chunk_size = max(
+            -(-num_market_conditions // processes), MIN_CHUNK_WINDOWS * (max_hold + 2)
+        )
+
+    # Unordered minutes have the hold times counted in ticks over the whole series
+    # (see TimeIndex), which a chunk of increasing minutes would not do
+    minutes = market_series.minutes
+    if (
+        algorithm_choice not in STITCHABLE_ALGORITHMS
+        or processes == 1
+        or chunk_size >= num_market_conditions
+        or not all(map(operator.lt, minutes, islice(minutes, 1, None)))
+    ):
+        logging.info(f"run_parallel: Running {algorithm_choice} sequentially")
+        return TradingAlgorithms(market_series, min_hold, max_hold).run(
+            algorithm_choice
+        )
+
+    chunks = [
+        (range_min, min(range_min + chunk_size, num_market_conditions))
+        for range_min in range(0, num_market_conditions, chunk_size)
+    ]
+    logging.info(
+        f"run_parallel: Running {algorithm_choice} over {len(chunks)} chunks in {processes} processes"
+    )
+
+    column_size = num_market_conditions * 8
+    shared_memory = SharedMemory(create=True, size=2 * column_size)
+    try:
+        shared_memory.buf[:column_size] = memoryview(market_series.prices).cast("B")
+        shared_memory.buf[column_size : 2 * column_size] = memoryview(
+            market_series.minutes
+        ).cast("B")
+        with Pool(processes) as pool:
+            all_chunk_trades: List[Trades] = pool.map(
+                run_chunk_in_shared_memory,
+                [
+                    (
+                        shared_memory.name,
+                        num_market_conditions,
+                        algorithm_choice,
+                        min_hold,
+                        max_hold,
+                        range_min,
+                        range_max,
+                    )
+                    for range_min, range_max in chunks
+                ],
+            )
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+    # Stitch the chunks in order, each one entered where the previous one left off
+    trades: Trades = []
+    entry_offset = 0
+    for (range_min, range_max), chunk_trades in zip(chunks, all_chunk_trades):
+        if entry_offset >= range_max:
+            continue  # The previous trade is held over this whole chunk
+        trades.extend(
+            stitch_chunk(
+                market_series,
+                algorithm_choice,
+                min_hold,
+                max_hold,
+                entry_offset,
+                range_max,
+                chunk_trades,
+            )
+        )
+        entry_offset = max(range_max, trades[-1][1] + 1 if trades else 0)
+
+    return TradeBook(
+        market_series,
+        (purchase_offset for purchase_offset, _ in trades),
+        (sell_offset for _, sell_offset in trades),
+    ).trade_points()
@@ -0,0 +1,101 @@
+from array import array
+from typing import List, Sequence
+
+
+class PriceIndex:
+    """
+    Precomputed index over a price series answering the two questions asked
+    by the "higher" and "highest" algorithms:
+
+    - first_greater(): the first offset at or after a given offset whose price
+      is greater than a given price. The next-greater-element of every offset
+      forms a forest (prices strictly increase towards the roots), and each
+      offset also keeps a skew-binary jump pointer into its ancestors, so the
+      search takes O(log n) steps.
+    - run_end(): the end of the non-decreasing run starting at an offset,
+      in O(1).
+
+    Building it is O(n) time and memory.
+    """
+
+    NOT_FOUND: int = -1
+
+    def __init__(self, prices: Sequence[float]):
+        self.prices: Sequence[float] = prices
+
+        num_prices = len(prices)
+        self.next_greater: array = array("q", [self.NOT_FOUND]) * num_prices
+        self.jump: array = array("q", range(num_prices))
+        self.non_decreasing_run_end: array = array("q", range(num_prices))
+
+        depth = array("q", [0]) * num_prices
+        run_end = self.non_decreasing_run_end
+        stack: List[int] = []
+        for offset in range(num_prices - 1, -1, -1):
+            price = prices[offset]
+
+            while stack and prices[stack[-1]] <= price:
+                stack.pop()
+            if stack:
+                parent = stack[-1]
+                self.next_greater[offset] = parent
+                depth[offset] = depth[parent] + 1
+                parent_jump = self.jump[parent]
+                if (
+                    depth[parent] - depth[parent_jump]
+                    == depth[parent_jump] - depth[self.jump[parent_jump]]
+                ):
+                    self.jump[offset] = self.jump[parent_jump]
+                else:
+                    self.jump[offset] = parent
+            stack.append(offset)
+
+            if offset + 1 < num_prices and prices[offset + 1] >= price:
+                run_end[offset] = run_end[offset + 1]
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def first_greater(self, start: int, price: float) -> int:
+        """
+        Return the first offset >= start with a price greater than 'price',
+        or NOT_FOUND
+        """
+        if start >= len(self.prices):
+            return self.NOT_FOUND
+
+        prices = self.prices
+        next_greater = self.next_greater
+        jump = self.jump
+
+        offset = start
+        if prices[offset] > price:
+            return offset
+        # Climb the next-greater chain while prices stay <= 'price'
+        while True:
+            parent = next_greater[offset]
+            if parent == self.NOT_FOUND or prices[parent] > price:
+                return parent
+            if prices[jump[offset]] <= price:
+                offset = jump[offset]
+            else:
+                offset = parent
+
+    def first_greater_in_range(
+        self, range_min: int, range_max: int, price: float
+    ) -> int:
+        """
+        Return the first offset in [range_min, range_max) with a price
+        greater than 'price', or NOT_FOUND
+        """
+        offset = self.first_greater(range_min, price)
+        if offset >= range_max:
+            return self.NOT_FOUND
+        return offset
+
+    def run_end(self, start: int) -> int:
+        """
+        Return the last offset of the non-decreasing run of prices that
+        starts at 'start'
+        """
+        return self.non_decreasing_run_end[start]
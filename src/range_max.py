@@ -0,0 +1,115 @@
+from array import array
+from collections import deque
+from typing import Deque, List, Protocol, Sequence, Tuple
+
+
+class Prices(Protocol):
+    """Prices addressed by offset, e.g. a Sequence or a PriceRingBuffer"""
+
+    def __getitem__(self, offset: int) -> float:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+class SlidingWindowMax:
+    """
+    Answers "maximum price in [range_min, range_max)" for a sequence of
+    windows whose both ends only move forward.
+
+    A monotonic deque of offsets is kept, whose prices never increase from
+    front to back. Every offset is pushed and popped at most once, so the
+    cost over the whole series is amortized O(n), however wide the windows are.
+
+    Ties resolve to the earliest offset (i.e. the same offset a left-to-right
+    scan with a strict '>' comparison would pick).
+    """
+
+    NOT_FOUND: int = -1
+
+    def __init__(self, prices: Prices):
+        self.prices: Prices = prices
+        self.candidates: Deque[int] = deque()
+        self.next_offset: int = 0  # The next offset to be pushed into the deque
+
+    def query(self, range_min: int, range_max: int) -> Tuple[int, float]:
+        """
+        Return (offset, price) of the maximum in [range_min, range_max), or
+        (NOT_FOUND, 0.0) if the window is empty
+        range_min and range_max must not decrease between the calls
+        """
+        prices = self.prices
+        candidates = self.candidates
+
+        # The window jumped past everything seen so far, start afresh
+        if self.next_offset < range_min:
+            candidates.clear()
+            self.next_offset = range_min
+
+        # Slide the left end first, so that only the offsets within the window
+        # are ever looked up (lets 'prices' be a ring buffer of recent prices)
+        while candidates and candidates[0] < range_min:
+            candidates.popleft()
+
+        # Slide the right end
+        while self.next_offset < range_max:
+            price = prices[self.next_offset]
+            while candidates and prices[candidates[-1]] < price:
+                candidates.pop()
+            candidates.append(self.next_offset)
+            self.next_offset += 1
+
+        if not candidates:
+            return (self.NOT_FOUND, 0.0)
+        return (candidates[0], prices[candidates[0]])
+
+
+class SparseTableMax:
+    """
+    Static range-maximum table over the whole price series
+
+    It takes O(n log n) time and memory to build, and then answers the maximum
+    of any [range_min, range_max) in O(1). Unlike SlidingWindowMax it keeps no
+    state between the queries, so one table can be shared by any number of runs
+    (e.g. over different hold times). Ties resolve to the earliest offset.
+    """
+
+    NOT_FOUND: int = -1
+
+    def __init__(self, prices: Sequence[float]):
+        self.prices: Sequence[float] = prices
+
+        # levels[k][i] is the offset of the maximum in [i, i + 2**k)
+        self.levels: List[array] = [array("q", range(len(prices)))]
+        width = 1
+        while 2 * width <= len(prices):
+            previous = self.levels[-1]
+            self.levels.append(
+                array(
+                    "q",
+                    (
+                        left if prices[left] >= prices[right] else right
+                        for left, right in zip(previous, previous[width:])
+                    ),
+                )
+            )
+            width *= 2
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def query(self, range_min: int, range_max: int) -> Tuple[int, float]:
+        """
+        Return (offset, price) of the maximum in [range_min, range_max), or
+        (NOT_FOUND, 0.0) if the window is empty
+        """
+        if range_min >= range_max:
+            return (self.NOT_FOUND, 0.0)
+
+        prices = self.prices
+        level = (range_max - range_min).bit_length() - 1
+        left = self.levels[level][range_min]
+        right = self.levels[level][range_max - (1 << level)]
+        offset = left if prices[left] >= prices[right] else right
+        return (offset, prices[offset])
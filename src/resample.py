@@ -0,0 +1,186 @@
+from itertools import groupby
+from operator import mul
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+from .csv_util import ColumnTranslation, CsvReadError, iterate_csv_columns
+from .market_series import MarketSeries
+from .result import Result
+
+# What a bar is priced at: the open/high/low/close or the volume-weighted average
+# of the prices of its ticks, or the close of the midpoints of their Bid and Ask
+BAR_PRICES: Tuple[str, ...] = ("open", "high", "low", "close", "vwap", "mid")
+DEFAULT_BAR_PRICE: str = "close"
+SECONDS_PER_MINUTE: int = 60
+
+
+def tick_column_translations(
+    bar_price: str = DEFAULT_BAR_PRICE,
+) -> List[ColumnTranslation]:
+    """
+    Columns of a raw tick file: Time (in seconds, possibly fractional) and Price,
+    with a Volume for 'vwap', or Time, Bid and Ask for 'mid'
+    """
+    if bar_price == "mid":
+        return [
+            ColumnTranslation("Time", "second", float),
+            ColumnTranslation("Bid", "bid", float),
+            ColumnTranslation("Ask", "ask", float),
+        ]
+    column_translations = [
+        ColumnTranslation("Time", "second", float),
+        ColumnTranslation("Price", "price", float),
+    ]
+    if bar_price == "vwap":
+        column_translations.append(ColumnTranslation("Volume", "volume", float))
+    return column_translations
+
+
+class BarResampler:
+    """
+    Collapses a stream of raw ticks, in time order, into bars of bar_minutes
+
+    The ticks are added a chunk of columns at a time (e.g. as bulk-parsed), and
+    every completed bar is appended to market_series, at the minute it starts.
+    Only the bar being built is kept meanwhile, and a chunk is grouped into its
+    bars in bulk (the aggregates are taken over slices of its columns).
+    Minutes without any tick get no bar at all, i.e. the series has gaps, which
+    the algorithms handle (see TimeIndex).
+    """
+
+    def __init__(self, bar_price: str = DEFAULT_BAR_PRICE, bar_minutes: int = 1):
+        if bar_price not in BAR_PRICES:
+            raise ValueError(
+                f"BarResampler: Unknown bar price '{bar_price}', expected one of {', '.join(BAR_PRICES)}"
+            )
+        if bar_minutes < 1:
+            raise ValueError(
+                f"BarResampler: Found {bar_minutes} minutes a bar, expected at least 1"
+            )
+        self.bar_price: str = bar_price
+        self.bar_minutes: int = bar_minutes
+        self.bar_seconds: int = bar_minutes * SECONDS_PER_MINUTE
+        self.market_series: MarketSeries = MarketSeries()
+        self.num_ticks: int = 0
+
+        # The bar being built (bar is its number, i.e. its minute // bar_minutes)
+        self.bar: Optional[int] = None
+        self.open: float = 0.0
+        self.high: float = 0.0
+        self.low: float = 0.0
+        self.close: float = 0.0
+        self.price_volume: float = 0.0
+        self.volume: float = 0.0
+
+    def add_ticks(
+        self,
+        seconds: Sequence[float],
+        prices: Sequence[float],
+        volumes: Optional[Sequence[float]] = None,
+    ) -> None:
+        """
+        Add a chunk of ticks: their times in seconds, and their prices (the
+        midpoints of the quotes for 'mid'), and their volumes for 'vwap'
+        Raises ValueError if a tick is in an earlier bar than the one before it
+        """
+        bar_price = self.bar_price
+        if bar_price == "vwap":
+            if volumes is None:
+                raise ValueError("BarResampler: The volumes are needed for 'vwap' bars")
+        else:
+            volumes = None
+        bar_seconds = self.bar_seconds
+        bars = [int(second // bar_seconds) for second in seconds]
+
+        start = 0
+        for bar, bar_ticks in groupby(bars):
+            stop = start + len(list(bar_ticks))
+            if bar != self.bar:
+                if self.bar is not None:
+                    if bar < self.bar:
+                        raise ValueError(
+                            f"BarResampler: Tick at second {seconds[start]} is before the bar at minute {self.bar * self.bar_minutes}, expected ticks in time order"
+                        )
+                    self.append_bar(self.bar)
+                self.bar = bar
+                self.open = prices[start]
+                self.high = self.low = prices[start]
+                self.price_volume = self.volume = 0.0
+
+            # Only the aggregate the bar is priced at is kept up to date
+            self.close = prices[stop - 1]
+            if bar_price == "high":
+                self.high = max(self.high, max(prices[start:stop]))
+            elif bar_price == "low":
+                self.low = min(self.low, min(prices[start:stop]))
+            elif volumes is not None:
+                bar_volumes = volumes[start:stop]
+                self.price_volume += sum(map(mul, prices[start:stop], bar_volumes))
+                self.volume += sum(bar_volumes)
+            start = stop
+        self.num_ticks += len(bars)
+
+    def append_bar(self, bar: int) -> None:
+        if self.bar_price == "open":
+            price = self.open
+        elif self.bar_price == "high":
+            price = self.high
+        elif self.bar_price == "low":
+            price = self.low
+        elif self.bar_price == "vwap" and self.volume > 0:
+            price = self.price_volume / self.volume
+        else:
+            # A bar without any volume is priced at its close
+            price = self.close
+        self.market_series.append(bar * self.bar_minutes, price)
+
+    def finish(self) -> MarketSeries:
+        """Complete the last bar, and return the series of all the bars"""
+        if self.bar is not None:
+            self.append_bar(self.bar)
+            self.bar = None
+        return self.market_series
+
+
+def read_resampled_series(
+    csv_filename: str,
+    bar_price: str = DEFAULT_BAR_PRICE,
+    bar_minutes: int = 1,
+    column_translations: Optional[List[ColumnTranslation]] = None,
+) -> Result:
+    """
+    Read a raw tick CSV file (see tick_column_translations) into a MarketSeries of
+    bars, in a single streaming pass: the chunks of bulk-parsed ticks are resampled
+    as they are read, without keeping the ticks nor writing the bars out
+    The column translations (if given) must translate to 'second' and 'price'
+    (and 'volume' for 'vwap'), or to 'second', 'bid' and 'ask' for 'mid'
+    """
+    try:
+        resampler = BarResampler(bar_price, bar_minutes)
+    except ValueError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    if column_translations is None:
+        column_translations = tick_column_translations(bar_price)
+
+    prices: Sequence[float]
+    try:
+        for columns in iterate_csv_columns(csv_filename, column_translations):
+            if bar_price == "mid":
+                prices = [
+                    (bid + ask) / 2 for bid, ask in zip(columns["bid"], columns["ask"])
+                ]
+            else:
+                prices = columns["price"]
+            resampler.add_ticks(columns["second"], prices, columns.get("volume"))
+    except CsvReadError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    except ValueError as ex:
+        return Result(
+            isSuccess=False, message=f"File: {csv_filename} Error: {ex}", result=None
+        )
+
+    market_series = resampler.finish()
+    logging.info(
+        f"Resampled {resampler.num_ticks} ticks into {len(market_series)} bars of {bar_minutes} minutes"
+    )
+    return Result(isSuccess=True, message="", result=market_series)
@@ -0,0 +1,198 @@
+from array import array
+from typing import Optional, Tuple
+import logging
+import os
+import sqlite3
+
+from .market_cache import hash_bytes, hash_file
+from .trade_book import TradeBook
+from .trading_algorithms import TradingAlgorithms
+
+DEFAULT_MAX_BYTES: int = 256 << 20
+CONNECT_TIMEOUT_SECONDS: float = 30.0
+# The results are stamped with a counter of their uses, rather than a clock
+NEXT_USE: str = "SELECT COALESCE(MAX(last_used), 0) + 1 FROM results"
+
+RESULT_CACHE_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS results (
+    data_hash BLOB NOT NULL,
+    algorithm TEXT NOT NULL,
+    algorithm_version INTEGER NOT NULL,
+    min_hold INTEGER NOT NULL,
+    max_hold INTEGER NOT NULL,
+    trade_minutes BLOB NOT NULL,
+    trade_prices BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (data_hash, algorithm, algorithm_version, min_hold, max_hold)
+);
+CREATE INDEX IF NOT EXISTS results_by_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash BLOB NOT NULL
+);
+"""
+
+
+class ResultCache:
+    """
+    Persistent cache of the trades of runs, in a SQLite database on local disk
+
+    A result is keyed by the content hash of the market data, the algorithm and
+    its version (see TradingAlgorithms.ALGORITHM_VERSIONS), and the hold times,
+    so a hit skips both the parsing and the algorithm. Only the ticks of the
+    trades are stored: the TradeBook of a hit is over a series of just those
+    ticks (purchase, sell, purchase, sell...), which is all the trades and their
+    aggregates need. Once the results take more than max_bytes, the least
+    recently used ones are evicted.
+
+    The content hash of a file is itself cached by its path, size and
+    modification time, so an unchanged file is not read at all on a hit.
+    """
+
+    def __init__(self, db_filename: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_filename: str = db_filename
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.connection: sqlite3.Connection = sqlite3.connect(
+            db_filename, timeout=CONNECT_TIMEOUT_SECONDS
+        )
+        with self.connection:
+            self.connection.executescript(RESULT_CACHE_SCHEMA)
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def file_hash(self, filename: str) -> bytes:
+        stat = os.stat(filename)
+        path = os.path.abspath(filename)
+        row = self.connection.execute(
+            "SELECT size, mtime_ns, content_hash FROM file_hashes WHERE path = ?",
+            (path,),
+        ).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+
+        content_hash = hash_file(filename)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, content_hash),
+            )
+        return content_hash
+
+    def data_hash(
+        self,
+        filename: str,
+        first_minute: Optional[int] = None,
+        last_minute: Optional[int] = None,
+        bars: Optional[Tuple[str, int]] = None,
+    ) -> bytes:
+        """
+        Hash of the market data of a run: the file, its time range taken, and the
+        bars (bar price, bar minutes) it is resampled into, if it is of raw ticks
+        """
+        content_hash = self.file_hash(filename)
+        if bars is not None:
+            return hash_bytes(
+                content_hash + repr((first_minute, last_minute, bars)).encode()
+            )
+        if first_minute is None and last_minute is None:
+            return content_hash
+        return hash_bytes(content_hash + repr((first_minute, last_minute)).encode())
+
+    def key(
+        self, data_hash: bytes, algorithm_choice: str, min_hold: int, max_hold: int
+    ) -> tuple:
+        min_hold, max_hold = TradingAlgorithms.resolve_hold_times(min_hold, max_hold)
+        return (
+            data_hash,
+            algorithm_choice,
+            TradingAlgorithms.ALGORITHM_VERSIONS()[algorithm_choice],
+            min_hold,
+            max_hold,
+        )
+
+    def get(
+        self, data_hash: bytes, algorithm_choice: str, min_hold=-1, max_hold=-1
+    ) -> Optional[TradeBook]:
+        key = self.key(data_hash, algorithm_choice, min_hold, max_hold)
+        row = self.connection.execute(
+            "SELECT rowid, trade_minutes, trade_prices FROM results"
+            " WHERE data_hash = ? AND algorithm = ? AND algorithm_version = ?"
+            " AND min_hold = ? AND max_hold = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            logging.info(f"ResultCache: No result of {algorithm_choice} cached")
+            return None
+
+        rowid, trade_minutes_bytes, trade_prices_bytes = row
+        with self.connection:
+            self.connection.execute(
+                f"UPDATE results SET last_used = ({NEXT_USE}) WHERE rowid = ?",
+                (rowid,),
+            )
+        self.hits += 1
+
+        trade_minutes = array("q")
+        trade_minutes.frombytes(trade_minutes_bytes)
+        trade_prices = array("d")
+        trade_prices.frombytes(trade_prices_bytes)
+        logging.info(
+            f"ResultCache: Found {len(trade_minutes) // 2} trades of {algorithm_choice} cached"
+        )
+        return TradeBook.from_trade_ticks(trade_minutes, trade_prices)
+
+    def put(
+        self,
+        data_hash: bytes,
+        algorithm_choice: str,
+        min_hold: int,
+        max_hold: int,
+        trade_book: TradeBook,
+    ) -> None:
+        trade_minutes, trade_prices = (
+            column.tobytes() for column in trade_book.trade_ticks()
+        )
+
+        with self.connection:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ({NEXT_USE}))",
+                self.key(data_hash, algorithm_choice, min_hold, max_hold)
+                + (trade_minutes, trade_prices, len(trade_minutes) + len(trade_prices)),
+            )
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used results, until they fit in max_bytes"""
+        (total_size,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        if total_size <= self.max_bytes:
+            return
+        evicted_rowids = []
+        for rowid, size in self.connection.execute(
+            "SELECT rowid, size FROM results ORDER BY last_used"
+        ):
+            if total_size <= self.max_bytes:
+                break
+            evicted_rowids.append((rowid,))
+            total_size -= size
+        self.connection.executemany(
+            "DELETE FROM results WHERE rowid = ?", evicted_rowids
+        )
+        logging.info(f"ResultCache: Evicted {len(evicted_rowids)} results")
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
@@ -0,0 +1,124 @@
+from typing import List, Optional
+import logging
+import mmap
+import os
+import struct
+import sys
+
+from .csv_util import ColumnTranslation
+from .market_series import MarketSeries, read_market_series
+from .result import Result
+
+TICK_FILE_MAGIC: bytes = b"MKTTICKS"
+TICK_FILE_VERSION: int = 1
+
+# magic, version, byte order, number of ticks
+# followed by the minute column (int64) and then the price column (float64)
+TICK_FILE_HEADER = struct.Struct("<8sIIQ")
+LITTLE_ENDIAN: int = 1 if sys.byteorder == "little" else 0
+
+
+def is_tick_file(filename: str) -> bool:
+    """Tell a binary tick file from a CSV file by its magic bytes"""
+    try:
+        with open(filename, "rb") as file:
+            return file.read(len(TICK_FILE_MAGIC)) == TICK_FILE_MAGIC
+    except OSError:
+        return False
+
+
+def write_tick_file(tick_filename: str, market_series: MarketSeries) -> None:
+    """
+    Write the market series as a binary tick file
+    The minutes must be in increasing order, so that time ranges can be searched
+    """
+    minutes = market_series.minutes
+    for offset in range(1, len(minutes)):
+        if minutes[offset] <= minutes[offset - 1]:
+            raise ValueError(
+                f"write_tick_file: Minute {minutes[offset]} at offset {offset} does not follow minute {minutes[offset - 1]}, expected increasing minutes"
+            )
+
+    temp_tick_filename = f"{tick_filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_tick_filename, "wb") as tick_file:
+            tick_file.write(
+                TICK_FILE_HEADER.pack(
+                    TICK_FILE_MAGIC, TICK_FILE_VERSION, LITTLE_ENDIAN, len(minutes)
+                )
+            )
+            tick_file.write(memoryview(minutes).cast("B"))
+            tick_file.write(memoryview(market_series.prices).cast("B"))
+        os.replace(temp_tick_filename, tick_filename)
+    finally:
+        if os.path.exists(temp_tick_filename):
+            os.remove(temp_tick_filename)
+
+
+def convert_csv_to_tick_file(
+    csv_filename: str,
+    tick_filename: str,
+    column_translations: Optional[List[ColumnTranslation]] = None,
+) -> Result:
+    """Convert a Time,Price CSV file into a binary tick file"""
+    result = read_market_series(csv_filename, column_translations)
+    if not result.isSuccess:
+        return result
+    try:
+        write_tick_file(tick_filename, result.result)
+    except (OSError, ValueError) as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    logging.info(
+        f"Converted {len(result.result)} rows of {csv_filename} to {tick_filename}"
+    )
+    return Result(isSuccess=True, message="", result=len(result.result))
+
+
+def read_tick_file(
+    tick_filename: str,
+    first_minute: Optional[int] = None,
+    last_minute: Optional[int] = None,
+) -> Result:
+    """
+    Memory-map a binary tick file into a MarketSeries, without copying or parsing
+    it, optionally only the ticks from first_minute to last_minute (both included)
+
+    The columns are views of the mapped file, so the ticks are paged in from the
+    page cache when the algorithms read them. The time range is binary searched,
+    so only the pages of the ticks within it (and a few of the search) are read.
+    """
+    try:
+        with open(tick_filename, "rb") as tick_file:
+            header = tick_file.read(TICK_FILE_HEADER.size)
+            if len(header) != TICK_FILE_HEADER.size:
+                raise ValueError("File too short for the header")
+            magic, version, little_endian, num_ticks = TICK_FILE_HEADER.unpack(header)
+            if magic != TICK_FILE_MAGIC:
+                raise ValueError("Not a tick file")
+            if version != TICK_FILE_VERSION or little_endian != LITTLE_ENDIAN:
+                raise ValueError(
+                    f"Found version {version} with byte order flag {little_endian}, expected version {TICK_FILE_VERSION} with byte order flag {LITTLE_ENDIAN}"
+                )
+            file_size = os.fstat(tick_file.fileno()).st_size
+            if file_size != TICK_FILE_HEADER.size + 16 * num_ticks:
+                raise ValueError(
+                    f"Found {file_size} bytes, expected {TICK_FILE_HEADER.size + 16 * num_ticks} for {num_ticks} ticks"
+                )
+            tick_map = mmap.mmap(tick_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as ex:
+        return Result(
+            isSuccess=False,
+            message=f"Tick file: {tick_filename} Error: {ex}",
+            result=None,
+        )
+
+    column_size = 8 * num_ticks
+    buffer = memoryview(tick_map)
+    market_series = MarketSeries.from_buffers(
+        buffer[TICK_FILE_HEADER.size : TICK_FILE_HEADER.size + column_size].cast("q"),
+        buffer[TICK_FILE_HEADER.size + column_size :].cast("d"),
+    )
+    if first_minute is not None or last_minute is not None:
+        market_series = market_series.between_minutes(first_minute, last_minute)
+    logging.info(f"Mapped {len(market_series)} ticks of tick file: {tick_filename}")
+    return Result(isSuccess=True, message="", result=market_series)
@@ -0,0 +1,86 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Sequence, Tuple
+import logging
+import operator
+
+
+class TimeIndex:
+    """
+    Resolves the hold time windows on the minute column of a series, so that
+    series with gaps (irregular or sparse ticks) are not padded into a dense
+    grid of minutes
+
+    The sell window of a purchase at minute M is the ticks from minute
+    M + min_hold + 1 to minute M + max_hold. When there is a tick every minute
+    (the series is dense), that is simply the offsets from min_hold + 1 to
+    max_hold after the purchase offset, and no search is done at all.
+    Otherwise the window ends are found by binary search, bounded to the few
+    offsets they can be at: as the minutes increase, the tick of a minute is at
+    most that many minutes (offsets) after any earlier tick.
+
+    The minutes must be in increasing order. If they are not, the hold times
+    are counted in ticks (offsets) instead, i.e. the minutes are taken to be
+    the offsets, as if the series were dense.
+    """
+
+    def __init__(self, minutes: Sequence[int]):
+        self.minutes: Sequence[int] = minutes
+
+        first_minute = minutes[0] if len(minutes) else 0
+        self.is_dense: bool = all(
+            map(operator.eq, minutes, range(first_minute, first_minute + len(minutes)))
+        )
+        if not self.is_dense and not all(
+            map(operator.lt, minutes, islice(minutes, 1, None))
+        ):
+            logging.warning(
+                "TimeIndex: The minutes are not in increasing order, counting the hold times in ticks instead"
+            )
+            self.minutes = range(len(minutes))
+            self.is_dense = True
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    def first_at_or_after(self, minute: int, lo: int = 0) -> int:
+        """
+        Return the offset of the first tick at or after 'minute', searched from
+        offset lo on. Past the last tick the offsets go on a minute each (i.e. as
+        if the series went on densely), so that how far a minute is beyond the
+        end of the series can still be told.
+        """
+        minutes = self.minutes
+        num_ticks = len(minutes)
+        if lo < num_ticks:
+            hi = min(num_ticks, lo + max(minute - minutes[lo], 0) + 1)
+            offset = bisect_left(minutes, minute, lo, hi)
+            if offset < num_ticks:
+                return offset
+        if num_ticks == 0:
+            return lo
+        return num_ticks + minute - minutes[-1] - 1
+
+    def sell_window(
+        self, purchase_offset: int, min_hold: int, max_hold: int
+    ) -> Tuple[int, int]:
+        """
+        Return [range_min, range_max) of the offsets a purchase at purchase_offset
+        can be sold at. range_max is capped at the end of the series, while
+        range_min is past it (see first_at_or_after()) once the window is empty
+        """
+        num_ticks = len(self.minutes)
+        if self.is_dense or purchase_offset >= num_ticks:
+            return (
+                purchase_offset + min_hold + 1,
+                min(purchase_offset + max_hold + 1, num_ticks),
+            )
+
+        purchase_minute = self.minutes[purchase_offset]
+        range_min = self.first_at_or_after(
+            purchase_minute + min_hold + 1, purchase_offset + 1
+        )
+        if range_min >= num_ticks:
+            return (range_min, num_ticks)
+        range_max = self.first_at_or_after(purchase_minute + max_hold + 1, range_min)
+        return (range_min, min(range_max, num_ticks))
@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional, TextIO, Tuple
+import json
+
+# Fields of a trace event, i.e. of a decision of an algorithm at a minute:
+# the minute (offset) considered for a purchase and its price, the sell window
+# searched for it [window_min, window_max), and the sell offset chosen in there
+# and its price (NO_SELL_OFFSET and 0.0 if nothing was sold)
+TRACE_EVENT_FIELDS: Tuple[str, ...] = (
+    "algorithm",
+    "offset",
+    "price",
+    "window_min",
+    "window_max",
+    "sell_offset",
+    "sell_price",
+)
+NO_SELL_OFFSET: int = -1
+
+TraceEvent = Tuple[str, int, float, int, int, int, float]
+
+
+class TraceSink:
+    """
+    Buffered sink of the decisions made by the algorithms, for offline analysis
+
+    A TradingAlgorithms only records into a sink if it is given one, so that
+    nothing is built in the inner loops otherwise. Events are buffered as plain
+    tuples, and only turned into JSON lines when flushed to the output (if there
+    is no output, they are kept in memory, see events()).
+    """
+
+    DEFAULT_BUFFER_SIZE: int = 65536
+
+    def __init__(
+        self, output: Optional[TextIO] = None, buffer_size: int = DEFAULT_BUFFER_SIZE
+    ):
+        self.output: Optional[TextIO] = output
+        self.buffer_size: int = buffer_size
+        self.buffer: List[TraceEvent] = []
+        self.num_events: int = 0
+
+    def record(
+        self,
+        algorithm: str,
+        offset: int,
+        price: float,
+        window_min: int,
+        window_max: int,
+        sell_offset: int = NO_SELL_OFFSET,
+        sell_price: float = 0.0,
+    ) -> None:
+        self.buffer.append(
+            (algorithm, offset, price, window_min, window_max, sell_offset, sell_price)
+        )
+        self.num_events += 1
+        if self.output is not None and len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.output is None:
+            return
+        self.output.write(
+            "".join(
+                json.dumps(dict(zip(TRACE_EVENT_FIELDS, event))) + "\n"
+                for event in self.buffer
+            )
+        )
+        self.buffer.clear()
+
+    def events(self) -> List[Dict]:
+        """The events still in the buffer, as dicts"""
+        return [dict(zip(TRACE_EVENT_FIELDS, event)) for event in self.buffer]
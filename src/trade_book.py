@@ -0,0 +1,165 @@
+from array import array
+from collections import Counter
+from operator import sub
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from .market_series import MarketSeries
+from .trade_point import TradePoint
+
+
+class TradeBook:
+    """
+    Columnar store of the trades of a run
+
+    The trades are kept as two arrays of offsets (purchase and sell) into the
+    market series they were made on, instead of a list of TradePoint objects.
+    The aggregates (total profit, hold time histogram, drawdown) are computed
+    in bulk from the columns, and a TradePoint is only built when one is asked
+    for (e.g. when the trades are printed).
+    """
+
+    OFFSET_TYPECODE: str = "q"
+
+    def __init__(
+        self,
+        market_series: MarketSeries,
+        purchase_offsets: Iterable[int] = (),
+        sell_offsets: Iterable[int] = (),
+    ):
+        self.market_series: MarketSeries = market_series
+        self.purchase_offsets: array = array(self.OFFSET_TYPECODE, purchase_offsets)
+        self.sell_offsets: array = array(self.OFFSET_TYPECODE, sell_offsets)
+
+        if len(self.purchase_offsets) != len(self.sell_offsets):
+            raise ValueError(
+                f"TradeBook: Found {len(self.purchase_offsets)} purchase offsets and {len(self.sell_offsets)} sell offsets, expected equal lengths"
+            )
+
+    @classmethod
+    def from_trade_points(
+        cls, market_series: MarketSeries, trade_points: Iterable[TradePoint]
+    ) -> "TradeBook":
+        trade_book = cls(market_series)
+        for trade_point in trade_points:
+            trade_book.append(trade_point.purchase_offset, trade_point.sell_offset)
+        return trade_book
+
+    @classmethod
+    def from_trade_ticks(cls, trade_minutes: array, trade_prices: array) -> "TradeBook":
+        """The inverse of trade_ticks(): a TradeBook over the ticks of its trades"""
+        return cls(
+            MarketSeries.from_buffers(trade_minutes, trade_prices),
+            range(0, len(trade_minutes), 2),
+            range(1, len(trade_minutes), 2),
+        )
+
+    def trade_ticks(self) -> Tuple[array, array]:
+        """
+        The minutes and the prices of the ticks of the trades, interleaved as
+        purchase, sell, purchase, sell... i.e. all that the trades (and their
+        aggregates) need to be stored without the rest of the market series
+        """
+        trade_offsets = array(self.OFFSET_TYPECODE, [0]) * (2 * len(self))
+        trade_offsets[0::2] = self.purchase_offsets
+        trade_offsets[1::2] = self.sell_offsets
+        return (
+            array("q", map(self.market_series.minutes.__getitem__, trade_offsets)),
+            array("d", map(self.market_series.prices.__getitem__, trade_offsets)),
+        )
+
+    def append(self, purchase_offset: int, sell_offset: int) -> None:
+        self.purchase_offsets.append(purchase_offset)
+        self.sell_offsets.append(sell_offset)
+
+    def reverse(self) -> None:
+        self.purchase_offsets.reverse()
+        self.sell_offsets.reverse()
+
+    def __len__(self) -> int:
+        return len(self.purchase_offsets)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TradePoint, "TradeBook"]:
+        if isinstance(index, slice):
+            return TradeBook(
+                self.market_series,
+                self.purchase_offsets[index],
+                self.sell_offsets[index],
+            )
+        return self.trade_point(self.purchase_offsets[index], self.sell_offsets[index])
+
+    def __iter__(self) -> Iterator[TradePoint]:
+        for purchase_offset, sell_offset in zip(
+            self.purchase_offsets, self.sell_offsets
+        ):
+            yield self.trade_point(purchase_offset, sell_offset)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TradeBook):
+            return NotImplemented
+        return (
+            self.purchase_offsets == other.purchase_offsets
+            and self.sell_offsets == other.sell_offsets
+        )
+
+    def __repr__(self):
+        return f"TradeBook({len(self)} trades)"
+
+    def trade_point(self, purchase_offset: int, sell_offset: int) -> TradePoint:
+        return TradePoint(
+            purchase_point=self.market_series[purchase_offset],
+            sell_point=self.market_series[sell_offset],
+            purchase_offset=purchase_offset,
+            sell_offset=sell_offset,
+        )
+
+    def trade_points(self) -> List[TradePoint]:
+        """The trades as the list of TradePoint the algorithms used to return"""
+        return list(self)
+
+    def profits(self) -> array:
+        prices = self.market_series.prices
+        return array(
+            "d",
+            map(
+                sub,
+                map(prices.__getitem__, self.sell_offsets),
+                map(prices.__getitem__, self.purchase_offsets),
+            ),
+        )
+
+    def total_profit(self) -> float:
+        # Summed in the order of the trades, as adding up TradePoint.profit would
+        return sum(self.profits())
+
+    def hold_durations(self) -> array:
+        """Minutes each trade was held for, as TradePoint.duration_held"""
+        minutes = self.market_series.minutes
+        return array(
+            "q",
+            (
+                duration - 1
+                for duration in map(
+                    sub,
+                    map(minutes.__getitem__, self.sell_offsets),
+                    map(minutes.__getitem__, self.purchase_offsets),
+                )
+            ),
+        )
+
+    def hold_time_histogram(self) -> Dict[int, int]:
+        """Number of trades by the minutes they were held for, in increasing order"""
+        return dict(sorted(Counter(self.hold_durations()).items()))
+
+    def max_drawdown(self) -> float:
+        """
+        Largest fall of the cumulative profit (taking the trades in order) from
+        its highest point so far, starting from 0.0
+        """
+        cumulative_profit = peak_profit = max_drawdown = 0.0
+        for profit in self.profits():
+            cumulative_profit += profit
+            if cumulative_profit > peak_profit:
+                peak_profit = cumulative_profit
+            elif peak_profit - cumulative_profit > max_drawdown:
+                max_drawdown = peak_profit - cumulative_profit
+        return max_drawdown
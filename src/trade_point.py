@@ -3,14 +3,25 @@ from .market_condition import MarketCondition
 
 class TradePoint:
     UNDETERMINED: float = float("inf")
+    UNKNOWN_OFFSET: int = -1
 
-    def __init__(self, purchase_point: MarketCondition, sell_point: MarketCondition):
+    def __init__(
+        self,
+        purchase_point: MarketCondition,
+        sell_point: MarketCondition,
+        purchase_offset: int = UNKNOWN_OFFSET,
+        sell_offset: int = UNKNOWN_OFFSET,
+    ):
         self.purchase_point: MarketCondition
         self.sell_point: MarketCondition
 
         self.purchase_point = purchase_point
         self.sell_point = sell_point
 
+        # Offsets of the two points within the market series they came from
+        self.purchase_offset: int = purchase_offset
+        self.sell_offset: int = sell_offset
+
     def __repr__(self):
         return f"Open at {self.purchase_point}, close {self.sell_point} (hold for {self.duration_held:03d} minutes) for profit {self.profit:.4f}"
 
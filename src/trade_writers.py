@@ -0,0 +1,181 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import islice
+from math import isfinite
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Type, cast
+import json
+import struct
+import sys
+
+from .trade_book import TradeBook
+
+OUTPUT_BUFFER_SIZE: int = 1 << 20
+TRADES_PER_CHUNK: int = 8192  # Trades formatted together, and written at once
+
+TRADE_FILE_MAGIC: bytes = b"MKTTRADE"
+TRADE_FILE_VERSION: int = 1
+# magic, version, followed by a TRADE_RECORD per trade until the end of the file
+TRADE_FILE_HEADER = struct.Struct("<8sI")
+# purchase minute, purchase price, sell minute, sell price
+TRADE_RECORD = struct.Struct("<qdqd")
+
+TRADE_FIELDS: Tuple[str, ...] = (
+    "purchase_minute",
+    "purchase_price",
+    "sell_minute",
+    "sell_price",
+    "hold_minutes",
+    "profit",
+)
+
+TradeRow = Tuple[int, float, int, float]
+
+
+def trade_rows(trade_book: TradeBook) -> Iterator[TradeRow]:
+    """The trades as (purchase minute, purchase price, sell minute, sell price)"""
+    minutes = trade_book.market_series.minutes
+    prices = trade_book.market_series.prices
+    return zip(
+        map(minutes.__getitem__, trade_book.purchase_offsets),
+        map(prices.__getitem__, trade_book.purchase_offsets),
+        map(minutes.__getitem__, trade_book.sell_offsets),
+        map(prices.__getitem__, trade_book.sell_offsets),
+    )
+
+
+class TradeWriter(ABC):
+    """
+    Base of the buffered writers of trades, a subclass per output format
+
+    The trades are read straight from the columns of the TradeBook (no TradePoint
+    is built), formatted a chunk at a time into a single bytes object, and
+    written to a binary output. write() can be called repeatedly, e.g. as the
+    trades of the parts of a run come in.
+    """
+
+    def __init__(self, output: BinaryIO):
+        self.output: BinaryIO = output
+        self.num_trades: int = 0
+        self.write_header()
+
+    def write_header(self) -> None:
+        pass
+
+    @abstractmethod
+    def format_rows(self, rows: Iterator[TradeRow]) -> bytes:
+        ...
+
+    def write(self, trade_book: TradeBook) -> None:
+        rows = trade_rows(trade_book)
+        while True:
+            chunk = self.format_rows(islice(rows, TRADES_PER_CHUNK))
+            if not chunk:
+                break
+            self.output.write(chunk)
+        self.num_trades += len(trade_book)
+
+
+class TextTradeWriter(TradeWriter):
+    """The lines printed for every TradePoint"""
+
+    def format_rows(self, rows: Iterator[TradeRow]) -> bytes:
+        return "".join(
+            f"Open at {purchase_minute:05d}({purchase_price:.4f}), close {sell_minute:05d}({sell_price:.4f}) (hold for {sell_minute - purchase_minute - 1:03d} minutes) for profit {sell_price - purchase_price:.4f}\n"
+            for purchase_minute, purchase_price, sell_minute, sell_price in rows
+        ).encode("ascii")
+
+
+class CsvTradeWriter(TradeWriter):
+    def write_header(self) -> None:
+        self.output.write((",".join(TRADE_FIELDS) + "\n").encode("ascii"))
+
+    def format_rows(self, rows: Iterator[TradeRow]) -> bytes:
+        return "".join(
+            f"{purchase_minute},{purchase_price!r},{sell_minute},{sell_price!r},{sell_minute - purchase_minute - 1},{sell_price - purchase_price!r}\n"
+            for purchase_minute, purchase_price, sell_minute, sell_price in rows
+        ).encode("ascii")
+
+
+class JsonlTradeWriter(TradeWriter):
+    """A JSON object per line, as json.dumps would format it, with the TRADE_FIELDS"""
+
+    def format_rows(self, rows: Iterator[TradeRow]) -> bytes:
+        chunk = list(rows)
+        # The profit is not finite if either price is not (or if it overflows)
+        if not all(
+            isfinite(sell_price - purchase_price)
+            for _, purchase_price, _, sell_price in chunk
+        ):
+            # repr() would give nan and inf, json.dumps gives NaN and Infinity
+            return "".join(
+                json.dumps(
+                    {
+                        "purchase_minute": purchase_minute,
+                        "purchase_price": purchase_price,
+                        "sell_minute": sell_minute,
+                        "sell_price": sell_price,
+                        "hold_minutes": sell_minute - purchase_minute - 1,
+                        "profit": sell_price - purchase_price,
+                    }
+                )
+                + "\n"
+                for purchase_minute, purchase_price, sell_minute, sell_price in chunk
+            ).encode("ascii")
+        return "".join(
+            f'{{"purchase_minute": {purchase_minute}, "purchase_price": {purchase_price!r}, "sell_minute": {sell_minute}, "sell_price": {sell_price!r}, "hold_minutes": {sell_minute - purchase_minute - 1}, "profit": {sell_price - purchase_price!r}}}\n'
+            for purchase_minute, purchase_price, sell_minute, sell_price in chunk
+        ).encode("ascii")
+
+
+class BinaryTradeWriter(TradeWriter):
+    """Packed TRADE_RECORDs after a TRADE_FILE_HEADER, see read_binary_trades()"""
+
+    def write_header(self) -> None:
+        self.output.write(TRADE_FILE_HEADER.pack(TRADE_FILE_MAGIC, TRADE_FILE_VERSION))
+
+    def format_rows(self, rows: Iterator[TradeRow]) -> bytes:
+        return b"".join(TRADE_RECORD.pack(*row) for row in rows)
+
+
+TRADE_WRITERS: Dict[str, Type[TradeWriter]] = {
+    "text": TextTradeWriter,
+    "csv": CsvTradeWriter,
+    "jsonl": JsonlTradeWriter,
+    "binary": BinaryTradeWriter,
+}
+
+
+def read_binary_trades(trade_file: BinaryIO) -> Iterator[TradeRow]:
+    """Read back the trades written by a BinaryTradeWriter"""
+    header = trade_file.read(TRADE_FILE_HEADER.size)
+    if len(header) != TRADE_FILE_HEADER.size:
+        raise ValueError("read_binary_trades: File too short for the header")
+    magic, version = TRADE_FILE_HEADER.unpack(header)
+    if magic != TRADE_FILE_MAGIC or version != TRADE_FILE_VERSION:
+        raise ValueError(
+            f"read_binary_trades: Found magic {magic!r} version {version}, expected {TRADE_FILE_MAGIC!r} version {TRADE_FILE_VERSION}"
+        )
+    data = trade_file.read()
+    if len(data) % TRADE_RECORD.size:
+        raise ValueError(
+            f"read_binary_trades: Found {len(data)} bytes of records, expected a multiple of {TRADE_RECORD.size}"
+        )
+    return cast(Iterator[TradeRow], TRADE_RECORD.iter_unpack(data))
+
+
+@contextmanager
+def open_trade_output(filename: Optional[str] = None) -> Iterator[BinaryIO]:
+    """
+    Open the file to write trades into, with a large buffer
+    Without a file name, the trades go to the standard output, in between what
+    is printed before and after
+    """
+    if filename is None:
+        sys.stdout.flush()
+        try:
+            yield sys.stdout.buffer
+        finally:
+            sys.stdout.buffer.flush()
+    else:
+        with open(filename, "wb", buffering=OUTPUT_BUFFER_SIZE) as output:
+            yield output
@@ -1,9 +1,17 @@
-from typing import List, Dict, Tuple, Any
-from collections import OrderedDict
+from array import array
+from typing import List, Dict, Tuple, Any, Optional, Union
+from collections import OrderedDict, deque
 import logging
 
+from .instrumentation import AlgorithmCounters
 from .result import Result
 from .market_condition import MarketCondition
+from .market_series import MarketData, MarketSeries, as_market_series
+from .price_index import PriceIndex
+from .range_max import SlidingWindowMax, SparseTableMax
+from .time_index import TimeIndex
+from .trace_events import NO_SELL_OFFSET, TraceSink
+from .trade_book import TradeBook
 from .trade_point import TradePoint
 
 
@@ -19,8 +27,22 @@ class TradingAlgorithms:
         algorithms["highest"] = cls.algorithm_purchase_next_highest
         algorithms["higher"] = cls.algorithm_purchase_next_higher
         algorithms["max"] = cls.algorithm_purchase_max
+        algorithms["optimal"] = cls.algorithm_optimal_max_profit
         return algorithms
 
+    @classmethod
+    def ALGORITHM_VERSIONS(cls) -> Dict:
+        # Bump the version of an algorithm whenever a change to it changes its
+        # trades, so that the results cached for the older version are not used
+        return {
+            "adjacent": 2,
+            "minmax": 2,
+            "highest": 2,
+            "higher": 2,
+            "max": 2,
+            "optimal": 2,
+        }
+
     @classmethod
     def ALGORITHMS_CHOICES(cls) -> Dict:
         algorithms = cls.ALGORITHMS()
@@ -29,31 +51,68 @@ class TradingAlgorithms:
             for algo_short_name, algo_method in algorithms.items()
         )
 
-    def __init__(
-        self, market_conditions: List[MarketCondition], min_hold=-1, max_hold=-1
-    ):
-
+    @classmethod
+    def resolve_hold_times(cls, min_hold: int, max_hold: int) -> Tuple[int, int]:
         # Accept caller-supplied min_hold and max_hold only if those are valid
         if (min_hold == max_hold) or (min_hold >= max_hold):
             min_hold = max_hold = -1
 
-        self.min_hold = min_hold if min_hold >= 0 else self.DEFAULT_MIN_HOLD_MINUTES
-        self.max_hold = max_hold if max_hold >= 0 else self.DEFAULT_MAX_HOLD_MINUTES
+        resolved_min_hold = min_hold if min_hold >= 0 else cls.DEFAULT_MIN_HOLD_MINUTES
+        resolved_max_hold = max_hold if max_hold >= 0 else cls.DEFAULT_MAX_HOLD_MINUTES
+        # Only one of them defaulted can still leave an empty sell window, which
+        # no algorithm could trade in
+        if resolved_min_hold >= resolved_max_hold:
+            raise ValueError(
+                f"TradingAlgorithms: Found min hold {resolved_min_hold} and max hold {resolved_max_hold} minutes (a hold of -1 takes the default), expected the min hold below the max hold"
+            )
+        return (resolved_min_hold, resolved_max_hold)
 
-        self.market_conditions: List[MarketCondition] = market_conditions
+    def __init__(
+        self,
+        market_conditions: MarketData,
+        min_hold=-1,
+        max_hold=-1,
+        counters: Optional[AlgorithmCounters] = None,
+        trace_sink: Optional[TraceSink] = None,
+    ):
+        self.min_hold, self.max_hold = self.resolve_hold_times(min_hold, max_hold)
+        # Only counted (traced) into if given, the algorithms skip counting
+        # (and building the trace events) when it is None
+        self.counters: Optional[AlgorithmCounters] = counters
+        self.trace_sink: Optional[TraceSink] = trace_sink
+
+        # Lists of MarketCondition are still accepted, but are converted
+        # to the columnar MarketSeries the algorithms work on
+        self.market_series: MarketSeries = as_market_series(market_conditions)
+
+        # Built on the first use, and then shared by all the runs
+        self.price_index: Optional[PriceIndex] = None
+        self.time_index: Optional[TimeIndex] = None
+        # Only built on request (see precompute()), as it needs O(n log n) memory
+        self.range_max_table: Optional[SparseTableMax] = None
 
         logging.debug(
             f"TradingAlgorithms: Min hold time={self.min_hold} Max hold time={self.max_hold=}"
         )
         logging.debug(
-            f"TradingAlgorithms: Loading {len(market_conditions)} market conditions"
+            f"TradingAlgorithms: Loading {len(self.market_series)} market conditions"
         )
 
     def run(self, algorithm_choice) -> List[TradePoint]:
+        return self.run_trade_book(algorithm_choice).trade_points()
+
+    def run_trade_book(self, algorithm_choice) -> TradeBook:
+        """
+        Same as run(), but returns the compact TradeBook the algorithms build,
+        without building a TradePoint per trade
+        """
         # TODO: Find better way to do this, so that we do not have call this method with 'self' explicitly
-        return self.ALGORITHMS()[algorithm_choice](self)
+        trade_book = self.ALGORITHMS()[algorithm_choice](self)
+        if self.counters is not None:
+            self.counters.trades_emitted += len(trade_book)
+        return trade_book
 
-    def algorithm_buy_sell_adjacent_low_highs(self) -> List[TradePoint]:
+    def algorithm_buy_sell_adjacent_low_highs(self) -> TradeBook:
         """ "
         Compare each price with the adjacent^ price
         As soon as a surge in price is observed^^, purchase at the lower price
@@ -63,25 +122,57 @@ class TradingAlgorithms:
         ^^Do not purchase and sell in the Same minutes
         """
         logging.info("Running: Algorithm of buying and selling adjacent lows and highs")
-        trade_points: List[TradePoint] = []
+        trade_book = TradeBook(self.market_series)
+        prices = self.market_series.prices
+        num_market_conditions = len(prices)
+        time_index = self.get_time_index()
+        # A dense series needs no search, its windows are plain offset arithmetic
+        is_dense = time_index.is_dense
+        min_hold, max_hold = self.min_hold, self.max_hold
+        counters = self.counters
+        trace_sink = self.trace_sink
 
         i = 0
-        while (i + self.min_hold + 1) < len(self.market_conditions):
-            if (
-                self.market_conditions[i].price
-                < self.market_conditions[i + self.min_hold + 1].price
-            ):
-                trade_point: TradePoint = TradePoint(
-                    self.market_conditions[i],
-                    self.market_conditions[i + self.min_hold + 1],
+        while i < num_market_conditions:
+            # The first tick past the min-hold time, if it is within the max-hold time
+            if is_dense:
+                # Always within the max-hold time, as min_hold < max_hold
+                sell_offset = i + min_hold + 1
+                purchase_range_max = sell_offset + 1
+            else:
+                sell_offset, purchase_range_max = time_index.sell_window(
+                    i, min_hold, max_hold
+                )
+            if sell_offset >= num_market_conditions:
+                break
+            if counters is not None:
+                counters.ticks_visited += 1
+                counters.comparisons += 1
+            if sell_offset < purchase_range_max and prices[i] < prices[sell_offset]:
+                if trace_sink is not None:
+                    trace_sink.record(
+                        "adjacent",
+                        i,
+                        prices[i],
+                        sell_offset,
+                        sell_offset + 1,
+                        sell_offset,
+                        prices[sell_offset],
+                    )
+                trade_book.append(i, sell_offset)
+                i = sell_offset
+            elif trace_sink is not None:
+                trace_sink.record(
+                    "adjacent",
+                    i,
+                    prices[i],
+                    sell_offset,
+                    min(sell_offset + 1, purchase_range_max),
                 )
-                logging.debug(f"Adding {trade_point}")
-                trade_points.append(trade_point)
-                i = i + self.min_hold + 1
             i += 1
-        return trade_points
+        return trade_book
 
-    def algorithm_pair_min_max(self) -> List[TradePoint]:
+    def algorithm_pair_min_max(self) -> TradeBook:
         """
         Similar to algorithm_buy_sell_adjacent_low_highs, but
         additionally takes advantage if the price surge continues to
@@ -96,64 +187,125 @@ class TradingAlgorithms:
         # renamed for consistency
         logging.info("Running: Algorithm of pairing min and max")
 
-        trade_points: List[TradePoint] = []
+        trade_book = TradeBook(self.market_series)
+        prices = self.market_series.prices
+        num_market_conditions = len(prices)
+        time_index = self.get_time_index()
+        # A dense series needs no search, its windows are plain offset arithmetic
+        is_dense = time_index.is_dense
+        min_hold, max_hold = self.min_hold, self.max_hold
+        counters = self.counters
+        trace_sink = self.trace_sink
         possible_purchase_point = 0
 
         while True:
             # Find the lowest point across the min-hold time
-            scan_lowest_point = possible_purchase_point + self.min_hold + 1
-            while scan_lowest_point < len(self.market_conditions):
+            if is_dense:
+                # Always within the max-hold time (as min_hold < max_hold), whose
+                # end is only needed once the surge is found
+                scan_lowest_point = possible_purchase_point + min_hold + 1
+                range_max = num_market_conditions
+            else:
+                scan_lowest_point, range_max = time_index.sell_window(
+                    possible_purchase_point, min_hold, max_hold
+                )
+            if counters is not None:
+                counters.window_scans += 1
+            while scan_lowest_point < num_market_conditions:
+                if counters is not None:
+                    counters.ticks_visited += 1
+                    counters.comparisons += 1
                 if (
-                    self.market_conditions[scan_lowest_point].price
-                    > self.market_conditions[possible_purchase_point].price
+                    scan_lowest_point < range_max
+                    and prices[scan_lowest_point] > prices[possible_purchase_point]
                 ):
                     break
-                scan_lowest_point += 1
                 possible_purchase_point += 1
+                if is_dense:
+                    scan_lowest_point += 1
+                else:
+                    scan_lowest_point, range_max = time_index.sell_window(
+                        possible_purchase_point, min_hold, max_hold
+                    )
             # Quit if we hit the end of the list
-            if scan_lowest_point >= len(self.market_conditions):
+            if scan_lowest_point >= num_market_conditions:
                 break
+            if is_dense:
+                range_max = min(
+                    possible_purchase_point + max_hold + 1, num_market_conditions
+                )
 
-            # Now find the highest point
+            # Now find the highest point (range_max is within the list)
             scan_highest_point = scan_lowest_point
-            range_max = possible_purchase_point + self.max_hold + 1
-            while (scan_highest_point + 1 < range_max) and (
-                scan_highest_point + 1 < len(self.market_conditions)
-            ):
-                if (
-                    self.market_conditions[scan_highest_point + 1].price
-                    < self.market_conditions[scan_highest_point].price
-                ):
+            if counters is not None:
+                counters.window_scans += 1
+            while scan_highest_point + 1 < range_max:
+                if counters is not None:
+                    counters.comparisons += 1
+                if prices[scan_highest_point + 1] < prices[scan_highest_point]:
                     break
                 scan_highest_point += 1
 
-            if scan_highest_point + 1 == len(self.market_conditions):
+            if scan_highest_point + 1 == num_market_conditions:
                 break  # TODO: We may be losing out on the one very last trade opportunity here
 
             # Now marry the lowest with the highest point
-            trade_point: TradePoint = TradePoint(
-                self.market_conditions[possible_purchase_point],
-                self.market_conditions[scan_highest_point],
-            )
-            trade_points.append(trade_point)
+            if trace_sink is not None:
+                trace_sink.record(
+                    "minmax",
+                    possible_purchase_point,
+                    prices[possible_purchase_point],
+                    scan_lowest_point,
+                    range_max,
+                    scan_highest_point,
+                    prices[scan_highest_point],
+                )
+            trade_book.append(possible_purchase_point, scan_highest_point)
 
             # Quit if we hit the end of the list
-            if scan_highest_point + 1 == len(self.market_conditions):
+            if scan_highest_point + 1 == num_market_conditions:
                 break
 
             possible_purchase_point = scan_highest_point + 1
 
-        return trade_points
-
-    # Allows only kwargs to avoid possible errors
-    def get_purchase_range(
-        self, *, curr_offset: int, num_market_conditions: int
-    ) -> Tuple[int, int]:
-        purchase_range_min = curr_offset + self.min_hold + 1
-        purchase_range_max = min(curr_offset + self.max_hold + 1, num_market_conditions)
-        return (purchase_range_min, purchase_range_max)
+        return trade_book
 
-    def algorithm_purchase_max(self) -> List[TradePoint]:
+    def precompute(self) -> None:
+        """
+        Build all the structures over the prices that do not depend on the hold times,
+        so that they can be shared through with_hold_times()
+        """
+        self.get_price_index()
+        self.get_time_index()
+        if self.range_max_table is None or len(self.range_max_table) != len(
+            self.market_series
+        ):
+            self.range_max_table = SparseTableMax(self.market_series.prices)
+
+    def with_hold_times(self, min_hold: int, max_hold: int) -> "TradingAlgorithms":
+        """
+        Return an instance for other hold times, sharing this instance's
+        market series and the structures already built over it
+        """
+        trading_algorithms = TradingAlgorithms(
+            self.market_series, min_hold=min_hold, max_hold=max_hold
+        )
+        trading_algorithms.price_index = self.price_index
+        trading_algorithms.time_index = self.time_index
+        trading_algorithms.range_max_table = self.range_max_table
+        return trading_algorithms
+
+    def get_price_index(self) -> PriceIndex:
+        if self.price_index is None or len(self.price_index) != len(self.market_series):
+            self.price_index = PriceIndex(self.market_series.prices)
+        return self.price_index
+
+    def get_time_index(self) -> TimeIndex:
+        if self.time_index is None or len(self.time_index) != len(self.market_series):
+            self.time_index = TimeIndex(self.market_series.minutes)
+        return self.time_index
+
+    def algorithm_purchase_max(self) -> TradeBook:
         """
         Step A) Starting with the very first minute M
         Step B) Determine the allowed sell time-window for that minute
@@ -170,59 +322,78 @@ class TradingAlgorithms:
         CONS:
         - Would mostly miss out any purchase opportunities between minute 2 to minute min-hold
         - Inefficient at profit-making because it does not buy-sell often.
-        - Could be very slow-performing in the following case:
-            If the prices are constantly or mostly declining then Step C would end up finding maximum price
-            in consecutive overlapping time-ranges
+
+        NOTE:
+        If the prices are constantly or mostly declining then Step C ends up finding maximum price
+        in consecutive overlapping time-ranges. SlidingWindowMax reuses the work between those
+        overlapping ranges, so Step C costs amortized O(1) per minute regardless of the max-hold time
+        (if precompute() has built the SparseTableMax, that is used instead)
         """
         logging.info("Running: Algorithm of purchasing always the max")
-        trade_points: List[TradePoint] = []
+        trade_book = TradeBook(self.market_series)
+        prices = self.market_series.prices
+        num_market_conditions = len(prices)
+        time_index = self.get_time_index()
+        # A dense series needs no search, its windows are plain offset arithmetic
+        is_dense = time_index.is_dense
+        min_hold, max_hold = self.min_hold, self.max_hold
+        counters = self.counters
+        trace_sink = self.trace_sink
+        window_max: Union[SparseTableMax, SlidingWindowMax] = (
+            self.range_max_table
+            if self.range_max_table is not None
+            else SlidingWindowMax(prices)
+        )
 
         # Step A
         curr_offset = 0
-        while curr_offset + self.min_hold < len(self.market_conditions):
-
+        while curr_offset < num_market_conditions:
             # Step B
-            purchase_range_min, purchase_range_max = self.get_purchase_range(
-                curr_offset=curr_offset,
-                num_market_conditions=len(self.market_conditions),
-            )
+            if is_dense:
+                purchase_range_min = curr_offset + min_hold + 1
+                purchase_range_max = min(
+                    curr_offset + max_hold + 1, num_market_conditions
+                )
+            else:
+                purchase_range_min, purchase_range_max = time_index.sell_window(
+                    curr_offset, min_hold, max_hold
+                )
+            if purchase_range_min > num_market_conditions:
+                break
+            if counters is not None:
+                counters.ticks_visited += 1
+                counters.window_scans += 1
+                counters.comparisons += 1
 
             # Step C
-            max_price_in_purchase_range: float = 0.0
-            max_price_offset: int = 0
-            best_market_condition: MarketCondition
-            # TODO: This part of finding maximum in a range can use some improvements
-            #       by using some knowledge from previous iteration
-            #       However, the profit-making ability of this particular algorithm
-            #       is so low that this improvement is not justified
-            for i in range(purchase_range_min, purchase_range_max):
-                if self.market_conditions[i].price > max_price_in_purchase_range:
-                    max_price_in_purchase_range = self.market_conditions[i].price
-                    max_price_offset = i
-                    best_market_condition = self.market_conditions[i]
-
-            logging.debug(
-                f"algorithm_purchase_max: Current price at {curr_offset:03d}={self.market_conditions[curr_offset].price:.04f}, "
-                f"Range({purchase_range_min:03d}-{purchase_range_max-1:03d}) has max={max_price_in_purchase_range:.4f} "
-                f"@ minute {max_price_offset:03d}"
+            max_price_offset, max_price_in_purchase_range = window_max.query(
+                purchase_range_min, purchase_range_max
             )
 
-            if max_price_in_purchase_range > self.market_conditions[curr_offset].price:
-                # Step D
-                trade_point = TradePoint(
-                    purchase_point=self.market_conditions[curr_offset],
-                    sell_point=best_market_condition,
+            if trace_sink is not None:
+                traded = max_price_in_purchase_range > prices[curr_offset]
+                trace_sink.record(
+                    "max",
+                    curr_offset,
+                    prices[curr_offset],
+                    purchase_range_min,
+                    purchase_range_max,
+                    max_price_offset if traded else NO_SELL_OFFSET,
+                    max_price_in_purchase_range if traded else 0.0,
                 )
-                trade_points.append(trade_point)
+
+            if max_price_in_purchase_range > prices[curr_offset]:
+                # Step D
+                trade_book.append(curr_offset, max_price_offset)
                 # Step E
                 curr_offset = max_price_offset + 1
             else:
                 # Step F
                 curr_offset += 1
 
-        return trade_points
+        return trade_book
 
-    def algorithm_purchase_next_higher(self) -> List[TradePoint]:
+    def algorithm_purchase_next_higher(self) -> TradeBook:
         """
         Step A) Starting with the very first minute M
         Step B) Determine the allowed sell time-window for that minute
@@ -238,60 +409,79 @@ class TradingAlgorithms:
         CONS:
         - Would mostly miss out any purchase opportunities between minute 2 to minute min-hold
         - Inefficient at profit-making because it does not explore further better prices in the range
-        - Could be very slow-performing in the following case:
-            If the prices are constantly or mostly declining then Step C would end up finding maximum price
-            in consecutive overlapping time-ranges
+
+        NOTE:
+        If the prices are constantly or mostly declining then Step C ends up searching
+        consecutive overlapping time-ranges. PriceIndex answers Step C in O(log n) instead of
+        scanning the range
         """
         logging.info("Running: Algorithm of purchasing the very next higher")
-        trade_points: List[TradePoint] = []
+        trade_book = TradeBook(self.market_series)
+        prices = self.market_series.prices
+        num_market_conditions = len(prices)
+        price_index = self.get_price_index()
+        time_index = self.get_time_index()
+        # A dense series needs no search, its windows are plain offset arithmetic
+        is_dense = time_index.is_dense
+        min_hold, max_hold = self.min_hold, self.max_hold
+        counters = self.counters
+        trace_sink = self.trace_sink
 
         # Step A
         curr_offset = 0
-        while curr_offset + self.min_hold < len(self.market_conditions):
-
+        while curr_offset < num_market_conditions:
             # Step B
-            purchase_range_min, purchase_range_max = self.get_purchase_range(
-                curr_offset=curr_offset,
-                num_market_conditions=len(self.market_conditions),
-            )
+            if is_dense:
+                purchase_range_min = curr_offset + min_hold + 1
+                purchase_range_max = min(
+                    curr_offset + max_hold + 1, num_market_conditions
+                )
+            else:
+                purchase_range_min, purchase_range_max = time_index.sell_window(
+                    curr_offset, min_hold, max_hold
+                )
+            if purchase_range_min > num_market_conditions:
+                break
+            if counters is not None:
+                counters.ticks_visited += 1
+                counters.window_scans += 1
+                counters.comparisons += 1
 
             # Step C
-            first_greater_price_offset = 0
-            sell_market_condition: MarketCondition
-            for i in range(purchase_range_min, purchase_range_max):
-                if (
-                    self.market_conditions[i].price
-                    > self.market_conditions[curr_offset].price
-                ):
-                    first_greater_price_offset = i
-                    sell_market_condition = self.market_conditions[i]
-                    break
+            first_greater_price_offset = price_index.first_greater_in_range(
+                purchase_range_min, purchase_range_max, prices[curr_offset]
+            )
 
-            if first_greater_price_offset:
-                logging.debug(
-                    f"algorithm_purchase_next_higher: Current price at {curr_offset:03d}={self.market_conditions[curr_offset].price:.04f}, "
-                    f"Range({purchase_range_min:03d}-{purchase_range_max-1:03d}) has first greater={sell_market_condition.price:.4f} "
-                    f"@ minute {first_greater_price_offset:03d}"
-                )
+            if first_greater_price_offset != PriceIndex.NOT_FOUND:
+                if trace_sink is not None:
+                    trace_sink.record(
+                        "higher",
+                        curr_offset,
+                        prices[curr_offset],
+                        purchase_range_min,
+                        purchase_range_max,
+                        first_greater_price_offset,
+                        prices[first_greater_price_offset],
+                    )
                 # Step D
-                trade_point = TradePoint(
-                    purchase_point=self.market_conditions[curr_offset],
-                    sell_point=sell_market_condition,
-                )
-                trade_points.append(trade_point)
+                trade_book.append(curr_offset, first_greater_price_offset)
                 # Step E
                 curr_offset = first_greater_price_offset + 1
             else:
                 # Step F
-                logging.debug(
-                    f"algorithm_purchase_next_higher: Current price at {curr_offset:03d}={self.market_conditions[curr_offset].price:.04f}, "
-                    f"could not find next greater price in the Range({purchase_range_min:03d}-{purchase_range_max:03d})"
-                )
+                if trace_sink is not None:
+                    trace_sink.record(
+                        "higher",
+                        curr_offset,
+                        prices[curr_offset],
+                        purchase_range_min,
+                        purchase_range_max,
+                    )
                 curr_offset += 1
 
-        return trade_points
+        return trade_book
 
-    def algorithm_purchase_next_highest(self) -> List[TradePoint]:
+    def algorithm_purchase_next_highest(self) -> TradeBook:
         """
         Step A) Starting with the very first minute M
         Step B) Determine the allowed sell time-window for that minute
@@ -309,65 +499,186 @@ class TradingAlgorithms:
         CONS:
         - Would mostly miss out any purchase opportunities between minute 2 to minute min-hold
         - This profit-making strategy is still myopic
+
+        NOTE:
+        Step C and Step D are answered by PriceIndex (next-greater and non-decreasing run lookups)
+        instead of scanning the range
         """
         logging.info("Running: Algorithm of purchasing the local highest")
-        trade_points: List[TradePoint] = []
+        trade_book = TradeBook(self.market_series)
+        prices = self.market_series.prices
+        num_market_conditions = len(prices)
+        price_index = self.get_price_index()
+        time_index = self.get_time_index()
+        # A dense series needs no search, its windows are plain offset arithmetic
+        is_dense = time_index.is_dense
+        min_hold, max_hold = self.min_hold, self.max_hold
+        counters = self.counters
+        trace_sink = self.trace_sink
 
         # Step A
         curr_offset = 0
-        while curr_offset + self.min_hold < len(self.market_conditions):
-
+        while curr_offset < num_market_conditions:
             # Step B
-            purchase_range_min, purchase_range_max = self.get_purchase_range(
-                curr_offset=curr_offset,
-                num_market_conditions=len(self.market_conditions),
-            )
+            if is_dense:
+                purchase_range_min = curr_offset + min_hold + 1
+                purchase_range_max = min(
+                    curr_offset + max_hold + 1, num_market_conditions
+                )
+            else:
+                purchase_range_min, purchase_range_max = time_index.sell_window(
+                    curr_offset, min_hold, max_hold
+                )
+            if purchase_range_min > num_market_conditions:
+                break
+            if counters is not None:
+                counters.ticks_visited += 1
+                counters.window_scans += 1
+                counters.comparisons += 1
 
             # Step C
-            local_max_price_offset = 0
-            sell_market_condition: MarketCondition
-            for i in range(purchase_range_min, purchase_range_max):
-                if (
-                    self.market_conditions[i].price
-                    > self.market_conditions[curr_offset].price
-                ):
-                    local_max_price_offset = i
-                    sell_market_condition = self.market_conditions[i]
-                    break
+            local_max_price_offset = price_index.first_greater_in_range(
+                purchase_range_min, purchase_range_max, prices[curr_offset]
+            )
 
             # Step D
-            if local_max_price_offset:
-                i = i + 1
-                while i < purchase_range_max:
-                    if (
-                        self.market_conditions[i].price
-                        >= self.market_conditions[i - 1].price
-                    ):
-                        local_max_price_offset = i
-                        sell_market_condition = self.market_conditions[i]
-                    else:
-                        break
-                    i += 1
-
-                logging.debug(
-                    f"algorithm_purchase_next_highest: Current price at {curr_offset:03d}={self.market_conditions[curr_offset].price:.04f}, "
-                    f"Range({purchase_range_min:03d}-{purchase_range_max-1:03d}) has first greater={sell_market_condition.price:.4f} "
-                    f"@ minute {local_max_price_offset:03d}"
+            if local_max_price_offset != PriceIndex.NOT_FOUND:
+                local_max_price_offset = min(
+                    price_index.run_end(local_max_price_offset),
+                    purchase_range_max - 1,
                 )
+
+                if trace_sink is not None:
+                    trace_sink.record(
+                        "highest",
+                        curr_offset,
+                        prices[curr_offset],
+                        purchase_range_min,
+                        purchase_range_max,
+                        local_max_price_offset,
+                        prices[local_max_price_offset],
+                    )
                 # Step E
-                trade_point = TradePoint(
-                    purchase_point=self.market_conditions[curr_offset],
-                    sell_point=sell_market_condition,
-                )
-                trade_points.append(trade_point)
+                trade_book.append(curr_offset, local_max_price_offset)
                 # Step F
                 curr_offset = local_max_price_offset + 1
             else:
                 # Step G
-                logging.debug(
-                    f"algorithm_purchase_next_highest: Current price at {curr_offset:03d}={self.market_conditions[curr_offset].price:.04f}, "
-                    f"could not find next greater price in the Range({purchase_range_min:03d}-{purchase_range_max:03d})"
-                )
+                if trace_sink is not None:
+                    trace_sink.record(
+                        "highest",
+                        curr_offset,
+                        prices[curr_offset],
+                        purchase_range_min,
+                        purchase_range_max,
+                    )
                 curr_offset += 1
 
-        return trade_points
+        return trade_book
+
+    def algorithm_optimal_max_profit(self) -> TradeBook:
+        """
+        Dynamic programming over the minutes, finding the set of non-overlapping
+        trades with the maximum total profit (an upper bound for the other algorithms)
+
+        best_profit[N] = Maximum total profit of the trades that are all closed by minute N
+                       = the larger of
+                         - best_profit[N-1] (nothing is sold at minute N)
+                         - best_profit[M-1] - price[M] + price[N], for every purchase minute M
+                           whose allowed sell time-window includes minute N
+
+        Step A) For each minute N, add the minutes M that just entered the purchase window
+                (M + min-hold < N) to a monotonic deque ordered by best_profit[M-1] - price[M]
+        Step B) Drop the minutes from the front of the deque that have left the window (M + max-hold < N)
+        Step C) The front of the deque is the best purchase minute for selling at N,
+                record it if that beats best_profit[N-1]
+        Step D) Once all the minutes are done, walk back from the last minute to collect the trades
+
+        PRO:
+        - Makes the most profit that is possible under the hold time constraints
+        - Runs in O(n), regardless of the hold time-window
+
+        CONS:
+        - Needs all the prices upfront (it is not myopic because it can see the future)
+        - Keeps two extra arrays as long as the prices
+        """
+        logging.info("Running: Algorithm of maximizing the total profit")
+        prices = self.market_series.prices
+        num_market_conditions = len(prices)
+        counters = self.counters
+        trace_sink = self.trace_sink
+
+        best_profit: array = array("d", [0.0]) * num_market_conditions
+        # Purchase minute of the trade sold at each minute, or -1 if nothing is sold
+        purchase_offsets: array = array("q", [-1]) * num_market_conditions
+
+        def profit_before_purchase(purchase_offset: int) -> float:
+            return best_profit[purchase_offset - 1] if purchase_offset > 0 else 0.0
+
+        time_index = self.get_time_index()
+        minutes = time_index.minutes
+        min_hold, max_hold = self.min_hold, self.max_hold
+        candidates: deque = deque()  # (purchase offset, profit before it - its price)
+        next_purchase_offset = 0  # The next minute to enter the purchase window
+        for sell_offset in range(num_market_conditions):
+            if counters is not None:
+                # Step A stops at a comparison that does not pop, Step C compares once
+                counters.ticks_visited += 1
+                counters.comparisons += 2
+            sell_minute = minutes[sell_offset]
+            # Step A
+            while minutes[next_purchase_offset] + min_hold < sell_minute:
+                purchase_offset = next_purchase_offset
+                value = (
+                    profit_before_purchase(purchase_offset) - prices[purchase_offset]
+                )
+                while candidates and candidates[-1][1] <= value:
+                    if counters is not None:
+                        counters.comparisons += 1
+                    candidates.pop()
+                candidates.append((purchase_offset, value))
+                next_purchase_offset += 1
+
+            # Step B
+            while candidates and minutes[candidates[0][0]] + max_hold < sell_minute:
+                candidates.popleft()
+
+            # Step C
+            best_profit[sell_offset] = (
+                best_profit[sell_offset - 1] if sell_offset > 0 else 0.0
+            )
+            if candidates:
+                purchase_offset, value = candidates[0]
+                if value + prices[sell_offset] > best_profit[sell_offset]:
+                    best_profit[sell_offset] = value + prices[sell_offset]
+                    purchase_offsets[sell_offset] = purchase_offset
+
+        # Step D
+        trade_book = TradeBook(self.market_series)
+        sell_offset = num_market_conditions - 1
+        while sell_offset >= 0:
+            purchase_offset = purchase_offsets[sell_offset]
+            if purchase_offset == -1:
+                sell_offset -= 1
+                continue
+            trade_book.append(purchase_offset, sell_offset)
+            sell_offset = purchase_offset - 1
+        trade_book.reverse()
+
+        # The decisions are only known once walked back, so they are traced here
+        if trace_sink is not None:
+            for purchase_offset, sell_offset in zip(
+                trade_book.purchase_offsets, trade_book.sell_offsets
+            ):
+                trace_sink.record(
+                    "optimal",
+                    purchase_offset,
+                    prices[purchase_offset],
+                    *time_index.sell_window(
+                        purchase_offset, self.min_hold, self.max_hold
+                    ),
+                    sell_offset,
+                    prices[sell_offset],
+                )
+
+        return trade_book
@@ -0,0 +1,331 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import accumulate, islice
+from typing import Callable, Dict, List, Tuple, Union
+import logging
+import operator
+
+from .market_series import MarketData, as_market_series
+from .price_index import PriceIndex
+from .range_max import SlidingWindowMax, SparseTableMax
+from .result import Result
+from .time_index import TimeIndex
+from .trading_algorithms import TradingAlgorithms
+
+MINUTES_PER_DAY: int = 1440
+NOT_FOUND: int = -1
+
+# The sell offset a purchase at an offset is traded for, in its sell window
+# [range_min, range_max), or NOT_FOUND if it is not traded
+SellDecision = Callable[[int, int, int], int]
+
+
+@dataclass(frozen=True)
+class WindowResult:
+    first_minute: int
+    last_minute: int  # Included
+    num_market_conditions: int
+    num_trades: int
+    total_profit: float
+
+
+class WalkForward:
+    """
+    Results of an algorithm over many windows of a long series (e.g. a rolling
+    N-day window advanced by a day), without running it afresh over each window
+
+    The greedy algorithms (all but optimal) decide at each offset, looking only
+    at the prices of its sell window, either to trade it (and carry on after the
+    sell offset) or not (and carry on at the next offset). So a run from any
+    offset, once it visits an offset the run over the whole series visited too,
+    makes the very same trades from there on, as long as the sell windows are
+    within the window being run over. The algorithm is run over the whole series
+    once, and the profit of its trades kept as prefix sums, so a window costs:
+    - the decisions from its first offset until the run joins the whole run
+      (usually a few trades), answered by the structures the run built
+    - the trades of the whole run in between, a difference of two prefix sums
+    - the decisions of the last max-hold minutes, whose sell windows the end of
+      the window cuts short
+    i.e. about the same whatever the length of the window.
+
+    optimal (whose trades depend on the whole window) is run over each window.
+    """
+
+    INCREMENTAL_ALGORITHMS: Tuple[str, ...] = (
+        "adjacent",
+        "minmax",
+        "highest",
+        "higher",
+        "max",
+    )
+
+    def __init__(self, trading_algorithms: TradingAlgorithms, algorithm_choice: str):
+        self.trading_algorithms: TradingAlgorithms = trading_algorithms
+        self.algorithm_choice: str = algorithm_choice
+        self.market_series = trading_algorithms.market_series
+        if algorithm_choice not in self.INCREMENTAL_ALGORITHMS:
+            return
+
+        # The structures the run over the whole series builds (or is given, see
+        # TradingAlgorithms.precompute()) are shared by the decisions
+        trade_book = trading_algorithms.run_trade_book(algorithm_choice)
+        self.time_index: TimeIndex = trading_algorithms.get_time_index()
+        self.range_max_table = trading_algorithms.range_max_table
+        self.purchase_offsets = trade_book.purchase_offsets
+        self.sell_offsets = trade_book.sell_offsets
+        self.profit_sums = list(accumulate(trade_book.profits(), initial=0.0))
+        # The offsets the whole run made a decision at, i.e. all but the ones
+        # skipped while holding a trade
+        self.visited = bytearray(b"\x01") * len(self.market_series)
+        for purchase_offset, sell_offset in zip(
+            self.purchase_offsets, self.sell_offsets
+        ):
+            self.visited[purchase_offset + 1 : sell_offset + 1] = bytes(
+                sell_offset - purchase_offset
+            )
+
+    @classmethod
+    def SELL_DECISIONS(cls) -> Dict:
+        # The decisions of the greedy algorithms of TradingAlgorithms, as they
+        # would be made over a window (i.e. with range_max cut at its end)
+        # A decision is made for each walk, and is asked for ranges that only
+        # move forward
+        sell_decisions = {}
+        sell_decisions["adjacent"] = cls.adjacent_sell_decision
+        sell_decisions["minmax"] = cls.minmax_sell_decision
+        sell_decisions["highest"] = cls.highest_sell_decision
+        sell_decisions["higher"] = cls.higher_sell_decision
+        sell_decisions["max"] = cls.max_sell_decision
+        return sell_decisions
+
+    def adjacent_sell_decision(self) -> SellDecision:
+        prices = self.market_series.prices
+
+        def decide(curr_offset: int, range_min: int, range_max: int) -> int:
+            if range_min < range_max and prices[curr_offset] < prices[range_min]:
+                return range_min
+            return NOT_FOUND
+
+        return decide
+
+    def minmax_sell_decision(self) -> SellDecision:
+        prices = self.market_series.prices
+
+        def decide(curr_offset: int, range_min: int, range_max: int) -> int:
+            if range_min < range_max and prices[range_min] > prices[curr_offset]:
+                # The highest point of the surge, within the range
+                sell_offset = range_min
+                while (
+                    sell_offset + 1 < range_max
+                    and prices[sell_offset + 1] >= prices[sell_offset]
+                ):
+                    sell_offset += 1
+                return sell_offset
+            return NOT_FOUND
+
+        return decide
+
+    def highest_sell_decision(self) -> SellDecision:
+        prices = self.market_series.prices
+        price_index = self.trading_algorithms.get_price_index()
+
+        def decide(curr_offset: int, range_min: int, range_max: int) -> int:
+            offset = price_index.first_greater_in_range(
+                range_min, range_max, prices[curr_offset]
+            )
+            if offset == PriceIndex.NOT_FOUND:
+                return NOT_FOUND
+            return min(price_index.run_end(offset), range_max - 1)
+
+        return decide
+
+    def higher_sell_decision(self) -> SellDecision:
+        prices = self.market_series.prices
+        price_index = self.trading_algorithms.get_price_index()
+
+        def decide(curr_offset: int, range_min: int, range_max: int) -> int:
+            offset = price_index.first_greater_in_range(
+                range_min, range_max, prices[curr_offset]
+            )
+            return NOT_FOUND if offset == PriceIndex.NOT_FOUND else offset
+
+        return decide
+
+    def max_sell_decision(self) -> SellDecision:
+        prices = self.market_series.prices
+        window_max: Union[SparseTableMax, SlidingWindowMax] = (
+            self.range_max_table
+            if self.range_max_table is not None
+            else SlidingWindowMax(prices)
+        )
+
+        def decide(curr_offset: int, range_min: int, range_max: int) -> int:
+            offset, price = window_max.query(range_min, range_max)
+            return offset if price > prices[curr_offset] else NOT_FOUND
+
+        return decide
+
+    def window(self, start_offset: int, stop_offset: int) -> Tuple[int, float]:
+        """
+        Return (number of trades, total profit) of the algorithm run over the
+        offsets [start_offset, stop_offset) of the series only
+        """
+        if self.algorithm_choice not in self.INCREMENTAL_ALGORITHMS:
+            trade_book = TradingAlgorithms(
+                self.market_series[start_offset:stop_offset],
+                self.trading_algorithms.min_hold,
+                self.trading_algorithms.max_hold,
+            ).run_trade_book(self.algorithm_choice)
+            return (len(trade_book), trade_book.total_profit())
+        if start_offset >= stop_offset:
+            return (0, 0.0)
+
+        # The purchases before joined_stop have their sell windows within the
+        # window, and do not sell at its last offset (see algorithm_pair_min_max)
+        minutes = self.market_series.minutes
+        joined_stop = bisect_left(
+            minutes,
+            minutes[stop_offset - 1] - self.trading_algorithms.max_hold,
+            start_offset,
+            stop_offset,
+        )
+
+        # Until the run joins the whole run
+        num_trades, total_profit, curr_offset = self.walk(
+            start_offset, stop_offset, joined_stop, until_visited=True
+        )
+        # Along the whole run
+        if curr_offset < joined_stop:
+            first_trade = bisect_left(self.purchase_offsets, curr_offset)
+            stop_trade = bisect_left(self.purchase_offsets, joined_stop, first_trade)
+            num_trades += stop_trade - first_trade
+            total_profit += self.profit_sums[stop_trade] - self.profit_sums[first_trade]
+            curr_offset = joined_stop
+            if stop_trade > first_trade:
+                curr_offset = max(curr_offset, self.sell_offsets[stop_trade - 1] + 1)
+        # The sell windows cut short by the end of the window
+        tail_trades, tail_profit, _ = self.walk(
+            curr_offset, stop_offset, stop_offset, until_visited=False
+        )
+        return (num_trades + tail_trades, total_profit + tail_profit)
+
+    def walk(
+        self, curr_offset: int, stop_offset: int, walk_stop: int, until_visited: bool
+    ) -> Tuple[int, float, int]:
+        """
+        Make the decisions of the algorithm from curr_offset on, with the sell
+        windows cut at stop_offset, until walk_stop (or until an offset the whole
+        run visited). Return the number of trades, their profit, and the offset
+        the walk stopped at
+        """
+        prices = self.market_series.prices
+        time_index = self.time_index
+        min_hold = self.trading_algorithms.min_hold
+        max_hold = self.trading_algorithms.max_hold
+        sell_decision = self.SELL_DECISIONS()[self.algorithm_choice](self)
+        visited = self.visited
+        is_minmax = self.algorithm_choice == "minmax"
+
+        num_trades, total_profit = 0, 0.0
+        while curr_offset < walk_stop:
+            if until_visited and visited[curr_offset]:
+                break
+            range_min, range_max = time_index.sell_window(
+                curr_offset, min_hold, max_hold
+            )
+            if range_min >= stop_offset:
+                # Neither this nor any later purchase can be sold within the window
+                return (num_trades, total_profit, walk_stop)
+            sell_offset = sell_decision(
+                curr_offset, range_min, min(range_max, stop_offset)
+            )
+            if sell_offset == NOT_FOUND:
+                curr_offset += 1
+                continue
+            if is_minmax and sell_offset + 1 == stop_offset:
+                return (num_trades, total_profit, walk_stop)
+            num_trades += 1
+            total_profit += prices[sell_offset] - prices[curr_offset]
+            curr_offset = sell_offset + 1
+        return (num_trades, total_profit, curr_offset)
+
+
+def walk_forward(
+    market_data: MarketData,
+    algorithm_choice: str,
+    window_minutes: int,
+    step_minutes: int = MINUTES_PER_DAY,
+    min_hold=-1,
+    max_hold=-1,
+) -> Result:
+    """
+    Run the algorithm over every window of window_minutes of the series, from
+    its first minute on, advanced by step_minutes, as long as the window is
+    complete (i.e. ends by the last minute of the series)
+    On success, the result is the list of WindowResult, in the order of the windows
+    """
+    market_series = as_market_series(market_data)
+    minutes = market_series.minutes
+    if window_minutes <= 0 or step_minutes <= 0:
+        return Result(
+            isSuccess=False,
+            message=f"Found a window of {window_minutes} minutes advanced by {step_minutes}, expected positive minutes",
+            result=None,
+        )
+    if not all(map(operator.lt, minutes, islice(minutes, 1, None))):
+        return Result(
+            isSuccess=False,
+            message="The minutes are not in increasing order, the windows can not be told apart",
+            result=None,
+        )
+
+    try:
+        trading_algorithms = TradingAlgorithms(market_series, min_hold, max_hold)
+    except ValueError as ex:
+        return Result(isSuccess=False, message=str(ex), result=None)
+    walk = WalkForward(trading_algorithms, algorithm_choice)
+    window_results: List[WindowResult] = []
+    if len(minutes):
+        first_minute = minutes[0]
+        while first_minute + window_minutes <= minutes[-1] + 1:
+            start_offset = bisect_left(minutes, first_minute)
+            stop_offset = bisect_left(
+                minutes, first_minute + window_minutes, start_offset
+            )
+            num_trades, total_profit = walk.window(start_offset, stop_offset)
+            window_results.append(
+                WindowResult(
+                    first_minute=first_minute,
+                    last_minute=first_minute + window_minutes - 1,
+                    num_market_conditions=stop_offset - start_offset,
+                    num_trades=num_trades,
+                    total_profit=total_profit,
+                )
+            )
+            first_minute += step_minutes
+
+    logging.info(
+        f"walk_forward: {algorithm_choice} over {len(window_results)} windows of {window_minutes} minutes"
+    )
+    return Result(isSuccess=True, message="", result=window_results)
+
+
+def format_walk_forward_report(window_results: List[WindowResult]) -> str:
+    header = f"{'First':>10} {'Last':>10} {'Rows':>10} {'Trades':>8} {'Profit':>10}"
+    lines = [header, "-" * len(header)]
+    for window_result in window_results:
+        lines.append(
+            f"{window_result.first_minute:>10d} {window_result.last_minute:>10d} "
+            f"{window_result.num_market_conditions:>10d} {window_result.num_trades:>8d} "
+            f"{window_result.total_profit:>10.4f}"
+        )
+    lines.append("-" * len(header))
+    profits = [window_result.total_profit for window_result in window_results]
+    if profits:
+        lines.append(
+            f"{len(profits)} windows, profit mean {sum(profits) / len(profits):.4f} "
+            f"min {min(profits):.4f} max {max(profits):.4f}"
+        )
+    else:
+        lines.append("No complete window within the series")
+    return "\n".join(lines)
@@ -0,0 +1,63 @@
+import io
+import os
+import tempfile
+import unittest
+
+from src.backtest import (
+    find_csv_files,
+    format_summary_table,
+    run_backtest,
+    write_summary_csv,
+)
+from src.market_series import read_market_series
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestBacktest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_filenames = []
+        for day in range(2):
+            csv_filename = os.path.join(self.temp_dir.name, f"day{day}.csv")
+            with open(csv_filename, "w", encoding="ascii") as csvfile:
+                csvfile.write("Time,Price\n")
+                for minute in range(200):
+                    csvfile.write(f"{minute},{1 + ((minute * (day + 3)) % 17) / 100}\n")
+            self.csv_filenames.append(csv_filename)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find_csv_files(self):
+        self.assertEqual(find_csv_files([self.temp_dir.name]), self.csv_filenames)
+        self.assertEqual(
+            find_csv_files([os.path.join(self.temp_dir.name, "day1*")]),
+            self.csv_filenames[1:],
+        )
+
+    def test_summaries_match_direct_runs(self):
+        algorithms = ["max", "optimal"]
+        summaries = run_backtest(self.csv_filenames, algorithms, processes=2)
+        self.assertEqual(len(summaries), 4)
+        for summary in summaries:
+            market_series = read_market_series(summary.file).result
+            trade_points = TradingAlgorithms(market_series).run(summary.algorithm)
+            self.assertEqual(summary.num_market_conditions, 200)
+            self.assertEqual(summary.num_trades, len(trade_points))
+            self.assertAlmostEqual(
+                summary.total_profit, sum(tp.profit for tp in trade_points)
+            )
+
+    def test_unreadable_file_is_reported(self):
+        summaries = run_backtest(["missing.csv"], ["max"], processes=1)
+        self.assertEqual(len(summaries), 1)
+        self.assertIn("No such file", summaries[0].error)
+        self.assertIn("Error:", format_summary_table(summaries))
+
+    def test_write_summary_csv(self):
+        summaries = run_backtest(self.csv_filenames[:1], ["adjacent"], processes=1)
+        output = io.StringIO()
+        write_summary_csv(summaries, output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("file,algorithm,"))
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from src.benchmark import (
+    CSV_INGEST_STAGE,
+    BenchmarkResult,
+    find_regressions,
+    load_baseline,
+    run_benchmark,
+    save_baseline,
+)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_benchmark(self):
+        results = run_benchmark(
+            ["flat", "sawtooth"], [200], ["adjacent", "optimal"], repeat=1
+        )
+        self.assertEqual(
+            [(result.regime, result.stage) for result in results],
+            [
+                ("flat", CSV_INGEST_STAGE),
+                ("flat", "adjacent"),
+                ("flat", "optimal"),
+                ("sawtooth", CSV_INGEST_STAGE),
+                ("sawtooth", "adjacent"),
+                ("sawtooth", "optimal"),
+            ],
+        )
+        for result in results:
+            self.assertEqual(result.num_ticks, 200)
+            self.assertGreater(result.seconds, 0.0)
+            self.assertGreater(result.peak_memory_bytes, 0)
+
+    def test_baseline_round_trip(self):
+        results = [BenchmarkResult("flat", 100, "max", 0.5, 1024)]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            baseline_filename = os.path.join(temp_dir, "baseline.json")
+            save_baseline(results, baseline_filename)
+            self.assertEqual(
+                load_baseline(baseline_filename), {"flat/100/max": results[0]}
+            )
+
+    def test_find_regressions(self):
+        baseline = {
+            "flat/100/max": BenchmarkResult("flat", 100, "max", 1.0, 10**6),
+            "flat/100/higher": BenchmarkResult("flat", 100, "higher", 1.0, 10**6),
+        }
+        results = [
+            BenchmarkResult("flat", 100, "max", 1.2, 10**6),  # Within the threshold
+            BenchmarkResult("flat", 100, "higher", 1.5, 2 * 10**6),  # Slower, bigger
+            BenchmarkResult("flat", 100, "optimal", 9.0, 10**9),  # Not in baseline
+        ]
+        regressions = find_regressions(results, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith("flat/100/higher") for r in regressions))
+
+    def test_tiny_differences_are_not_regressions(self):
+        baseline = {"flat/100/max": BenchmarkResult("flat", 100, "max", 0.001, 100)}
+        results = [BenchmarkResult("flat", 100, "max", 0.002, 200)]
+        self.assertEqual(find_regressions(results, baseline, threshold=0.25), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from src.checkpoint import Checkpoint, run_incremental
+from src.csv_util import read_csv_columns
+from src.market_series import MarketSeries, market_condition_column_translations
+from src.online_engine import OnlineTradingEngine
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(23)
+        self.prices = [round(1 + rng.random() * 0.5, 4) for _ in range(1500)]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_filename = os.path.join(self.temp_dir.name, "growing.csv")
+        self.checkpoint_filename = os.path.join(self.temp_dir.name, "growing.ckpt")
+        self.lines = [f"{minute},{price}\n" for minute, price in enumerate(self.prices)]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def trades(self, trade_points):
+        return [(tp.purchase_point, tp.sell_point) for tp in trade_points]
+
+    def expected_trades(self, algorithm, num_ticks, prices=None):
+        prices = self.prices[:num_ticks] if prices is None else prices
+        market_series = MarketSeries(range(num_ticks), prices)
+        return self.trades(
+            TradingAlgorithms(market_series, min_hold=2, max_hold=25).run(algorithm)
+        )
+
+    def write_csv(self, text):
+        with open(self.csv_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write("Time,Price\n" + text)
+
+    def test_engine_carries_on_from_its_state(self):
+        for algorithm in OnlineTradingEngine.ALGORITHMS():
+            with self.subTest(algorithm=algorithm):
+                engine = OnlineTradingEngine(algorithm, min_hold=2, max_hold=25)
+                trade_points = []
+                for minute, price in enumerate(self.prices[:777]):
+                    trade_points.extend(engine.on_tick(minute, price))
+                state = json.loads(json.dumps(engine.get_state()))
+
+                engine = OnlineTradingEngine.from_state(state)
+                for minute, price in enumerate(self.prices[777:], 777):
+                    trade_points.extend(engine.on_tick(minute, price))
+                trade_points.extend(engine.finish())
+                self.assertEqual(
+                    self.trades(trade_points),
+                    self.expected_trades(algorithm, len(self.prices)),
+                )
+                with self.assertRaises(ValueError):
+                    engine.get_state()
+
+    def test_incremental_runs_match_full_runs(self):
+        for algorithm in OnlineTradingEngine.ALGORITHMS():
+            if os.path.exists(self.checkpoint_filename):
+                os.remove(self.checkpoint_filename)
+            num_lines = 0
+            for next_num_lines in (0, 40, 41, 600, 1000, 1500):
+                # The last line is being written, its price is cut short
+                text = "".join(self.lines[:next_num_lines])
+                prices = self.prices[:next_num_lines]
+                if next_num_lines < len(self.lines):
+                    partial_line = self.lines[next_num_lines][:-2]
+                    text += partial_line
+                    prices.append(float(partial_line.split(",")[1]))
+                self.write_csv(text)
+                with self.subTest(algorithm=algorithm, num_lines=next_num_lines):
+                    result = run_incremental(
+                        self.csv_filename,
+                        self.checkpoint_filename,
+                        algorithm,
+                        min_hold=2,
+                        max_hold=25,
+                    )
+                    self.assertTrue(result.isSuccess, result.message)
+                    trade_book, num_rows = result.result
+                    num_ticks = next_num_lines + (next_num_lines < len(self.lines))
+                    # The half line is read again, once complete
+                    self.assertEqual(num_rows, num_ticks - num_lines)
+                    self.assertEqual(
+                        self.trades(trade_book),
+                        self.expected_trades(algorithm, num_ticks, prices),
+                    )
+                num_lines = next_num_lines
+
+    def test_small_blocks_and_blank_lines(self):
+        # Blank lines (skipped by the parser, as a full read does) every 50 rows
+        text = "".join(
+            line + ("\n" if minute % 50 == 49 else "")
+            for minute, line in enumerate(self.lines[:300])
+        )
+        self.write_csv(text)
+        with mock.patch("src.checkpoint.READ_BLOCK_SIZE", 97):
+            result = run_incremental(
+                self.csv_filename, self.checkpoint_filename, "max", 2, 25
+            )
+            self.assertTrue(result.isSuccess, result.message)
+            self.assertEqual(result.result[1], 300)
+            self.assertEqual(
+                self.trades(result.result[0]), self.expected_trades("max", 300)
+            )
+
+            self.write_csv(text + "".join(self.lines[300:400]) + "400,oops\n")
+            result = run_incremental(
+                self.csv_filename, self.checkpoint_filename, "max", 2, 25
+            )
+        self.assertFalse(result.isSuccess)
+        # The same line number as reading the whole file at once
+        self.assertIn("Line: 402", result.message)
+        self.assertEqual(
+            result.message,
+            read_csv_columns(
+                self.csv_filename, market_condition_column_translations()
+            ).message,
+        )
+
+    def test_rewritten_file_starts_over(self):
+        self.write_csv("".join(self.lines[:500]))
+        run_incremental(self.csv_filename, self.checkpoint_filename, "max", 2, 25)
+        self.assertEqual(Checkpoint.load(self.checkpoint_filename).line_number, 502)
+
+        self.write_csv("0,9.99\n" + "".join(self.lines[1:600]))
+        result = run_incremental(
+            self.csv_filename, self.checkpoint_filename, "max", 2, 25
+        )
+        self.assertEqual(result.result[1], 600)
+        # Another algorithm does not use the checkpoint either
+        result = run_incremental(
+            self.csv_filename, self.checkpoint_filename, "higher", 2, 25
+        )
+        self.assertEqual(result.result[1], 600)
+
+    def test_errors(self):
+        self.write_csv("".join(self.lines[:50]) + "50,oops\n")
+        result = run_incremental(
+            self.csv_filename, self.checkpoint_filename, "max", 2, 25
+        )
+        self.assertFalse(result.isSuccess)
+        self.assertIn("Line: 52", result.message)
+        self.assertFalse(os.path.exists(self.checkpoint_filename))
+
+        self.write_csv("".join(self.lines[:50]) + "".join(self.lines[40:45]))
+        result = run_incremental(
+            self.csv_filename, self.checkpoint_filename, "max", 2, 25
+        )
+        self.assertFalse(result.isSuccess)
+        self.assertIn("expected increasing minutes", result.message)
+
+        result = run_incremental(
+            self.csv_filename, self.checkpoint_filename, "optimal", 2, 25
+        )
+        self.assertFalse(result.isSuccess)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import unittest
+
+from src.compressed_input import (
+    BackgroundDecompressor,
+    detect_compression,
+    open_csv_text,
+)
+from src.csv_util import CsvReadError, iterate_csv_columns
+from src.market_series import market_condition_column_translations, read_market_series
+
+
+class TestCompressedInput(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.text = "Time,Price\n" + "".join(
+            f"{minute},{1 + (minute % 13) / 100}\n" for minute in range(5000)
+        )
+        self.csv_filename = self.write_file("plain.csv", self.text.encode())
+        self.gzip_filename = self.write_file(
+            "data.csv.gz", gzip.compress(self.text.encode())
+        )
+        self.xz_filename = self.write_file(
+            "data.csv.xz", lzma.compress(self.text.encode())
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name, data):
+        filename = os.path.join(self.temp_dir.name, name)
+        with open(filename, "wb") as file:
+            file.write(data)
+        return filename
+
+    def test_detect_compression(self):
+        self.assertIsNone(detect_compression(self.csv_filename))
+        self.assertEqual(detect_compression(self.gzip_filename), "gzip")
+        self.assertEqual(detect_compression(self.xz_filename), "xz")
+
+    def test_compressed_files_read_as_plain_ones(self):
+        plain_series = read_market_series(self.csv_filename).result
+        for filename in (self.gzip_filename, self.xz_filename):
+            with self.subTest(filename=filename):
+                with open_csv_text(filename) as csvfile:
+                    self.assertEqual(csvfile.read(), self.text)
+                result = read_market_series(filename)
+                self.assertTrue(result.isSuccess)
+                self.assertEqual(result.result.minutes, plain_series.minutes)
+                self.assertEqual(result.result.prices, plain_series.prices)
+
+    def test_small_chunks_and_queue(self):
+        decompressor = BackgroundDecompressor(
+            gzip.open(self.gzip_filename, "rb"), chunk_size=7, queue_chunks=1
+        )
+        with io.TextIOWrapper(io.BufferedReader(decompressor, 5), "ascii") as text:
+            self.assertEqual(text.read(), self.text)
+
+    def test_decompression_error_is_raised_to_the_reader(self):
+        corrupt_filename = self.write_file(
+            "corrupt.csv.gz", gzip.compress(self.text.encode())[:-200]
+        )
+        with self.assertRaises(CsvReadError) as context:
+            for _ in iterate_csv_columns(
+                corrupt_filename, market_condition_column_translations()
+            ):
+                pass
+        self.assertIn("Decompression failed", str(context.exception))
+
+    def test_reader_can_stop_early(self):
+        decompressor = BackgroundDecompressor(
+            gzip.open(self.gzip_filename, "rb"), chunk_size=16, queue_chunks=1
+        )
+        self.assertEqual(decompressor.read(4), b"Time")
+        decompressor.close()
+        self.assertFalse(decompressor.thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
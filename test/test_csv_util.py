@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+
+from src.csv_util import (
+    ColumnTranslation,
+    CsvReadError,
+    iterate_csv_columns,
+    iterate_csv_file,
+    iterate_csv_file_in_chunks,
+    read_csv_columns,
+    read_csv_file,
+)
+from src.market_condition import MarketCondition
+
+
+class TestCsvUtil(unittest.TestCase):
+    def setUp(self):
+        self.column_translations = [
+            ColumnTranslation("Time", "minute", int),
+            ColumnTranslation("Price", "price", float),
+        ]
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_csv(self, content: str) -> str:
+        csv_filename = os.path.join(self.temp_dir.name, "market_conditions.csv")
+        with open(csv_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write(content)
+        return csv_filename
+
+    def test_iterate_yields_row_objects(self):
+        csv_filename = self.write_csv("Time,Price\n0,1.5\n1,1.25\n2,1.75\n")
+        rows = iterate_csv_file(csv_filename, self.column_translations, MarketCondition)
+        self.assertEqual(next(rows), MarketCondition(0, 1.5))
+        self.assertEqual(
+            list(rows), [MarketCondition(1, 1.25), MarketCondition(2, 1.75)]
+        )
+
+    def test_iterate_in_chunks(self):
+        csv_filename = self.write_csv(
+            "Time,Price\n" + "".join(f"{i},1.0\n" for i in range(5))
+        )
+        chunks = list(
+            iterate_csv_file_in_chunks(
+                csv_filename, self.column_translations, MarketCondition, chunk_size=2
+            )
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+
+    def test_bad_value_reports_line_number(self):
+        csv_filename = self.write_csv("Time,Price\n0,1.5\n1,oops\n")
+        with self.assertRaises(CsvReadError) as context:
+            list(
+                iterate_csv_file(
+                    csv_filename, self.column_translations, MarketCondition
+                )
+            )
+        self.assertIn("Line: 3", str(context.exception))
+
+    def test_read_csv_file_reports_field_count(self):
+        csv_filename = self.write_csv("Time,Price\n0,1.5\n1,1.5,9\n")
+        result = read_csv_file(csv_filename, self.column_translations, MarketCondition)
+        self.assertFalse(result.isSuccess)
+        self.assertIn("Line: 3 Error: Found 3 fields, expected 2", result.message)
+
+    def test_read_csv_file(self):
+        csv_filename = self.write_csv("Time,Price\n0,1.5\n")
+        result = read_csv_file(csv_filename, self.column_translations, MarketCondition)
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result, [MarketCondition(0, 1.5)])
+
+    def test_read_csv_columns(self):
+        csv_filename = self.write_csv("Price,Time\r\n1.5,0\r\n\r\n1.25,1\r\n")
+        result = read_csv_columns(csv_filename, self.column_translations)
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result["minute"].typecode, "q")
+        self.assertEqual(list(result.result["minute"]), [0, 1])
+        self.assertEqual(list(result.result["price"]), [1.5, 1.25])
+
+    def test_read_csv_columns_str_column(self):
+        csv_filename = self.write_csv(
+            "Symbol,Time,Price\nEURUSD,0,1.5\nUSDJPY,0,150.25\n"
+        )
+        result = read_csv_columns(
+            csv_filename,
+            [ColumnTranslation("Symbol", "symbol", str)] + self.column_translations,
+        )
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result["symbol"], ["EURUSD", "USDJPY"])
+        self.assertEqual(list(result.result["price"]), [1.5, 150.25])
+
+    def test_iterate_csv_columns_in_chunks(self):
+        csv_filename = self.write_csv(
+            "Time,Price\n" + "".join(f"{i},1.0\n" for i in range(5))
+        )
+        chunks = list(
+            iterate_csv_columns(csv_filename, self.column_translations, chunk_size=2)
+        )
+        self.assertEqual([len(chunk["minute"]) for chunk in chunks], [2, 2, 1])
+
+    def test_read_csv_columns_reports_same_errors(self):
+        for content in (
+            "Time,Price\n0,1.5\n1,oops\n",
+            "Time,Price\n0,1.5\n1,1.5,9\n",
+        ):
+            csv_filename = self.write_csv(content)
+            bulk_result = read_csv_columns(csv_filename, self.column_translations)
+            result = read_csv_file(
+                csv_filename, self.column_translations, MarketCondition
+            )
+            self.assertFalse(bulk_result.isSuccess)
+            self.assertEqual(bulk_result.message, result.message)
+
+    def test_read_csv_columns_quoted_fields(self):
+        csv_filename = self.write_csv('"Time","Price"\n"0","1.5"\n1,2.5\n"2",3.5\n')
+        result = read_csv_columns(csv_filename, self.column_translations)
+        self.assertTrue(result.isSuccess, result.message)
+        self.assertEqual(list(result.result["minute"]), [0, 1, 2])
+        self.assertEqual(list(result.result["price"]), [1.5, 2.5, 3.5])
+        row_objects = read_csv_file(
+            csv_filename, self.column_translations, MarketCondition
+        ).result
+        self.assertEqual([row.minute for row in row_objects], [0, 1, 2])
+
+    def test_read_csv_columns_missing_header(self):
+        csv_filename = self.write_csv("Minute,Price\n0,1.5\n")
+        result = read_csv_columns(csv_filename, self.column_translations)
+        self.assertFalse(result.isSuccess)
+        self.assertIn("Line: 1 Error: Field 'Time' missing!", result.message)
@@ -0,0 +1,62 @@
+import argparse
+import io
+import random
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from src.hold_sweep import format_profit_surface, sweep_hold_times
+from src.market_series import MarketSeries
+from src.trading_algorithms import TradingAlgorithms
+from main import hold_times, main, parse_arguments
+
+
+class TestHoldSweep(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(17)
+        prices = [round(rng.random() * 0.5 + 1, 4) for _ in range(500)]
+        self.market_series = MarketSeries(range(len(prices)), prices)
+
+    def test_matches_individual_runs(self):
+        for algorithm in ("max", "higher", "highest"):
+            sweep_points = sweep_hold_times(
+                self.market_series, algorithm, [0, 5, 20], [10, 20, 40], processes=2
+            )
+            # (20, 10) and (20, 20) are not valid pairs
+            self.assertEqual(len(sweep_points), 7)
+            for sweep_point in sweep_points:
+                trade_points = TradingAlgorithms(
+                    self.market_series,
+                    min_hold=sweep_point.min_hold,
+                    max_hold=sweep_point.max_hold,
+                ).run(algorithm)
+                self.assertEqual(sweep_point.num_trades, len(trade_points))
+                self.assertAlmostEqual(
+                    sweep_point.total_profit, sum(tp.profit for tp in trade_points)
+                )
+
+    def test_format_profit_surface(self):
+        sweep_points = sweep_hold_times(
+            self.market_series, "max", [0, 20], [10, 40], processes=1
+        )
+        lines = format_profit_surface(sweep_points).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[2].split()[1] == "-")
+
+    def test_hold_time_arguments(self):
+        self.assertEqual(hold_times("30"), [30])
+        self.assertEqual(hold_times("30,45"), [30, 45])
+        self.assertEqual(hold_times("10:40:10"), [10, 20, 30])
+        for value in ("60:10", "20:10", "10:60:-5"):
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(argparse.ArgumentTypeError, "empty"):
+                    hold_times(value)
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()) as stderr:
+            parse_arguments(["--min-hold", "60:10"])
+        self.assertIn("empty hold time range: '60:10'", stderr.getvalue())
+
+        # The default min hold is not below the max hold
+        arguments = ["main.py", "-f", "test/market_conditions_100.csv"]
+        arguments += ["--min-hold", "-1", "--max-hold", "11"]
+        with redirect_stdout(io.StringIO()) as stdout:
+            self.assertFalse(main(arguments))
+        self.assertIn("expected the min hold below the max hold", stdout.getvalue())
@@ -0,0 +1,79 @@
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from src.instrumentation import (
+    ALGORITHM_STAGE,
+    AlgorithmCounters,
+    RunProfile,
+    cprofiled,
+)
+from src.market_generator import generate_market_series
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.market_series = generate_market_series("random_walk", 500, seed=1)
+
+    def test_counters_do_not_change_the_trades(self):
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            with self.subTest(algorithm=algorithm):
+                counters = AlgorithmCounters()
+                counted = TradingAlgorithms(
+                    self.market_series, min_hold=3, max_hold=10, counters=counters
+                ).run(algorithm)
+                uncounted = TradingAlgorithms(
+                    self.market_series, min_hold=3, max_hold=10
+                ).run(algorithm)
+                self.assertEqual(
+                    [(tp.purchase_offset, tp.sell_offset) for tp in counted],
+                    [(tp.purchase_offset, tp.sell_offset) for tp in uncounted],
+                )
+                self.assertEqual(counters.trades_emitted, len(counted))
+                self.assertGreater(counters.ticks_visited, 0)
+                self.assertGreaterEqual(counters.comparisons, counters.ticks_visited)
+
+    def test_window_scans(self):
+        counters = AlgorithmCounters()
+        TradingAlgorithms(
+            generate_market_series("decline", 100), 3, 10, counters=counters
+        ).run("max")
+        # Nothing is ever sold, so every minute with a window is scanned
+        self.assertEqual(counters.trades_emitted, 0)
+        self.assertEqual(counters.ticks_visited, 100 - 3)
+        self.assertEqual(counters.window_scans, 100 - 3)
+
+    def test_run_profile(self):
+        profile = RunProfile("max", num_market_conditions=500)
+        with profile.time_stage(ALGORITHM_STAGE, trace_memory=True):
+            TradingAlgorithms(self.market_series).run("max")
+        self.assertGreater(profile.stage_seconds[ALGORITHM_STAGE], 0.0)
+        self.assertGreater(profile.peak_memory_bytes, 0)
+        self.assertTrue(profile.top_allocations)
+        self.assertIn("algorithm time (s)", profile.format_report())
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_filename = os.path.join(temp_dir, "profile.json")
+            profile.write_json(json_filename)
+            with open(json_filename, encoding="ascii") as json_file:
+                self.assertEqual(json.load(json_file)["algorithm"], "max")
+
+    def test_cprofiled(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats_filename = os.path.join(temp_dir, "run.prof")
+            with cprofiled(stats_filename):
+                TradingAlgorithms(self.market_series).run("higher")
+            stats = pstats.Stats(stats_filename)
+            self.assertTrue(
+                any(
+                    function_name == "algorithm_purchase_next_higher"
+                    for _, _, function_name in stats.stats
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
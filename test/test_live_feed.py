@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from src.csv_util import CsvReadError
+from src.live_feed import (
+    FEED_BINARY_HANDSHAKE,
+    FEED_TEXT_HANDSHAKE,
+    LiveFeedServer,
+    TICK_FRAME,
+    open_connection,
+    parse_binary_ticks,
+    parse_text_ticks,
+    replay_csv,
+    SUBSCRIBE_HANDSHAKE,
+)
+from src.market_series import read_market_series
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestLiveFeed(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_filename = os.path.join(self.temp_dir.name, "feed.csv")
+        with open(self.csv_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write("Time,Price\n")
+            for minute in range(3000):
+                csvfile.write(f"{minute},{1 + ((minute * 7) % 23) / 100}\n")
+        self.market_series = read_market_series(self.csv_filename).result
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def expected_trades(self, algorithm, min_hold, max_hold):
+        return [
+            (trade_point.purchase_point.minute, trade_point.sell_point.minute)
+            for trade_point in TradingAlgorithms(
+                self.market_series, min_hold=min_hold, max_hold=max_hold
+            ).run(algorithm)
+        ]
+
+    def test_parse_text_ticks_keeps_incomplete_line(self):
+        self.assertEqual(
+            parse_text_ticks(b"0,1.5\n1,2.25\n2,1."), ([(0, 1.5), (1, 2.25)], b"2,1.")
+        )
+        with self.assertRaises(ValueError):
+            parse_text_ticks(b"0;1.5\n")
+
+    def test_parse_binary_ticks_keeps_incomplete_frame(self):
+        data = TICK_FRAME.pack(0, 1.5) + TICK_FRAME.pack(1, 2.25)
+        self.assertEqual(
+            parse_binary_ticks(data + data[:5]), ([(0, 1.5), (1, 2.25)], data[:5])
+        )
+
+    def test_replay_over_tcp_matches_batch_run(self):
+        async def replay(binary):
+            server = LiveFeedServer("max", min_hold=2, max_hold=40, queue_size=2)
+            tcp_server = await server.start_tcp("127.0.0.1", 0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            try:
+                return await replay_csv(
+                    self.csv_filename, host="127.0.0.1", port=port, binary=binary
+                )
+            finally:
+                await server.close()
+
+        expected_trades = self.expected_trades("max", 2, 40)
+        for binary in (False, True):
+            with self.subTest(binary=binary):
+                stats = asyncio.run(replay(binary))
+                self.assertEqual(stats.num_ticks, len(self.market_series))
+                self.assertEqual(stats.trades, expected_trades)
+                self.assertEqual(len(stats.latencies), len(expected_trades))
+
+    @unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "No unix sockets")
+    def test_consecutive_feeds_over_unix_socket(self):
+        unix_path = os.path.join(self.temp_dir.name, "feed.sock")
+
+        async def replay_twice():
+            server = LiveFeedServer("higher", min_hold=1, max_hold=10)
+            await server.start_unix(unix_path)
+            try:
+                first = await replay_csv(self.csv_filename, unix_path=unix_path)
+                second = await replay_csv(
+                    self.csv_filename, unix_path=unix_path, speed=100000
+                )
+                return first, second
+            finally:
+                await server.close()
+
+        first, second = asyncio.run(replay_twice())
+        self.assertEqual(first.trades, self.expected_trades("higher", 1, 10))
+        self.assertEqual(second.trades, first.trades)
+
+    def test_bad_file_closes_the_feed(self):
+        bad_filename = os.path.join(self.temp_dir.name, "bad.csv")
+        with open(bad_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write("Time,Price\n0,1.0\n1,oops\n")
+
+        async def replay_bad_then_good():
+            server = LiveFeedServer("max", min_hold=2, max_hold=40)
+            tcp_server = await server.start_tcp("127.0.0.1", 0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            try:
+                with self.assertRaises(CsvReadError):
+                    await replay_csv(bad_filename, host="127.0.0.1", port=port)
+                # The feed was closed, so another one is accepted
+                return await replay_csv(self.csv_filename, host="127.0.0.1", port=port)
+            finally:
+                await server.close()
+
+        stats = asyncio.run(replay_bad_then_good())
+        self.assertEqual(stats.trades, self.expected_trades("max", 2, 40))
+
+    def test_only_one_feed_at_a_time(self):
+        async def connect_two_feeds():
+            server = LiveFeedServer("adjacent")
+            tcp_server = await server.start_tcp("127.0.0.1", 0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            try:
+                _, writer = await open_connection(
+                    FEED_TEXT_HANDSHAKE, host="127.0.0.1", port=port
+                )
+                with self.assertRaises(ConnectionError):
+                    await open_connection(
+                        FEED_TEXT_HANDSHAKE, host="127.0.0.1", port=port
+                    )
+                writer.close()
+            finally:
+                await server.close()
+
+        asyncio.run(connect_two_feeds())
+
+    def feed(self, handshake, payload, algorithm="adjacent", min_hold=0, max_hold=5):
+        """Return the messages published for a feed, and what the feed was answered"""
+
+        async def send_feed():
+            server = LiveFeedServer(algorithm, min_hold=min_hold, max_hold=max_hold)
+            tcp_server = await server.start_tcp("127.0.0.1", 0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            try:
+                subscriber, _ = await open_connection(
+                    SUBSCRIBE_HANDSHAKE, host="127.0.0.1", port=port
+                )
+                reader, writer = await open_connection(
+                    handshake, host="127.0.0.1", port=port
+                )
+                writer.write(payload)
+                writer.write_eof()
+                answer = await reader.read()
+                messages = []
+                while not messages or "end" not in messages[-1]:
+                    messages.append(json.loads(await subscriber.readline()))
+                return messages, answer
+            finally:
+                await server.close()
+
+        return asyncio.run(send_feed())
+
+    def test_dropped_ticks_keep_their_feed_offsets(self):
+        lines = [f"{minute},{1 + (minute % 3) / 10}\n" for minute in range(20)]
+        messages, _ = self.feed(FEED_TEXT_HANDSHAKE, "".join(lines).encode())
+        # The repeated minute is dropped by the engine, but sent by the feed
+        lines.insert(5, lines[4])
+        dropped_messages, _ = self.feed(FEED_TEXT_HANDSHAKE, "".join(lines).encode())
+        self.assertGreater(len(messages), 1)
+        self.assertEqual(len(dropped_messages), len(messages))
+        for message, dropped_message in zip(messages[:-1], dropped_messages[:-1]):
+            self.assertEqual(dropped_message["sell_minute"], message["sell_minute"])
+            expected_offset = message["tick_offset"] + (message["tick_offset"] >= 5)
+            self.assertEqual(dropped_message["tick_offset"], expected_offset)
+
+    def test_feed_ending_within_a_frame(self):
+        frame = TICK_FRAME.pack(0, 1.5)
+        _, answer = self.feed(FEED_BINARY_HANDSHAKE, frame + b" " * 4)
+        self.assertIn(b"ERROR Feed ended within a tick", answer)
+        _, answer = self.feed(FEED_TEXT_HANDSHAKE, b"0,1.5\n  ")
+        self.assertEqual(answer, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.csv_util import ColumnTranslation
+from src.market_cache import (
+    cache_filename_for,
+    load_cache,
+    read_market_series_cached,
+)
+from src.market_series import (
+    MarketSeries,
+    market_condition_column_translations,
+    read_market_series,
+)
+
+
+class TestMarketCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_filename = os.path.join(self.temp_dir.name, "market_conditions.csv")
+        self.write_csv("Time,Price\n0,1.5\n1,1.25\n2,1.75\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_csv(self, content: str) -> None:
+        with open(self.csv_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write(content)
+
+    def test_first_read_writes_the_cache(self):
+        result = read_market_series_cached(self.csv_filename)
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result, MarketSeries([0, 1, 2], [1.5, 1.25, 1.75]))
+        self.assertTrue(os.path.exists(cache_filename_for(self.csv_filename)))
+
+    def test_cache_hit_is_not_parsed(self):
+        read_market_series_cached(self.csv_filename)
+        with mock.patch("src.market_cache.read_market_series") as parse:
+            result = read_market_series_cached(self.csv_filename)
+        parse.assert_not_called()
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result, read_market_series(self.csv_filename).result)
+        self.assertIsInstance(result.result.prices, memoryview)
+
+    def test_changed_file_invalidates_the_cache(self):
+        read_market_series_cached(self.csv_filename)
+        self.write_csv("Time,Price\n0,2.5\n1,2.25\n2,2.75\n")  # Same size
+        os.utime(self.csv_filename, ns=(1, 1))
+        self.assertIsNone(
+            load_cache(self.csv_filename, market_condition_column_translations())
+        )
+        result = read_market_series_cached(self.csv_filename)
+        self.assertEqual(result.result, MarketSeries([0, 1, 2], [2.5, 2.25, 2.75]))
+
+    def test_touched_file_with_same_content_uses_the_cache(self):
+        read_market_series_cached(self.csv_filename)
+        os.utime(self.csv_filename, ns=(1, 1))
+        self.assertEqual(
+            load_cache(self.csv_filename, market_condition_column_translations()),
+            MarketSeries([0, 1, 2], [1.5, 1.25, 1.75]),
+        )
+
+    def test_other_column_translations_do_not_use_the_cache(self):
+        read_market_series_cached(self.csv_filename)
+        column_translations = [
+            ColumnTranslation("Price", "minute", int),
+            ColumnTranslation("Time", "price", float),
+        ]
+        self.assertIsNone(load_cache(self.csv_filename, column_translations))
+
+    def test_corrupt_cache_is_ignored(self):
+        read_market_series_cached(self.csv_filename)
+        with open(cache_filename_for(self.csv_filename), "r+b") as cache_file:
+            cache_file.truncate(10)
+        result = read_market_series_cached(self.csv_filename)
+        self.assertEqual(result.result, MarketSeries([0, 1, 2], [1.5, 1.25, 1.75]))
+
+    def test_read_error_is_not_cached(self):
+        self.write_csv("Time,Price\n0,abc\n")
+        result = read_market_series_cached(self.csv_filename)
+        self.assertFalse(result.isSuccess)
+        self.assertFalse(os.path.exists(cache_filename_for(self.csv_filename)))
+
+    def test_missing_file(self):
+        result = read_market_series_cached(
+            os.path.join(self.temp_dir.name, "missing.csv")
+        )
+        self.assertFalse(result.isSuccess)
+
+
+if __name__ == "__main__":
+    unittest.main()
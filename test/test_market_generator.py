@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from src.market_generator import REGIMES, generate_market_series, write_market_csv
+from src.market_series import read_market_series
+
+
+class TestMarketGenerator(unittest.TestCase):
+    def test_same_seed_same_series(self):
+        for regime in REGIMES:
+            with self.subTest(regime=regime):
+                market_series = generate_market_series(regime, 500, seed=7)
+                self.assertEqual(len(market_series), 500)
+                self.assertEqual(list(market_series.minutes), list(range(500)))
+                self.assertEqual(
+                    market_series, generate_market_series(regime, 500, seed=7)
+                )
+
+    def test_seed_changes_random_walk(self):
+        self.assertNotEqual(
+            generate_market_series("random_walk", 100, seed=1),
+            generate_market_series("random_walk", 100, seed=2),
+        )
+
+    def test_decline_is_strictly_decreasing(self):
+        prices = generate_market_series("decline", 1000).prices
+        self.assertTrue(all(a > b for a, b in zip(prices, prices[1:])))
+
+    def test_unknown_regime(self):
+        with self.assertRaises(ValueError):
+            generate_market_series("crash", 10)
+
+    def test_csv_round_trip(self):
+        market_series = generate_market_series("random_walk", 1000, seed=3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_filename = os.path.join(temp_dir, "random_walk.csv")
+            write_market_csv(csv_filename, market_series)
+            self.assertEqual(read_market_series(csv_filename).result, market_series)
+
+
+if __name__ == "__main__":
+    unittest.main()
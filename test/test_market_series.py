@@ -0,0 +1,77 @@
+from typing import List
+
+import os
+import tempfile
+import unittest
+
+from src.market_condition import MarketCondition
+from src.market_series import MarketSeries, read_market_series
+from src.trading_algorithms import TradingAlgorithms
+from src.trade_point import TradePoint
+
+
+class TestMarketSeries(unittest.TestCase):
+    def setUp(self):
+        self.market_conditions: List[MarketCondition] = [
+            MarketCondition(0, 1.005),
+            MarketCondition(1, 1.050),
+            MarketCondition(2, 1.009),
+            MarketCondition(3, 1.010),
+            MarketCondition(4, 1.030),
+            MarketCondition(5, 1.020),
+        ]
+
+    def test_from_market_conditions(self):
+        market_series = MarketSeries.from_market_conditions(self.market_conditions)
+        self.assertEqual(len(market_series), len(self.market_conditions))
+        self.assertEqual(market_series.minutes.typecode, "q")
+        self.assertEqual(market_series.prices.typecode, "d")
+        self.assertEqual(market_series[4], self.market_conditions[4])
+        self.assertEqual(list(market_series), self.market_conditions)
+
+    def test_slice(self):
+        market_series = MarketSeries.from_market_conditions(self.market_conditions)
+        sliced = market_series[2:4]
+        self.assertIsInstance(sliced, MarketSeries)
+        self.assertEqual(list(sliced), self.market_conditions[2:4])
+
+    def test_between_minutes(self):
+        market_series = MarketSeries([0, 2, 4, 6, 8], [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(
+            market_series.between_minutes(2, 6),
+            MarketSeries([2, 4, 6], [2.0, 3.0, 4.0]),
+        )
+        self.assertEqual(
+            market_series.between_minutes(last_minute=3),
+            MarketSeries([0, 2], [1.0, 2.0]),
+        )
+        self.assertEqual(market_series.between_minutes(5), market_series[3:])
+        self.assertEqual(len(market_series.between_minutes(9)), 0)
+
+    def test_read_quoted_csv(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_filename = os.path.join(temp_dir, "quoted.csv")
+            with open(csv_filename, "w", encoding="ascii") as csvfile:
+                csvfile.write('"Time","Price"\n"0","1.0"\n"1","1.25"\n')
+            result = read_market_series(csv_filename)
+        self.assertTrue(result.isSuccess, result.message)
+        self.assertEqual(list(result.result.minutes), [0, 1])
+        self.assertEqual(list(result.result.prices), [1.0, 1.25])
+
+    def test_mismatched_columns(self):
+        with self.assertRaises(ValueError):
+            MarketSeries([0, 1], [1.0])
+
+    def test_algorithms_accept_series_and_list(self):
+        market_series = MarketSeries.from_market_conditions(self.market_conditions)
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            from_list: List[TradePoint] = TradingAlgorithms(
+                self.market_conditions, min_hold=0, max_hold=3
+            ).run(algorithm)
+            from_series: List[TradePoint] = TradingAlgorithms(
+                market_series, min_hold=0, max_hold=3
+            ).run(algorithm)
+            self.assertEqual(
+                [(tp.purchase_point, tp.sell_point) for tp in from_list],
+                [(tp.purchase_point, tp.sell_point) for tp in from_series],
+            )
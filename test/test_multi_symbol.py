@@ -0,0 +1,107 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from main import main
+from src.market_series import MarketSeries
+from src.multi_symbol import (
+    format_symbol_report,
+    read_symbol_series,
+    run_symbols,
+    summarize_symbols,
+)
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestMultiSymbol(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_filename = os.path.join(self.temp_dir.name, "symbols.csv")
+        with open(self.csv_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write("Symbol,Time,Price\n")
+            for minute in range(300):
+                for step, symbol in enumerate(["EURUSD", "GBPUSD", "USDJPY"]):
+                    price = 1 + ((minute * (step + 3)) % 17) / 100
+                    csvfile.write(f"{symbol},{minute},{price}\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_rows_are_grouped_by_symbol(self):
+        result = read_symbol_series(self.csv_filename)
+        self.assertTrue(result.isSuccess)
+        symbol_series = result.result
+        self.assertEqual(list(symbol_series), ["EURUSD", "GBPUSD", "USDJPY"])
+        for step, market_series in enumerate(symbol_series.values()):
+            self.assertEqual(
+                market_series,
+                MarketSeries(
+                    range(300),
+                    (1 + ((minute * (step + 3)) % 17) / 100 for minute in range(300)),
+                ),
+            )
+
+    def test_missing_symbol_column(self):
+        with open(self.csv_filename, "w", encoding="ascii") as csvfile:
+            csvfile.write("Time,Price\n0,1.0\n")
+        result = read_symbol_series(self.csv_filename)
+        self.assertFalse(result.isSuccess)
+        self.assertIn("Line: 1", result.message)
+
+    def test_symbols_match_direct_runs(self):
+        symbol_series = read_symbol_series(self.csv_filename).result
+        for processes in (1, 2):
+            with self.subTest(processes=processes):
+                trade_books = run_symbols(
+                    symbol_series, "max", min_hold=3, max_hold=20, processes=processes
+                )
+                self.assertEqual(list(trade_books), list(symbol_series))
+                for symbol, trade_book in trade_books.items():
+                    self.assertIs(trade_book.market_series, symbol_series[symbol])
+                    self.assertEqual(
+                        trade_book,
+                        TradingAlgorithms(
+                            symbol_series[symbol], min_hold=3, max_hold=20
+                        ).run_trade_book("max"),
+                    )
+
+    def test_ignored_options_are_rejected(self):
+        arguments = ["main.py", "-f", self.csv_filename, "--by-symbol"]
+        with redirect_stdout(io.StringIO()) as stdout:
+            self.assertTrue(main(arguments))
+        self.assertIn("EURUSD", stdout.getvalue())
+        for options in (
+            ["--cache"],
+            ["--result-cache", os.path.join(self.temp_dir.name, "results.db")],
+            ["--output", os.path.join(self.temp_dir.name, "trades.txt")],
+            ["--format", "csv"],
+            ["--summary-only"],
+            ["--first-minute", "10"],
+            ["--trace", os.path.join(self.temp_dir.name, "trace.jsonl")],
+            ["--min-hold", "1,2"],
+        ):
+            with self.subTest(options=options):
+                with redirect_stdout(io.StringIO()) as stdout:
+                    self.assertFalse(main(arguments + options))
+                self.assertIn("--by-symbol only", stdout.getvalue())
+
+    def test_report(self):
+        trade_books = run_symbols(
+            read_symbol_series(self.csv_filename).result, "optimal", processes=1
+        )
+        summaries = summarize_symbols(trade_books)
+        self.assertEqual(
+            [summary.num_market_conditions for summary in summaries], [300] * 3
+        )
+        report = format_symbol_report(summaries)
+        self.assertIn("USDJPY", report)
+        self.assertIn(
+            f"{sum(summary.total_profit for summary in summaries):.4f}",
+            report.splitlines()[-1],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import random
+import unittest
+
+from src.market_series import MarketSeries
+from src.online_engine import OnlineTradingEngine, PriceRingBuffer
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestOnlineTradingEngine(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.series = {
+            "random": [round(rng.random() * 0.5 + 1, 2) for _ in range(400)],
+            "declining": [2 - i * 0.001 for i in range(400)],
+            "ties": [float(rng.randint(1, 3)) for _ in range(400)],
+            "sawtooth": [1 + (i % 7) * 0.1 for i in range(400)],
+        }
+
+    def trades(self, trade_points):
+        return [(tp.purchase_point, tp.sell_point) for tp in trade_points]
+
+    def test_matches_batch_algorithms(self):
+        for name, prices in self.series.items():
+            market_series = MarketSeries(range(len(prices)), prices)
+            for min_hold, max_hold in ((0, 1), (2, 9), (5, 30)):
+                trading_algorithms = TradingAlgorithms(
+                    market_series, min_hold=min_hold, max_hold=max_hold
+                )
+                for algorithm in OnlineTradingEngine.ALGORITHMS():
+                    engine = OnlineTradingEngine(
+                        algorithm, min_hold=min_hold, max_hold=max_hold
+                    )
+                    with self.subTest(
+                        series=name, algorithm=algorithm, hold=(min_hold, max_hold)
+                    ):
+                        self.assertEqual(
+                            self.trades(engine.run(market_series)),
+                            self.trades(trading_algorithms.run(algorithm)),
+                        )
+
+    def test_matches_batch_algorithms_over_gaps(self):
+        rng = random.Random(13)
+        minutes = []
+        minute = 0
+        for _ in range(400):
+            minute += rng.choice([1, 1, 1, 2, 3, 7, 40])
+            minutes.append(minute)
+        for name, prices in self.series.items():
+            market_series = MarketSeries(minutes, prices)
+            for min_hold, max_hold in ((0, 1), (2, 9), (5, 30)):
+                trading_algorithms = TradingAlgorithms(
+                    market_series, min_hold=min_hold, max_hold=max_hold
+                )
+                for algorithm in OnlineTradingEngine.ALGORITHMS():
+                    engine = OnlineTradingEngine(
+                        algorithm, min_hold=min_hold, max_hold=max_hold
+                    )
+                    with self.subTest(
+                        series=name, algorithm=algorithm, hold=(min_hold, max_hold)
+                    ):
+                        self.assertEqual(
+                            self.trades(engine.run(market_series)),
+                            self.trades(trading_algorithms.run(algorithm)),
+                        )
+
+    def test_trades_are_emitted_once_settled(self):
+        engine = OnlineTradingEngine("higher", min_hold=1, max_hold=3)
+        self.assertEqual(engine.on_tick(0, 1.0), [])
+        self.assertEqual(engine.on_tick(1, 0.5), [])
+        trade_points = engine.on_tick(2, 1.5)
+        self.assertEqual(len(trade_points), 1)
+        self.assertEqual(trade_points[0].sell_point.minute, 2)
+        self.assertEqual(engine.finish(), [])
+
+    def test_ring_buffer_keeps_only_recent_ticks(self):
+        ticks = PriceRingBuffer(3)
+        for minute in range(5):
+            ticks.append(minute, float(minute))
+        self.assertEqual(len(ticks), 5)
+        self.assertEqual(ticks[2], 2.0)
+        self.assertEqual(ticks.market_condition(4).minute, 4)
+        with self.assertRaises(IndexError):
+            ticks[1]
+        with self.assertRaises(ValueError):
+            ticks.append(4, 1.0)
+
+    def test_ring_buffer_first_at_or_after(self):
+        ticks = PriceRingBuffer(4)
+        for minute in (1, 2, 5, 9, 10):
+            ticks.append(minute, 1.0)
+        self.assertEqual(ticks.first_at_or_after(3, lo=1), 2)
+        self.assertEqual(ticks.first_at_or_after(9, lo=2), 3)
+        self.assertEqual(ticks.first_at_or_after(10, lo=4), 4)
+        self.assertEqual(ticks.first_at_or_after(13, lo=1), 7)
@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from src.market_series import MarketSeries
+from src.parallel_runner import run_parallel
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestParallelRunner(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(13)
+        prices = [round(rng.random() * 0.5 + 1, 2) for _ in range(600)]
+        self.market_series = MarketSeries(range(len(prices)), prices)
+
+    def offsets(self, trade_points):
+        return [(tp.purchase_offset, tp.sell_offset) for tp in trade_points]
+
+    def test_matches_sequential_run(self):
+        trading_algorithms = TradingAlgorithms(
+            self.market_series, min_hold=3, max_hold=20
+        )
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            for num_chunks in (2, 7, 50):
+                with self.subTest(algorithm=algorithm, num_chunks=num_chunks):
+                    self.assertEqual(
+                        self.offsets(
+                            run_parallel(
+                                self.market_series,
+                                algorithm,
+                                min_hold=3,
+                                max_hold=20,
+                                processes=2,
+                                num_chunks=num_chunks,
+                            )
+                        ),
+                        self.offsets(trading_algorithms.run(algorithm)),
+                    )
+
+    def test_unordered_minutes_match_sequential_run(self):
+        # Gappy minutes, but the last one is out of order, so the hold times of the
+        # whole series are counted in ticks, while those of most chunks would not be
+        minutes = list(range(0, 3 * len(self.market_series), 3))
+        minutes[-1] = 0
+        market_series = MarketSeries(minutes, self.market_series.prices)
+        for algorithm in ("max", "higher", "minmax"):
+            with self.subTest(algorithm=algorithm), self.assertLogs(level="WARNING"):
+                self.assertEqual(
+                    self.offsets(
+                        run_parallel(
+                            market_series,
+                            algorithm,
+                            min_hold=3,
+                            max_hold=20,
+                            processes=2,
+                            num_chunks=7,
+                        )
+                    ),
+                    self.offsets(
+                        TradingAlgorithms(market_series, 3, 20).run(algorithm)
+                    ),
+                )
+
+    def test_small_series_runs_sequentially(self):
+        trade_points = run_parallel(self.market_series[:10], "max", processes=2)
+        self.assertEqual(trade_points, [])
@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from src.market_series import MarketSeries
+from src.price_index import PriceIndex
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestPriceIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.prices = [float(rng.randint(1, 6)) for _ in range(300)]
+        self.price_index = PriceIndex(self.prices)
+
+    def test_first_greater_matches_scan(self):
+        for start in range(len(self.prices) + 1):
+            for price in (0.5, 1.0, 3.0, 3.5, 6.0):
+                expected = next(
+                    (
+                        i
+                        for i in range(start, len(self.prices))
+                        if self.prices[i] > price
+                    ),
+                    PriceIndex.NOT_FOUND,
+                )
+                self.assertEqual(self.price_index.first_greater(start, price), expected)
+
+    def test_first_greater_in_range(self):
+        price_index = PriceIndex([3.0, 1.0, 2.0, 4.0])
+        self.assertEqual(price_index.first_greater_in_range(1, 4, 1.5), 2)
+        self.assertEqual(price_index.first_greater_in_range(1, 3, 2.5), -1)
+        self.assertEqual(price_index.first_greater_in_range(1, 4, 2.5), 3)
+
+    def test_run_end_matches_scan(self):
+        for start in range(len(self.prices)):
+            end = start
+            while (
+                end + 1 < len(self.prices) and self.prices[end + 1] >= self.prices[end]
+            ):
+                end += 1
+            self.assertEqual(self.price_index.run_end(start), end)
+
+    def test_built_once_per_instance(self):
+        trading_algorithms = TradingAlgorithms(
+            MarketSeries(range(len(self.prices)), self.prices), min_hold=2, max_hold=9
+        )
+        trading_algorithms.run("higher")
+        price_index = trading_algorithms.price_index
+        self.assertIsNotNone(price_index)
+        trading_algorithms.run("highest")
+        self.assertIs(trading_algorithms.price_index, price_index)
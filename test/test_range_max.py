@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from src.range_max import SlidingWindowMax, SparseTableMax
+
+
+class TestSlidingWindowMax(unittest.TestCase):
+    def scan_max(self, prices, range_min, range_max):
+        max_offset, max_price = SlidingWindowMax.NOT_FOUND, 0.0
+        for i in range(range_min, range_max):
+            if max_offset == SlidingWindowMax.NOT_FOUND or prices[i] > max_price:
+                max_offset, max_price = i, prices[i]
+        return (max_offset, max_price)
+
+    def test_ties_resolve_to_earliest_offset(self):
+        prices = [1.0, 2.0, 3.0, 3.0, 2.0, 3.0]
+        window_max = SlidingWindowMax(prices)
+        self.assertEqual(window_max.query(0, 6), (2, 3.0))
+        self.assertEqual(window_max.query(3, 6), (3, 3.0))
+        self.assertEqual(window_max.query(4, 6), (5, 3.0))
+
+    def test_empty_window(self):
+        window_max = SlidingWindowMax([1.0, 2.0])
+        self.assertEqual(window_max.query(2, 2), (SlidingWindowMax.NOT_FOUND, 0.0))
+
+    def test_matches_scan_for_forward_moving_windows(self):
+        rng = random.Random(7)
+        prices = [float(rng.randint(1, 5)) for _ in range(500)]
+        window_max = SlidingWindowMax(prices)
+        range_min = range_max = 0
+        while range_min < len(prices):
+            range_max = max(range_max, min(range_min + rng.randint(1, 40), len(prices)))
+            self.assertEqual(
+                window_max.query(range_min, range_max),
+                self.scan_max(prices, range_min, range_max),
+            )
+            range_min += rng.randint(1, 50)
+
+
+class TestSparseTableMax(unittest.TestCase):
+    def test_matches_sliding_window_max(self):
+        rng = random.Random(5)
+        prices = [float(rng.randint(1, 5)) for _ in range(300)]
+        range_max_table = SparseTableMax(prices)
+        for range_min in range(0, len(prices), 7):
+            for width in (0, 1, 2, 3, 17, 64, 300):
+                range_max = min(range_min + width, len(prices))
+                self.assertEqual(
+                    range_max_table.query(range_min, range_max),
+                    SlidingWindowMax(prices).query(range_min, range_max),
+                )
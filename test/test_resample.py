@@ -0,0 +1,128 @@
+import gzip
+import os
+import random
+import tempfile
+import unittest
+
+from src.resample import BarResampler, read_resampled_series
+from src.trading_algorithms import TradingAlgorithms
+
+# (second, price, volume): bars at minute 0 (4 ticks), 1 (2 ticks), none at 2, 3 (1)
+TICKS = [
+    (0.5, 1.00, 10.0),
+    (12.0, 1.20, 30.0),
+    (30.0, 0.90, 20.0),
+    (59.9, 1.10, 40.0),
+    (60.0, 1.30, 0.0),
+    (119.0, 1.40, 0.0),
+    (185.0, 1.50, 5.0),
+]
+
+
+class TestResample(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name, text):
+        filename = os.path.join(self.temp_dir.name, name)
+        data = text.encode()
+        with open(filename, "wb") as file:
+            file.write(gzip.compress(data) if name.endswith(".gz") else data)
+        return filename
+
+    def resample(self, bar_price, bar_minutes=1, chunk_size=len(TICKS)):
+        resampler = BarResampler(bar_price, bar_minutes)
+        for start in range(0, len(TICKS), chunk_size):
+            seconds, prices, volumes = zip(*TICKS[start : start + chunk_size])
+            resampler.add_ticks(seconds, prices, volumes)
+        market_series = resampler.finish()
+        return list(market_series.minutes), list(market_series.prices)
+
+    def test_bar_prices(self):
+        minutes = [0, 1, 3]
+        self.assertEqual(self.resample("open"), (minutes, [1.00, 1.30, 1.50]))
+        self.assertEqual(self.resample("high"), (minutes, [1.20, 1.40, 1.50]))
+        self.assertEqual(self.resample("low"), (minutes, [0.90, 1.30, 1.50]))
+        self.assertEqual(self.resample("close"), (minutes, [1.10, 1.40, 1.50]))
+        bar_minutes, bar_prices = self.resample("vwap")
+        self.assertEqual(bar_minutes, minutes)
+        # Without any volume, the bar at minute 1 is priced at its close
+        vwap = (1.00 * 10 + 1.20 * 30 + 0.90 * 20 + 1.10 * 40) / 100
+        for price, expected in zip(bar_prices, [vwap, 1.40, 1.50]):
+            self.assertAlmostEqual(price, expected)
+
+    def test_bars_of_several_minutes(self):
+        self.assertEqual(self.resample("close", 2), ([0, 2], [1.40, 1.50]))
+        self.assertEqual(self.resample("open", 5), ([0], [1.00]))
+
+    def test_bars_across_chunks(self):
+        for bar_price in ("open", "high", "low", "close", "vwap"):
+            for chunk_size in (1, 2, 3):
+                with self.subTest(bar_price=bar_price, chunk_size=chunk_size):
+                    self.assertEqual(
+                        self.resample(bar_price, chunk_size=chunk_size),
+                        self.resample(bar_price),
+                    )
+
+    def test_ticks_out_of_order(self):
+        resampler = BarResampler()
+        resampler.add_ticks([100.0, 130.0], [1.0, 1.1])
+        with self.assertRaises(ValueError):
+            resampler.add_ticks([50.0], [1.2])
+        with self.assertRaises(ValueError):
+            BarResampler("median")
+        with self.assertRaises(ValueError):
+            BarResampler("close", 0)
+
+    def test_read_resampled_series(self):
+        filename = self.write_file(
+            "ticks.csv.gz",
+            "Time,Price,Volume\n"
+            + "".join(
+                f"{second},{price},{volume}\n" for second, price, volume in TICKS
+            ),
+        )
+        result = read_resampled_series(filename, "vwap")
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(list(result.result.minutes), [0, 1, 3])
+
+        filename = self.write_file(
+            "quotes.csv", "Time,Bid,Ask\n0,1.0,1.2\n30,1.1,1.3\n90,1.2,1.6\n"
+        )
+        result = read_resampled_series(filename, "mid")
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(list(result.result.minutes), [0, 1])
+        self.assertEqual(
+            [round(price, 6) for price in result.result.prices], [1.2, 1.4]
+        )
+
+        result = read_resampled_series(filename, "close")
+        self.assertFalse(result.isSuccess)
+        filename = self.write_file("unordered.csv", "Time,Price\n120,1.0\n60,1.1\n")
+        result = read_resampled_series(filename)
+        self.assertFalse(result.isSuccess)
+        self.assertIn("unordered.csv", result.message)
+
+    def test_algorithms_run_on_the_bars(self):
+        random.seed(7)
+        second, lines = 0.0, []
+        for _ in range(3000):
+            second += random.choice((0.5, 2.0, 7.0, 45.0))
+            lines.append(f"{second},{1 + random.randint(0, 50) / 100}\n")
+        filename = self.write_file("random.csv", "Time,Price\n" + "".join(lines))
+        market_series = read_resampled_series(filename, "close", 3).result
+        self.assertTrue(all(minute % 3 == 0 for minute in market_series.minutes))
+
+        trade_book = TradingAlgorithms(market_series, 6, 30).run_trade_book("optimal")
+        self.assertGreater(len(trade_book), 0)
+        for trade_point in trade_book:
+            purchase_minute = trade_point.purchase_point.minute
+            self.assertGreater(trade_point.sell_point.minute - purchase_minute, 6)
+            self.assertLessEqual(trade_point.sell_point.minute - purchase_minute, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from main import main
+from src.market_generator import generate_market_series, write_market_csv
+from src.result_cache import ResultCache
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.temp_dir.name, "results.db")
+        self.csv_filename = os.path.join(self.temp_dir.name, "market.csv")
+        self.market_series = generate_market_series("random_walk", 3000, seed=5)
+        write_market_csv(self.csv_filename, self.market_series)
+        self.trading_algorithms = TradingAlgorithms(
+            self.market_series, min_hold=5, max_hold=40
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def trades(self, trade_book):
+        return [(tp.purchase_point, tp.sell_point) for tp in trade_book]
+
+    def test_every_algorithm_has_a_version(self):
+        self.assertEqual(
+            TradingAlgorithms.ALGORITHM_VERSIONS().keys(),
+            TradingAlgorithms.ALGORITHMS().keys(),
+        )
+
+    def test_hit_returns_the_same_trades(self):
+        with ResultCache(self.db_filename) as result_cache:
+            data_hash = result_cache.data_hash(self.csv_filename)
+            self.assertIsNone(result_cache.get(data_hash, "max", 5, 40))
+            for algorithm in TradingAlgorithms.ALGORITHMS():
+                result_cache.put(
+                    data_hash,
+                    algorithm,
+                    5,
+                    40,
+                    self.trading_algorithms.run_trade_book(algorithm),
+                )
+
+        with ResultCache(self.db_filename) as result_cache:
+            for algorithm in TradingAlgorithms.ALGORITHMS():
+                with self.subTest(algorithm=algorithm):
+                    expected = self.trading_algorithms.run_trade_book(algorithm)
+                    trade_book = result_cache.get(data_hash, algorithm, 5, 40)
+                    self.assertEqual(self.trades(trade_book), self.trades(expected))
+                    self.assertEqual(trade_book.total_profit(), expected.total_profit())
+            self.assertIsNone(result_cache.get(data_hash, "max", 5, 41))
+            self.assertEqual(result_cache.hits, len(TradingAlgorithms.ALGORITHMS()))
+            self.assertEqual(result_cache.misses, 1)
+
+    def test_key_resolves_default_hold_times(self):
+        with ResultCache(self.db_filename) as result_cache:
+            trade_book = TradingAlgorithms(self.market_series).run_trade_book("max")
+            result_cache.put(b"data", "max", -1, -1, trade_book)
+            self.assertIsNotNone(
+                result_cache.get(
+                    b"data",
+                    "max",
+                    TradingAlgorithms.DEFAULT_MIN_HOLD_MINUTES,
+                    TradingAlgorithms.DEFAULT_MAX_HOLD_MINUTES,
+                )
+            )
+
+    def test_new_algorithm_version_misses(self):
+        with ResultCache(self.db_filename) as result_cache:
+            result_cache.put(
+                b"data", "max", 5, 40, self.trading_algorithms.run_trade_book("max")
+            )
+            versions = TradingAlgorithms.ALGORITHM_VERSIONS()
+            versions["max"] += 1
+            with mock.patch.object(
+                TradingAlgorithms, "ALGORITHM_VERSIONS", return_value=versions
+            ):
+                self.assertIsNone(result_cache.get(b"data", "max", 5, 40))
+            self.assertIsNotNone(result_cache.get(b"data", "max", 5, 40))
+
+    def test_least_recently_used_results_are_evicted(self):
+        trade_book = self.trading_algorithms.run_trade_book("adjacent")
+        result_size = 32 * len(trade_book)
+        with ResultCache(self.db_filename, max_bytes=2 * result_size) as result_cache:
+            result_cache.put(b"first", "adjacent", 5, 40, trade_book)
+            result_cache.put(b"second", "adjacent", 5, 40, trade_book)
+            # Using the first makes the second the least recently used
+            self.assertIsNotNone(result_cache.get(b"first", "adjacent", 5, 40))
+            result_cache.put(b"third", "adjacent", 5, 40, trade_book)
+            self.assertEqual(len(result_cache), 2)
+            self.assertIsNone(result_cache.get(b"second", "adjacent", 5, 40))
+            self.assertIsNotNone(result_cache.get(b"first", "adjacent", 5, 40))
+            self.assertIsNotNone(result_cache.get(b"third", "adjacent", 5, 40))
+
+    def test_file_hash_is_only_computed_for_changed_files(self):
+        with ResultCache(self.db_filename) as result_cache:
+            data_hash = result_cache.data_hash(self.csv_filename)
+            with mock.patch("src.result_cache.hash_file") as hash_file:
+                self.assertEqual(result_cache.data_hash(self.csv_filename), data_hash)
+                hash_file.assert_not_called()
+
+            with open(self.csv_filename, "a", encoding="ascii") as csvfile:
+                csvfile.write("99999,1.0\n")
+            self.assertNotEqual(result_cache.data_hash(self.csv_filename), data_hash)
+            self.assertNotEqual(
+                result_cache.data_hash(self.csv_filename, first_minute=10),
+                result_cache.data_hash(self.csv_filename),
+            )
+            self.assertEqual(
+                len(
+                    {
+                        result_cache.data_hash(self.csv_filename),
+                        result_cache.data_hash(self.csv_filename, bars=("close", 1)),
+                        result_cache.data_hash(self.csv_filename, bars=("close", 5)),
+                        result_cache.data_hash(self.csv_filename, bars=("vwap", 1)),
+                    }
+                ),
+                4,
+            )
+
+    def test_traced_run_is_not_taken_from_the_cache(self):
+        trace_filename = os.path.join(self.temp_dir.name, "trace.jsonl")
+        arguments = ["main.py", "-f", self.csv_filename, "-a", "max"]
+        arguments += ["-o", os.path.join(self.temp_dir.name, "trades.txt")]
+        arguments += ["--result-cache", self.db_filename, "--trace", trace_filename]
+        traces = []
+        for _ in range(2):
+            with redirect_stdout(io.StringIO()):
+                self.assertTrue(main(arguments))
+            with open(trace_filename, encoding="ascii") as trace_file:
+                traces.append(trace_file.read())
+            os.remove(trace_filename)
+        self.assertNotEqual(traces[0], "")
+        self.assertEqual(traces[1], traces[0])
+        with ResultCache(self.db_filename) as result_cache:
+            data_hash = result_cache.data_hash(self.csv_filename)
+            self.assertIsNotNone(result_cache.get(data_hash, "max", -1, -1))
+
+
+if __name__ == "__main__":
+    unittest.main()
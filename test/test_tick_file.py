@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from src.market_series import MarketSeries, read_market_series
+from src.tick_file import (
+    convert_csv_to_tick_file,
+    is_tick_file,
+    read_tick_file,
+    write_tick_file,
+)
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestTickFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tick_filename = os.path.join(self.temp_dir.name, "market_conditions.ticks")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_and_read(self):
+        market_series = MarketSeries([0, 1, 2], [1.5, 1.25, 1.75])
+        write_tick_file(self.tick_filename, market_series)
+        self.assertTrue(is_tick_file(self.tick_filename))
+        result = read_tick_file(self.tick_filename)
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result, market_series)
+        self.assertIsInstance(result.result.prices, memoryview)
+
+    def test_read_time_range(self):
+        write_tick_file(
+            self.tick_filename,
+            MarketSeries([0, 2, 4, 6, 8], [1.0, 2.0, 3.0, 4.0, 5.0]),
+        )
+        result = read_tick_file(self.tick_filename, first_minute=1, last_minute=6)
+        self.assertEqual(result.result, MarketSeries([2, 4, 6], [2.0, 3.0, 4.0]))
+        result = read_tick_file(self.tick_filename, first_minute=7)
+        self.assertEqual(result.result, MarketSeries([8], [5.0]))
+        result = read_tick_file(self.tick_filename, last_minute=-1)
+        self.assertEqual(len(result.result), 0)
+
+    def test_convert_csv_runs_the_same_trades(self):
+        csv_filename = "test/market_conditions_100.csv"
+        result = convert_csv_to_tick_file(csv_filename, self.tick_filename)
+        self.assertTrue(result.isSuccess)
+        self.assertEqual(result.result, 100)
+        self.assertFalse(is_tick_file(csv_filename))
+
+        market_series = read_market_series(csv_filename).result
+        mapped_series = read_tick_file(self.tick_filename).result
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(
+                    [
+                        (tp.purchase_point, tp.sell_point)
+                        for tp in TradingAlgorithms(mapped_series).run(algorithm)
+                    ],
+                    [
+                        (tp.purchase_point, tp.sell_point)
+                        for tp in TradingAlgorithms(market_series).run(algorithm)
+                    ],
+                )
+
+    def test_unordered_minutes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            write_tick_file(self.tick_filename, MarketSeries([0, 2, 1], [1.0] * 3))
+        self.assertFalse(os.path.exists(self.tick_filename))
+
+    def test_truncated_file(self):
+        write_tick_file(self.tick_filename, MarketSeries([0, 1], [1.0, 2.0]))
+        with open(self.tick_filename, "r+b") as tick_file:
+            tick_file.truncate(30)
+        result = read_tick_file(self.tick_filename)
+        self.assertFalse(result.isSuccess)
+        self.assertIn("expected", result.message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from src.market_series import MarketSeries
+from src.time_index import TimeIndex
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestTimeIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(23)
+        self.minutes = []
+        minute = 100
+        for _ in range(300):
+            minute += rng.choice([1, 1, 1, 2, 5, 40])
+            self.minutes.append(minute)
+        self.prices = [round(1 + rng.random() * 0.5, 2) for _ in self.minutes]
+
+    def scan_sell_window(self, purchase_offset, min_hold, max_hold):
+        purchase_minute = self.minutes[purchase_offset]
+        offsets = [
+            offset
+            for offset in range(purchase_offset + 1, len(self.minutes))
+            if purchase_minute + min_hold + 1
+            <= self.minutes[offset]
+            <= purchase_minute + max_hold
+        ]
+        if offsets:
+            return (offsets[0], offsets[-1] + 1)
+        return None
+
+    def test_dense(self):
+        self.assertTrue(TimeIndex(range(5, 105)).is_dense)
+        self.assertTrue(TimeIndex([]).is_dense)
+        time_index = TimeIndex(self.minutes)
+        self.assertFalse(time_index.is_dense)
+        self.assertEqual(time_index.minutes, self.minutes)
+
+    def test_first_at_or_after(self):
+        time_index = TimeIndex([10, 11, 15, 20])
+        self.assertEqual(time_index.first_at_or_after(5), 0)
+        self.assertEqual(time_index.first_at_or_after(12), 2)
+        self.assertEqual(time_index.first_at_or_after(15, lo=1), 2)
+        self.assertEqual(time_index.first_at_or_after(11, lo=3), 3)
+        # Past the last tick the offsets go on a minute each
+        self.assertEqual(time_index.first_at_or_after(21), 4)
+        self.assertEqual(time_index.first_at_or_after(25), 8)
+
+    def test_sell_window_matches_scan(self):
+        time_index = TimeIndex(self.minutes)
+        for min_hold, max_hold in ((0, 1), (2, 9), (5, 60)):
+            with self.subTest(hold=(min_hold, max_hold)):
+                for purchase_offset in range(len(self.minutes)):
+                    range_min, range_max = time_index.sell_window(
+                        purchase_offset, min_hold, max_hold
+                    )
+                    window = self.scan_sell_window(purchase_offset, min_hold, max_hold)
+                    if window is None:
+                        self.assertGreaterEqual(range_min, range_max)
+                    else:
+                        self.assertEqual((range_min, range_max), window)
+
+    def test_unordered_minutes_are_counted_in_ticks(self):
+        with self.assertLogs(level="WARNING"):
+            time_index = TimeIndex([3, 1, 2, 7])
+        self.assertTrue(time_index.is_dense)
+        self.assertEqual(time_index.sell_window(0, 0, 2), (1, 3))
+
+    def test_hold_times_are_minutes(self):
+        market_series = MarketSeries(
+            [0, 1, 2, 10, 11, 12], [1.0, 1.25, 1.5, 3.0, 1.0, 2.0]
+        )
+        trading_algorithms = TradingAlgorithms(market_series, min_hold=0, max_hold=3)
+        for algorithm, trades in (
+            ("adjacent", [(0, 1), (4, 5)]),
+            ("higher", [(0, 1), (4, 5)]),
+            ("highest", [(0, 2), (4, 5)]),
+            ("max", [(0, 2), (4, 5)]),
+            ("optimal", [(0, 2), (4, 5)]),
+        ):
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(
+                    [
+                        (tp.purchase_offset, tp.sell_offset)
+                        for tp in trading_algorithms.run(algorithm)
+                    ],
+                    trades,
+                )
+
+    def test_trades_are_held_within_the_hold_times(self):
+        market_series = MarketSeries(self.minutes, self.prices)
+        for min_hold, max_hold in ((0, 1), (2, 9), (5, 60)):
+            trading_algorithms = TradingAlgorithms(
+                market_series, min_hold=min_hold, max_hold=max_hold
+            )
+            for algorithm in TradingAlgorithms.ALGORITHMS():
+                with self.subTest(algorithm=algorithm, hold=(min_hold, max_hold)):
+                    for trade_point in trading_algorithms.run(algorithm):
+                        self.assertGreaterEqual(trade_point.duration_held, min_hold)
+                        self.assertLess(trade_point.duration_held, max_hold)
+
+    def test_empty_sell_windows_are_rejected(self):
+        # An invalid pair takes the defaults, but a single defaulted hold time
+        # can still leave no sell window at all
+        self.assertEqual(TradingAlgorithms.resolve_hold_times(40, 11), (30, 60))
+        self.assertEqual(TradingAlgorithms.resolve_hold_times(-1, 45), (30, 45))
+        market_series = MarketSeries(self.minutes, self.prices)
+        for min_hold, max_hold in ((-1, 0), (-1, 11), (-1, 30)):
+            with self.subTest(min_hold=min_hold, max_hold=max_hold):
+                with self.assertRaises(ValueError):
+                    TradingAlgorithms.resolve_hold_times(min_hold, max_hold)
+                with self.assertRaises(ValueError):
+                    TradingAlgorithms(market_series, min_hold, max_hold)
+
+
+if __name__ == "__main__":
+    unittest.main()
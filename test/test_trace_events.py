@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from main import main
+from src.market_generator import generate_market_series
+from src.trace_events import NO_SELL_OFFSET, TRACE_EVENT_FIELDS, TraceSink
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestTraceEvents(unittest.TestCase):
+    def setUp(self):
+        self.market_series = generate_market_series("random_walk", 300, seed=2)
+
+    def test_sold_events_are_the_trades(self):
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            with self.subTest(algorithm=algorithm):
+                trace_sink = TraceSink()
+                trade_points = TradingAlgorithms(
+                    self.market_series, min_hold=3, max_hold=10, trace_sink=trace_sink
+                ).run(algorithm)
+                events = trace_sink.events()
+                self.assertTrue(all(e["algorithm"] == algorithm for e in events))
+                self.assertEqual(
+                    [
+                        (e["offset"], e["sell_offset"])
+                        for e in events
+                        if e["sell_offset"] != NO_SELL_OFFSET
+                    ],
+                    [(tp.purchase_offset, tp.sell_offset) for tp in trade_points],
+                )
+                for event in events:
+                    if event["sell_offset"] != NO_SELL_OFFSET:
+                        self.assertGreaterEqual(
+                            event["sell_offset"], event["window_min"]
+                        )
+                        self.assertLess(event["sell_offset"], event["window_max"])
+
+    def test_every_decision_is_traced(self):
+        trace_sink = TraceSink()
+        TradingAlgorithms(
+            generate_market_series("decline", 50), 3, 10, trace_sink=trace_sink
+        ).run("higher")
+        # Nothing is ever sold, so there is a decision at every minute with a window
+        self.assertEqual(trace_sink.num_events, 50 - 3)
+        self.assertEqual(trace_sink.events()[0]["window_min"], 4)
+        self.assertEqual(trace_sink.events()[0]["window_max"], 11)
+
+    def test_buffered_jsonl_output(self):
+        output = io.StringIO()
+        trace_sink = TraceSink(output, buffer_size=4)
+        for offset in range(10):
+            trace_sink.record("max", offset, 1.0, offset + 1, offset + 5)
+        self.assertEqual(len(output.getvalue().splitlines()), 8)
+        self.assertEqual(len(trace_sink.buffer), 2)
+
+        trace_sink.flush()
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(trace_sink.buffer, [])
+        event = json.loads(lines[9])
+        self.assertEqual(list(event), list(TRACE_EVENT_FIELDS))
+        self.assertEqual(event["offset"], 9)
+        self.assertEqual(event["sell_offset"], NO_SELL_OFFSET)
+
+    def test_trace_needs_a_sequential_run(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_filename = os.path.join(temp_dir, "trace.jsonl")
+            arguments = ["main.py", "-f", "test/market_conditions_100.csv"]
+            arguments += ["--trace", trace_filename]
+            for options in (["--processes", "2"], ["--max-hold", "40,50"]):
+                with self.subTest(options=options):
+                    with redirect_stdout(io.StringIO()) as stdout:
+                        self.assertFalse(main(arguments + options))
+                    self.assertIn("--trace only", stdout.getvalue())
+            self.assertFalse(os.path.exists(trace_filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from src.market_generator import generate_market_series
+from src.market_series import MarketSeries
+from src.trade_book import TradeBook
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestTradeBook(unittest.TestCase):
+    def setUp(self):
+        self.market_series = MarketSeries(
+            [0, 1, 2, 3, 5, 6, 8], [1.0, 1.5, 1.25, 2.0, 1.0, 0.75, 1.5]
+        )
+        # Profits 1.0, -1.25 and 0.75
+        self.trade_book = TradeBook(self.market_series, [0, 3, 5], [3, 5, 6])
+
+    def test_trade_points_view(self):
+        trade_points = self.trade_book.trade_points()
+        self.assertEqual(len(self.trade_book), 3)
+        self.assertEqual(
+            [(tp.purchase_offset, tp.sell_offset) for tp in trade_points],
+            [(0, 3), (3, 5), (5, 6)],
+        )
+        self.assertEqual(self.trade_book[1].sell_point, self.market_series[5])
+        self.assertEqual(
+            self.trade_book[1:], TradeBook(self.market_series, [3, 5], [5, 6])
+        )
+        self.assertEqual(
+            TradeBook.from_trade_points(self.market_series, trade_points),
+            self.trade_book,
+        )
+
+    def test_aggregates(self):
+        trade_points = self.trade_book.trade_points()
+        self.assertEqual(list(self.trade_book.profits()), [1.0, -1.25, 0.75])
+        self.assertEqual(self.trade_book.total_profit(), 0.5)
+        self.assertEqual(
+            list(self.trade_book.hold_durations()),
+            [tp.duration_held for tp in trade_points],
+        )
+        self.assertEqual(self.trade_book.hold_time_histogram(), {1: 1, 2: 2})
+        self.assertEqual(self.trade_book.max_drawdown(), 1.25)
+
+    def test_empty(self):
+        trade_book = TradeBook(self.market_series)
+        self.assertEqual(trade_book.total_profit(), 0)
+        self.assertEqual(trade_book.hold_time_histogram(), {})
+        self.assertEqual(trade_book.max_drawdown(), 0.0)
+        self.assertEqual(trade_book.trade_points(), [])
+
+    def test_trade_ticks_round_trip(self):
+        trade_minutes, trade_prices = self.trade_book.trade_ticks()
+        self.assertEqual(list(trade_minutes), [0, 3, 3, 6, 6, 8])
+        self.assertEqual(list(trade_prices), [1.0, 2.0, 2.0, 0.75, 0.75, 1.5])
+        trade_book = TradeBook.from_trade_ticks(trade_minutes, trade_prices)
+        self.assertEqual(
+            [(tp.purchase_point, tp.sell_point) for tp in trade_book],
+            [(tp.purchase_point, tp.sell_point) for tp in self.trade_book],
+        )
+        self.assertEqual(trade_book.total_profit(), self.trade_book.total_profit())
+        self.assertEqual(
+            trade_book.hold_time_histogram(), self.trade_book.hold_time_histogram()
+        )
+
+    def test_mismatched_offsets(self):
+        with self.assertRaises(ValueError):
+            TradeBook(self.market_series, [0, 1], [2])
+
+    def test_matches_trade_points_of_run(self):
+        market_series = generate_market_series("random_walk", 1000, seed=4)
+        trading_algorithms = TradingAlgorithms(market_series, min_hold=2, max_hold=15)
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            with self.subTest(algorithm=algorithm):
+                trade_book = trading_algorithms.run_trade_book(algorithm)
+                trade_points = trading_algorithms.run(algorithm)
+                self.assertEqual(
+                    [(tp.purchase_offset, tp.sell_offset) for tp in trade_book],
+                    [(tp.purchase_offset, tp.sell_offset) for tp in trade_points],
+                )
+                total_profit = 0.0
+                for tp in trade_points:
+                    total_profit += tp.profit
+                self.assertEqual(trade_book.total_profit(), total_profit)
+
+
+if __name__ == "__main__":
+    unittest.main()
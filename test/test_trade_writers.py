@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import unittest
+from unittest import mock
+
+from src.market_generator import generate_market_series
+from src.market_series import MarketSeries
+from src.trade_book import TradeBook
+from src.trade_writers import (
+    BinaryTradeWriter,
+    CsvTradeWriter,
+    JsonlTradeWriter,
+    TextTradeWriter,
+    read_binary_trades,
+)
+from src.trading_algorithms import TradingAlgorithms
+
+
+class TestTradeWriters(unittest.TestCase):
+    def setUp(self):
+        self.market_series = MarketSeries(
+            [0, 1, 2, 3, 5, 6, 8], [1.0, 1.5, 1.25, 2.0, 1.0, 0.75, 1.5]
+        )
+        self.trade_book = TradeBook(self.market_series, [0, 3, 5], [3, 5, 6])
+
+    def write(self, trade_writer_class, trade_book):
+        output = io.BytesIO()
+        trade_writer = trade_writer_class(output)
+        trade_writer.write(trade_book)
+        self.assertEqual(trade_writer.num_trades, len(trade_book))
+        return output.getvalue()
+
+    def test_text_matches_trade_point_repr(self):
+        trade_book = TradingAlgorithms(
+            generate_market_series("random_walk", 2000)
+        ).run_trade_book("adjacent")
+        self.assertEqual(
+            self.write(TextTradeWriter, trade_book).decode(),
+            "".join(f"{trade_point}\n" for trade_point in trade_book),
+        )
+
+    def test_csv(self):
+        data = self.write(CsvTradeWriter, self.trade_book)
+        rows = list(csv.reader(io.StringIO(data.decode())))
+        self.assertEqual(
+            rows[0],
+            [
+                "purchase_minute",
+                "purchase_price",
+                "sell_minute",
+                "sell_price",
+                "hold_minutes",
+                "profit",
+            ],
+        )
+        self.assertEqual(rows[1], ["0", "1.0", "3", "2.0", "2", "1.0"])
+        self.assertEqual(len(rows), 4)
+
+    def test_jsonl(self):
+        lines = self.write(JsonlTradeWriter, self.trade_book).decode().splitlines()
+        trades = [json.loads(line) for line in lines]
+        self.assertEqual(
+            trades[1],
+            {
+                "purchase_minute": 3,
+                "purchase_price": 2.0,
+                "sell_minute": 6,
+                "sell_price": 0.75,
+                "hold_minutes": 2,
+                "profit": -1.25,
+            },
+        )
+        self.assertEqual(lines[2], json.dumps(trades[2]))
+
+    def test_jsonl_non_finite_prices(self):
+        market_series = MarketSeries(
+            [0, 1, 2, 3], [1.0, float("nan"), 1.5, float("inf")]
+        )
+        trade_book = TradeBook(market_series, [0, 2], [1, 3])
+        lines = self.write(JsonlTradeWriter, trade_book).decode().splitlines()
+        trades = [json.loads(line) for line in lines]
+        self.assertEqual(lines, [json.dumps(trade) for trade in trades])
+        self.assertIn('"sell_price": NaN', lines[0])
+        self.assertIn('"profit": Infinity', lines[1])
+
+    def test_binary_round_trip(self):
+        data = self.write(BinaryTradeWriter, self.trade_book)
+        self.assertEqual(
+            list(read_binary_trades(io.BytesIO(data))),
+            [(0, 1.0, 3, 2.0), (3, 2.0, 6, 0.75), (6, 0.75, 8, 1.5)],
+        )
+        with self.assertRaises(ValueError):
+            read_binary_trades(io.BytesIO(data[:-1]))
+        with self.assertRaises(ValueError):
+            read_binary_trades(io.BytesIO(b"MKTTICKS" + data[8:]))
+
+    def test_writes_in_chunks(self):
+        with mock.patch("src.trade_writers.TRADES_PER_CHUNK", 2):
+            output = io.BytesIO()
+            trade_writer = CsvTradeWriter(output)
+            trade_writer.write(self.trade_book[:1])
+            trade_writer.write(self.trade_book[1:])
+        self.assertEqual(output.getvalue(), self.write(CsvTradeWriter, self.trade_book))
+        self.assertEqual(trade_writer.num_trades, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
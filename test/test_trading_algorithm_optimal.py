@@ -0,0 +1,61 @@
+from typing import List
+
+import unittest
+
+from src.market_condition import MarketCondition
+from src.trading_algorithms import TradingAlgorithms
+from src.trade_point import TradePoint
+
+
+class TestOptimalMaxProfit(unittest.TestCase):
+    def setUp(self):
+        self.mk0: MarketCondition = MarketCondition(0, 1.005)
+        self.mk1: MarketCondition = MarketCondition(1, 1.050)
+        self.mk2: MarketCondition = MarketCondition(2, 1.009)
+        self.mk3: MarketCondition = MarketCondition(3, 1.010)
+        self.mk4: MarketCondition = MarketCondition(4, 1.030)
+        self.mk5: MarketCondition = MarketCondition(5, 1.020)
+        self.market_conditions: List[MarketCondition] = [
+            self.mk0,
+            self.mk1,
+            self.mk2,
+            self.mk3,
+            self.mk4,
+            self.mk5,
+        ]
+
+    def test_with_min_hold_0(self):
+        trading_algorithms = TradingAlgorithms(
+            self.market_conditions, min_hold=0, max_hold=len(self.market_conditions)
+        )
+        trade_points: List[TradePoint] = trading_algorithms.run("optimal")
+        self.assertEqual(len(trade_points), 2)
+        self.assertEqual(trade_points[0].purchase_point, self.mk0)
+        self.assertEqual(trade_points[0].sell_point, self.mk1)
+        self.assertEqual(trade_points[1].purchase_point, self.mk2)
+        self.assertEqual(trade_points[1].sell_point, self.mk4)
+
+    def test_with_min_hold_1_max_hold_2(self):
+        trading_algorithms = TradingAlgorithms(
+            self.market_conditions, min_hold=1, max_hold=2
+        )
+        trade_points: List[TradePoint] = trading_algorithms.run("optimal")
+        self.assertEqual(len(trade_points), 1)
+        self.assertEqual(trade_points[0].purchase_point, self.mk2)
+        self.assertEqual(trade_points[0].sell_point, self.mk4)
+
+    def test_declining_prices_make_no_trades(self):
+        market_conditions = [MarketCondition(i, 2.0 - i * 0.01) for i in range(50)]
+        trading_algorithms = TradingAlgorithms(
+            market_conditions, min_hold=1, max_hold=9
+        )
+        self.assertEqual(trading_algorithms.run("optimal"), [])
+
+    def test_beats_every_other_algorithm(self):
+        trading_algorithms = TradingAlgorithms(
+            self.market_conditions, min_hold=0, max_hold=3
+        )
+        optimal_profit = sum(tp.profit for tp in trading_algorithms.run("optimal"))
+        for algorithm in TradingAlgorithms.ALGORITHMS():
+            profit = sum(tp.profit for tp in trading_algorithms.run(algorithm))
+            self.assertLessEqual(profit, optimal_profit + 1e-9)
@@ -0,0 +1,88 @@
+import random
+import unittest
+
+from src.market_series import MarketSeries
+from src.trading_algorithms import TradingAlgorithms
+from src.walk_forward import WalkForward, format_walk_forward_report, walk_forward
+
+
+def random_series(num_ticks, gappy, seed):
+    random.seed(seed)
+    minutes, minute = [], 0
+    for _ in range(num_ticks):
+        minute += random.choice((1, 1, 2, 7)) if gappy else 1
+        minutes.append(minute)
+    prices = [1 + random.randint(0, 40) / 100 for _ in range(num_ticks)]
+    return MarketSeries(minutes, prices)
+
+
+class TestWalkForward(unittest.TestCase):
+    def assert_windows_match_fresh_runs(self, market_series, window_results, *args):
+        algorithm_choice, min_hold, max_hold = args
+        self.assertGreater(len(window_results), 0)
+        for window_result in window_results:
+            window_series = market_series.between_minutes(
+                window_result.first_minute, window_result.last_minute
+            )
+            trade_book = TradingAlgorithms(
+                window_series, min_hold, max_hold
+            ).run_trade_book(algorithm_choice)
+            self.assertEqual(window_result.num_market_conditions, len(window_series))
+            self.assertEqual(window_result.num_trades, len(trade_book))
+            self.assertAlmostEqual(
+                window_result.total_profit, trade_book.total_profit()
+            )
+
+    def test_windows_match_fresh_runs(self):
+        for gappy in (False, True):
+            market_series = random_series(1500, gappy, seed=11)
+            for algorithm_choice in TradingAlgorithms.ALGORITHMS():
+                with self.subTest(gappy=gappy, algorithm=algorithm_choice):
+                    result = walk_forward(
+                        market_series, algorithm_choice, 400, 35, 5, 45
+                    )
+                    self.assertTrue(result.isSuccess)
+                    self.assert_windows_match_fresh_runs(
+                        market_series, result.result, algorithm_choice, 5, 45
+                    )
+
+    def test_windows(self):
+        market_series = random_series(100, False, seed=3)  # Minutes 1 to 100
+        window_results = walk_forward(market_series, "max", 30, 20).result
+        self.assertEqual(
+            [(w.first_minute, w.last_minute) for w in window_results],
+            [(1, 30), (21, 50), (41, 70), (61, 90)],
+        )
+        self.assertEqual(walk_forward(market_series, "max", 101).result, [])
+        self.assertFalse(walk_forward(market_series, "max", 0).isSuccess)
+        self.assertFalse(
+            walk_forward(MarketSeries([0, 2, 1], [1.0, 1.1, 1.2]), "max", 2).isSuccess
+        )
+
+    def test_shares_precomputed_structures(self):
+        market_series = random_series(800, True, seed=5)
+        trading_algorithms = TradingAlgorithms(market_series, 3, 25)
+        trading_algorithms.precompute()
+        range_max_table = trading_algorithms.range_max_table
+        walk = WalkForward(trading_algorithms, "max")
+        self.assertIs(walk.range_max_table, range_max_table)
+        for start_offset in range(0, 700, 50):
+            num_trades, total_profit = walk.window(start_offset, start_offset + 100)
+            trade_book = TradingAlgorithms(
+                market_series[start_offset : start_offset + 100], 3, 25
+            ).run_trade_book("max")
+            self.assertEqual(num_trades, len(trade_book))
+            self.assertAlmostEqual(total_profit, trade_book.total_profit())
+
+    def test_report(self):
+        market_series = random_series(100, False, seed=3)
+        report = format_walk_forward_report(
+            walk_forward(market_series, "max", 30, 20).result
+        )
+        self.assertEqual(len(report.splitlines()), 8)
+        self.assertIn("4 windows", report)
+        self.assertIn("No complete window", format_walk_forward_report([]))
+
+
+if __name__ == "__main__":
+    unittest.main()